@@ -1,19 +1,57 @@
-import base64
+import logging
 from datetime import datetime
 
-import gspread
 import pandas as pd
 import streamlit as st
-from google.oauth2.service_account import Credentials
 
-from core.retrieval import load_services, retrieve_services
-from core.handout_generator import generate_handout
-from core.logger import log_interaction
-from core.pdf_generator import generate_pdf
+from core.analytics_store import get_analytics_store
+from core.catalogue import get_catalogue
+from core.config import get_setting
+from core.retrieval import retrieval_settings, retrieve_services, set_acceptance_scores
+from core.handout_cache import get_handout_cache
+from core.handout_generator import (
+    final_handout_text,
+    prewarm_service_cards,
+    render_template_handout,
+    stream_handout,
+)
+from core.interaction_storage import get_interaction_storage, sheets_mirror_enabled
+from core.logger import get_log_queue, log_interaction
+from core.metrics import METRICS, start_metrics_server
+from core.options import AGE_GROUP_OPTIONS, HOUSING_OPTIONS, LANGUAGE_OPTIONS, NEED_OPTIONS
+from core.profiling import get_rerun_profiler
+
+# Wall time per section of each rerun (profiling.reruns setting)
+PROFILER = get_rerun_profiler()
+PROFILER.start_run()
+
+# Pipeline timings as Prometheus text on metrics.port (metrics.enabled)
+METRICS_PORT = start_metrics_server()
+
+# Send interaction rows left in the queues by a previous run right away,
+# not when the next visitor is logged
+get_interaction_storage().start()
+get_log_queue().start()
 
 
 # ---------- Load data ----------
-SERVICES_DF = load_services()
+# Shared by all sessions; reloaded only when the CSV changes. Take one
+# snapshot per rerun so the whole run sees a single catalogue version.
+CATALOGUE = get_catalogue().current()
+SERVICES_DF = CATALOGUE.df
+
+# Services staff usually keep rank higher (history from the local analytics store)
+if get_setting("retrieval", "use_acceptance", True):
+    try:
+        set_acceptance_scores(SERVICES_DF, get_analytics_store().acceptance_scores())
+    except Exception:
+        logging.exception("Could not load service acceptance scores")
+
+# Optionally generate every service card for this catalogue up front
+if get_setting("handout", "prewarm_cards", False):
+    prewarm_service_cards(SERVICES_DF, LANGUAGE_OPTIONS, CATALOGUE.content_hash)
+
+PROFILER.lap("catalogue")
 
 # ---------- Page config ----------
 st.set_page_config(
@@ -31,6 +69,7 @@ defaults = {
     "kept_services": [],
     "removed_ids": [],
     "handout_text": "",
+    "handout_notice": None,         # shown on the handout page (e.g. LLM failure)
     "services_for_review": [],
     "review_ready": False,
 }
@@ -73,6 +112,41 @@ with st.sidebar:
             "and visitor context patterns over time."
         )
 
+    st.caption(
+        f"Services catalogue v{CATALOGUE.version} · {len(SERVICES_DF)} services · "
+        f"loaded {CATALOGUE.loaded_at:%Y-%m-%d %H:%M:%S}"
+    )
+
+    if PROFILER.enabled:
+        with st.expander("Rerun cost (ms, mean per section)"):
+            for kind, sections in PROFILER.averages().items():
+                st.markdown(f"**{kind}**")
+                st.table(
+                    pd.Series(sections, name="ms").mul(1000).round(1).to_frame()
+                )
+
+    if METRICS.enabled:
+        with st.expander("Pipeline metrics (this server process)"):
+            rows = METRICS.snapshot()
+            if rows:
+                timings = pd.DataFrame(rows).set_index("name")
+                timings[["mean", "p50", "p95", "p99"]] *= 1000
+                st.dataframe(timings.round(1), column_config={"name": "span (ms)"})
+            else:
+                st.caption("No spans recorded yet.")
+            for name, value in METRICS.counters().items():
+                st.caption(f"{name}: {value:,.0f}")
+            if METRICS_PORT:
+                st.caption(f"Prometheus endpoint: :{METRICS_PORT}/metrics")
+            st.download_button(
+                "Download metrics (Prometheus text)",
+                data=METRICS.prometheus_text(),
+                file_name="dissa_metrics.prom",
+                mime="text/plain",
+            )
+
+PROFILER.lap("sidebar")
+
 # ---------- Light custom styling ----------
 st.markdown(
     """
@@ -117,29 +191,137 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+PROFILER.lap("header")
+
 
 # =====================================================================
-# HELPER: load interactions from Google Sheets
+# HELPER: load interactions from the interaction storage
 # =====================================================================
-def load_interactions_from_sheets() -> pd.DataFrame:
-    """Return interactions log as a DataFrame, using service-account auth."""
-    creds_info = st.secrets["gcp_service_account"]
-    creds = Credentials.from_service_account_info(
-        creds_info,
-        scopes=["https://www.googleapis.com/auth/spreadsheets"],
-    )
-    client = gspread.authorize(creds)
+def sync_interactions_from_sheets(force_sync: bool = False):
+    """
+    Return the local analytics store after fetching only the rows appended
+    to the interaction log since the last sync (at most every
+    analytics.refresh_seconds, or now if force_sync).
+    """
+    store = get_analytics_store()
+    try:
+        store.sync(force=force_sync)
+    except Exception as e:
+        if store.count() == 0:
+            raise
+        st.warning(f"Could not reach {get_interaction_storage().label}; showing the last synced data.")
+        st.caption(str(e))
+    return store
+
+
+@st.cache_data(max_entries=4)
+def service_names(catalogue_version: str) -> dict:
+    """Service id (as str) -> name for the current catalogue, built once per version."""
+    return dict(zip(SERVICES_DF["id"].astype(int).astype(str), SERVICES_DF["name"]))
 
-    raw = st.secrets["sheets"]["sheet_id"].strip()
-    if "/d/" in raw:
-        key = raw.split("/d/")[1].split("/")[0]
-    else:
-        key = raw
 
-    sh = client.open_by_key(key)
-    ws = sh.worksheet("interactions")
-    records = ws.get_all_records()
-    return pd.DataFrame(records)
+# =====================================================================
+# HELPER: sections that rerun on their own (st.fragment)
+# =====================================================================
+@st.fragment
+def review_services():
+    """
+    Review list with a keep/remove checkbox per service. A fragment:
+    toggling a checkbox reruns only this function, not the whole page.
+    Confirming reruns the app to move on to the handout page.
+    """
+    with PROFILER.fragment("review"):
+        services = st.session_state["services_for_review"]
+        visitor_context = st.session_state["visitor_context_form"]
+
+        st.success(f"Found {len(services)} matching services. Review below.")
+        st.markdown("### Review services")
+        st.write(
+            "Uncheck any services that do not fit this visitor before generating the handout."
+        )
+
+        kept_services = []
+        removed_ids = []
+
+        for svc in services:
+            label = (
+                f"**{svc['name']}** – {svc['description']}  \n"
+                f"Hours: {svc['hours_today']} · Address: {svc['address']}"
+            )
+            keep = st.checkbox(label, value=True, key=f"svc_{svc['id']}")
+            if keep:
+                kept_services.append(svc)
+            else:
+                removed_ids.append(svc["id"])
+
+        confirm_clicked = st.button("Confirm & generate handout")
+
+        if confirm_clicked:
+            if not kept_services:
+                st.warning("At least one service should be selected.")
+            else:
+                # Render the handout as it streams in, then move on to
+                # the handout page with the assembled text.
+                st.markdown("### Writing handout…")
+                try:
+                    handout_text = final_handout_text(
+                        st.write_stream(
+                            stream_handout(
+                                visitor_context, kept_services, CATALOGUE.content_hash
+                            )
+                        )
+                    )
+                    st.session_state["handout_notice"] = None
+                except Exception as e:
+                    # handout.mode = "llm" has no fallback of its own
+                    logging.exception("Handout generation failed: %s", e)
+                    st.session_state["handout_notice"] = (
+                        "Could not write the handout; showing the standard handout instead."
+                    )
+                    handout_text = render_template_handout(visitor_context, kept_services)
+                log_interaction(visitor_context, kept_services, removed_ids)
+
+                st.session_state["visitor_context"] = visitor_context
+                st.session_state["kept_services"] = kept_services
+                st.session_state["removed_ids"] = removed_ids
+                st.session_state["handout_text"] = handout_text
+
+                st.session_state["review_ready"] = False
+                st.session_state["services_for_review"] = []
+                st.session_state["step"] = "handout"
+
+                st.rerun()
+
+
+@st.fragment
+def service_acceptance_view(store):
+    """Acceptance table; changing the language / age slice reruns only this."""
+    with PROFILER.fragment("acceptance"):
+        id_to_name = service_names(CATALOGUE.content_hash)
+
+        col_a1, col_a2 = st.columns(2)
+        with col_a1:
+            acc_language = st.selectbox("Language", ["All"] + LANGUAGE_OPTIONS, key="acc_language")
+        with col_a2:
+            acc_age = st.selectbox("Age group", ["All"] + AGE_GROUP_OPTIONS, key="acc_age")
+
+        acceptance_df = store.acceptance(
+            language=None if acc_language == "All" else acc_language,
+            age_group=None if acc_age == "All" else acc_age,
+            min_shown=get_setting("analytics", "acceptance_min_shown", 1),
+        )
+        if acceptance_df.empty:
+            st.caption("No services have been logged for this slice yet.")
+        else:
+            acceptance_df.insert(
+                1,
+                "service",
+                acceptance_df["service_id"].astype(str).map(id_to_name),
+            )
+            st.dataframe(
+                acceptance_df.style.format({"acceptance_rate": "{:.0%}"}),
+                hide_index=True,
+            )
 
 
 # =====================================================================
@@ -158,20 +340,20 @@ if mode == "Front desk tool":
         with col1:
             age_group = st.selectbox(
                 "Age group",
-                ["Under 18", "18-29", "30-54", "55+"],
+                AGE_GROUP_OPTIONS,
                 index=1,
             )
 
         with col2:
             language = st.selectbox(
                 "Preferred language (for now, display language)",
-                ["Cree", "Inuktitut", "English", "French", "Other"],
+                LANGUAGE_OPTIONS,
                 index=0,
             )
 
         housing_status = st.selectbox(
             "Housing situation (optional)",
-            ["Not specified", "Homeless / unstably housed", "Stably housed", "Shelter"],
+            HOUSING_OPTIONS,
             index=0,
         )
 
@@ -182,17 +364,6 @@ if mode == "Front desk tool":
             "You can select more than one."
         )
 
-        NEED_OPTIONS = [
-            {"label": "Food",                 "value": "food",           "emoji": "🍽️"},
-            {"label": "Health & Wellness",    "value": "health",         "emoji": "🩺"},
-            {"label": "Mental Health",        "value": "mental_health",  "emoji": "🧠"},
-            {"label": "Housing & Shelter",    "value": "housing",        "emoji": "🏠"},
-            {"label": "Clothes & Hygiene",    "value": "clothing",       "emoji": "🧥"},
-            {"label": "Work / Employment",    "value": "employment",     "emoji": "💼"},
-            {"label": "Family & Children",    "value": "family_support", "emoji": "👨‍👩‍👧"},
-            {"label": "Culture / Community",  "value": "culture",        "emoji": "🌿"},
-        ]
-
         selected_needs = []
         cols_per_row = 3
         for i in range(0, len(NEED_OPTIONS), cols_per_row):
@@ -223,8 +394,10 @@ if mode == "Front desk tool":
                     "needs": selected_needs,
                 }
 
+                top_k, weights = retrieval_settings()
                 services = retrieve_services(
-                    SERVICES_DF, selected_needs, language, age_group
+                    SERVICES_DF, selected_needs, language, age_group, housing_status,
+                    top_k=top_k, weights=weights,
                 )
 
                 if not services:
@@ -236,50 +409,11 @@ if mode == "Front desk tool":
                     st.session_state["services_for_review"] = services
                     st.session_state["visitor_context_form"] = visitor_context
 
+        PROFILER.lap("form")
+
         # ---- Review section ----
         if st.session_state["review_ready"] and st.session_state["services_for_review"]:
-            services = st.session_state["services_for_review"]
-            visitor_context = st.session_state["visitor_context_form"]
-
-            st.success(f"Found {len(services)} matching services. Review below.")
-            st.markdown("### Review services")
-            st.write(
-                "Uncheck any services that do not fit this visitor before generating the handout."
-            )
-
-            kept_services = []
-            removed_ids = []
-
-            for svc in services:
-                label = (
-                    f"**{svc['name']}** – {svc['description']}  \n"
-                    f"Hours: {svc['hours_today']} · Address: {svc['address']}"
-                )
-                keep = st.checkbox(label, value=True, key=f"svc_{svc['id']}")
-                if keep:
-                    kept_services.append(svc)
-                else:
-                    removed_ids.append(svc["id"])
-
-            confirm_clicked = st.button("Confirm & generate handout")
-
-            if confirm_clicked:
-                if not kept_services:
-                    st.warning("At least one service should be selected.")
-                else:
-                    handout_text = generate_handout(visitor_context, kept_services)
-                    log_interaction(visitor_context, kept_services, removed_ids)
-
-                    st.session_state["visitor_context"] = visitor_context
-                    st.session_state["kept_services"] = kept_services
-                    st.session_state["removed_ids"] = removed_ids
-                    st.session_state["handout_text"] = handout_text
-
-                    st.session_state["review_ready"] = False
-                    st.session_state["services_for_review"] = []
-                    st.session_state["step"] = "handout"
-
-                    st.rerun()
+            review_services()
 
     # STEP 2: HANDOUT PAGE
     else:  # st.session_state["step"] == "handout"
@@ -290,6 +424,8 @@ if mode == "Front desk tool":
 
         st.markdown("### Handout ready")
         st.caption(f"Generated on: **{now_str}**")
+        if st.session_state["handout_notice"]:
+            st.warning(st.session_state["handout_notice"])
 
         if vc:
             with st.expander("Visitor context summary", expanded=True):
@@ -303,13 +439,19 @@ if mode == "Front desk tool":
         st.markdown("### Handout text (formatted)")
         st.markdown(handout_text)
 
-        # PDF generation + download
-        # pdf_bytes = generate_pdf(handout_text, vc)
-        pdf_bytes = generate_pdf(
-        handout_text,
-        vc,
-        st.session_state.get("kept_services", []),
+        PROFILER.lap("handout_text")
+
+        # PDF generation + download (memoized: reruns reuse the same bytes).
+        # Imported here so FPDF only loads once a handout page is shown.
+        from core.pdf_generator import generate_pdf_cached
+
+        pdf_bytes, b64_pdf = generate_pdf_cached(
+            handout_text,
+            vc,
+            st.session_state.get("kept_services", []),
+            CATALOGUE.content_hash,
         )
+        PROFILER.lap("pdf")
 
         st.download_button(
             label="📄 Download PDF",
@@ -320,7 +462,6 @@ if mode == "Front desk tool":
 
         # Inline preview (best-effort)
         try:
-            b64_pdf = base64.b64encode(pdf_bytes).decode("utf-8")
             pdf_iframe = f"""
                 <iframe
                     src="data:application/pdf;base64,{b64_pdf}"
@@ -351,6 +492,8 @@ if mode == "Front desk tool":
             st.session_state["step"] = "form"
             st.rerun()
 
+        PROFILER.lap("handout_page")
+
 
 # =====================================================================
 # MODE 2: ANALYTICS DASHBOARD
@@ -358,183 +501,189 @@ if mode == "Front desk tool":
 else:
     st.subheader("Analytics dashboard – anonymous usage trends")
 
+    sync_clicked = st.button("🔄 Sync now")
+
     try:
-        df = load_interactions_from_sheets()
+        store = sync_interactions_from_sheets(force_sync=sync_clicked)
     except Exception as e:
-        st.error("Could not load analytics data from Google Sheets.")
+        st.error(f"Could not load analytics data from {get_interaction_storage().label}.")
         st.caption(str(e))
     else:
-        if df.empty:
+        PROFILER.lap("analytics_sync")
+        last_sync = store.last_sync_at
+        if last_sync:
+            st.caption(
+                f"Last synced from {get_interaction_storage().label}: "
+                f"{datetime.fromtimestamp(last_sync):%Y-%m-%d %H:%M:%S}"
+            )
+
+        if store.count() == 0:
             st.info(
                 "No interactions have been logged yet. "
                 "As front desk staff generate handouts, data will appear here."
             )
         else:
-            # ---------- Timestamp + time filter ----------
-            if "timestamp" in df.columns:
-                df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-
-                st.markdown("#### Time filter")
-                period = st.selectbox(
-                    "Show data for:",
-                    ["All time", "Last 7 days", "Last 30 days", "Last 90 days"],
-                    index=2,
-                )
+            # ---------- Time filter ----------
+            # All charts below are sums over daily rollup buckets, so their
+            # cost does not grow with the size of the log.
+            st.markdown("#### Time filter")
+            period = st.selectbox(
+                "Show data for:",
+                ["All time", "Last 7 days", "Last 30 days", "Last 90 days"],
+                index=2,
+            )
 
-                if period == "All time":
-                    filtered_df = df.copy()
-                else:
-                    days_lookup = {
-                        "Last 7 days": 7,
-                        "Last 30 days": 30,
-                        "Last 90 days": 90,
-                    }
-                    days = days_lookup[period]
-                    cutoff = pd.Timestamp.now() - pd.Timedelta(days=days)
-                    filtered_df = df[df["timestamp"] >= cutoff].copy()
+            if period == "All time":
+                since_day = None
             else:
-                filtered_df = df.copy()
+                days_lookup = {
+                    "Last 7 days": 7,
+                    "Last 30 days": 30,
+                    "Last 90 days": 90,
+                }
+                days = days_lookup[period]
+                cutoff = pd.Timestamp.now() - pd.Timedelta(days=days)
+                since_day = cutoff.strftime("%Y-%m-%d")
+
+            summary = store.summary(since_day)
 
-            if filtered_df.empty:
+            if summary["total"] == 0:
                 st.info(
                     "No interactions match the selected time period. "
                     "Try a wider range or 'All time'."
                 )
             else:
                 # Top-level KPIs (using filtered data)
-                total_interactions = len(filtered_df)
-                if "timestamp" in filtered_df.columns:
-                    date_min = filtered_df["timestamp"].min()
-                    date_max = filtered_df["timestamp"].max()
-                else:
-                    date_min = date_max = None
-
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.metric("Total handouts generated", total_interactions)
+                    st.metric("Total handouts generated", summary["total"])
                 with col2:
-                    st.metric(
-                        "First interaction in view",
-                        date_min.strftime("%Y-%m-%d") if date_min is not None else "N/A",
-                    )
+                    st.metric("First interaction in view", summary["first_day"] or "N/A")
                 with col3:
-                    st.metric(
-                        "Most recent in view",
-                        date_max.strftime("%Y-%m-%d") if date_max is not None else "N/A",
+                    st.metric("Most recent in view", summary["last_day"] or "N/A")
+
+                # Download filtered CSV (only read the raw rows on request)
+                if st.button("Prepare filtered data (CSV)"):
+                    csv_bytes = store.load_range(since_day).to_csv(index=False).encode("utf-8")
+                    st.download_button(
+                        label="⬇️ Download filtered data (CSV)",
+                        data=csv_bytes,
+                        file_name="dissa_interactions_filtered.csv",
+                        mime="text/csv",
                     )
 
-                # Download filtered CSV
-                csv_bytes = filtered_df.to_csv(index=False).encode("utf-8")
-                st.download_button(
-                    label="⬇️ Download filtered data (CSV)",
-                    data=csv_bytes,
-                    file_name="dissa_interactions_filtered.csv",
-                    mime="text/csv",
-                )
-
                 st.markdown("---")
 
                 # --- Top needs ---
                 st.markdown("### Top needs selected")
 
-                if "needs" in filtered_df.columns:
-                    needs_df = filtered_df.copy()
-                    needs_df["needs_list"] = (
-                        needs_df["needs"].fillna("").astype(str).str.split(";")
-                    )
-                    needs_exploded = needs_df.explode("needs_list")
-                    needs_exploded = needs_exploded[
-                        needs_exploded["needs_list"] != ""
-                    ]
-
-                    if needs_exploded.empty:
-                        st.caption("No needs data recorded yet.")
-                    else:
-                        needs_counts = (
-                            needs_exploded["needs_list"].value_counts().head(10)
-                        )
-
-                        col_left, col_right = st.columns([2, 1])
-                        with col_left:
-                            st.bar_chart(needs_counts)
-                        with col_right:
-                            st.write("Top needs (by count):")
-                            st.table(needs_counts.to_frame("count"))
+                needs_counts = store.rollup("need", since_day).head(10)
+                if needs_counts.empty:
+                    st.caption("No needs data recorded yet.")
                 else:
-                    st.caption("Column 'needs' not found in sheet.")
+                    col_left, col_right = st.columns([2, 1])
+                    with col_left:
+                        st.bar_chart(needs_counts)
+                    with col_right:
+                        st.write("Top needs (by count):")
+                        st.table(needs_counts.to_frame("count"))
 
                 st.markdown("---")
 
                 # --- Top services used ---
                 st.markdown("### Top services included in handouts")
 
-                if "service_ids_kept" in filtered_df.columns:
-                    svc_df = filtered_df.copy()
-                    svc_df["service_ids_kept_list"] = (
-                        svc_df["service_ids_kept"].fillna("").astype(str).str.split(";")
-                    )
-                    svc_exploded = svc_df.explode("service_ids_kept_list")
-                    svc_exploded = svc_exploded[
-                        svc_exploded["service_ids_kept_list"] != ""
-                    ]
-
-                    if svc_exploded.empty:
-                        st.caption("No services have been logged yet.")
-                    else:
-                        svc_exploded["service_ids_kept_list"] = pd.to_numeric(
-                            svc_exploded["service_ids_kept_list"], errors="coerce"
-                        )
-                        svc_exploded = svc_exploded.dropna(
-                            subset=["service_ids_kept_list"]
-                        )
-
-                        id_to_name = {
-                            int(row["id"]): row["name"]
-                            for _, row in SERVICES_DF.iterrows()
-                        }
-
-                        svc_exploded["service_name"] = svc_exploded[
-                            "service_ids_kept_list"
-                        ].map(id_to_name)
-                        svc_exploded = svc_exploded.dropna(subset=["service_name"])
-
-                        svc_counts = (
-                            svc_exploded["service_name"].value_counts().head(10)
-                        )
+                svc_counts = store.rollup("service_id", since_day)
+                id_to_name = service_names(CATALOGUE.content_hash)
+                svc_counts.index = svc_counts.index.map(id_to_name)
+                svc_counts = svc_counts[svc_counts.index.notna()]
+                svc_counts = svc_counts.groupby(level=0, sort=False).sum().head(10)
 
-                        col_left2, col_right2 = st.columns([2, 1])
-                        with col_left2:
-                            st.bar_chart(svc_counts)
-                        with col_right2:
-                            st.write("Top services (by count):")
-                            st.table(svc_counts.to_frame("count"))
+                if svc_counts.empty:
+                    st.caption("No services have been logged yet.")
                 else:
-                    st.caption("Column 'service_ids_kept' not found in sheet.")
+                    col_left2, col_right2 = st.columns([2, 1])
+                    with col_left2:
+                        st.bar_chart(svc_counts)
+                    with col_right2:
+                        st.write("Top services (by count):")
+                        st.table(svc_counts.to_frame("count"))
 
                 st.markdown("---")
 
                 # --- Context breakdown ---
                 st.markdown("### Context breakdown")
 
-                col_h1, col_h2 = st.columns(2)
+                col_h1, col_h2, col_h3 = st.columns(3)
                 with col_h1:
-                    if "housing_status" in filtered_df.columns:
-                        st.markdown("**By housing situation**")
-                        housing_counts = filtered_df["housing_status"].value_counts()
-                        st.bar_chart(housing_counts)
-                    else:
-                        st.caption("Column 'housing_status' not found.")
+                    st.markdown("**By housing situation**")
+                    st.bar_chart(store.rollup("housing_status", since_day))
 
                 with col_h2:
-                    if "age_group" in filtered_df.columns:
-                        st.markdown("**By age group**")
-                        age_counts = filtered_df["age_group"].value_counts()
-                        st.bar_chart(age_counts)
-                    else:
-                        st.caption("Column 'age_group' not found.")
+                    st.markdown("**By age group**")
+                    st.bar_chart(store.rollup("age_group", since_day))
+
+                with col_h3:
+                    st.markdown("**By language**")
+                    st.bar_chart(store.rollup("language", since_day))
+
+                st.markdown("---")
+
+                # --- Service acceptance ---
+                st.markdown("### Service acceptance")
+                st.caption(
+                    "How often each service was suggested and how often staff removed it. "
+                    "Services with low acceptance may need review in the catalogue. "
+                    "(All time; sliced by visitor language and age group.)"
+                )
+                service_acceptance_view(store)
 
                 st.markdown("#### Raw log preview (first 20 rows)")
-                st.dataframe(filtered_df.head(20))
+                st.dataframe(store.load_range(since_day, limit=20))
+
+        PROFILER.lap("analytics_charts")
+
+    # ---------- Handout cache (this server process) ----------
+    cache = get_handout_cache()
+    if cache is not None:
+        st.markdown("---")
+        st.markdown("### Handout cache")
+        stats = cache.snapshot_stats()
+        col_c1, col_c2, col_c3, col_c4 = st.columns(4)
+        with col_c1:
+            st.metric("Hit rate", f"{stats['hit_rate']:.0%}")
+        with col_c2:
+            st.metric("Memory hits", stats["memory_hits"])
+        with col_c3:
+            st.metric("Disk hits", stats["disk_hits"])
+        with col_c4:
+            st.metric("Misses (LLM calls)", stats["misses"])
+
+    # ---------- Interaction log queue to Sheets (this server process) ----------
+    storage = get_interaction_storage()
+    if storage.name == "sheets" or sheets_mirror_enabled(storage):
+        st.markdown(
+            "### Interaction log queue" if storage.name == "sheets"
+            else "### Google Sheets mirror queue"
+        )
+        qstats = get_log_queue().snapshot_stats()
+        col_q1, col_q2, col_q3 = st.columns(3)
+        with col_q1:
+            st.metric("Waiting to be written", qstats["depth"])
+        with col_q2:
+            latency = qstats["last_flush_latency"]
+            st.metric("Last flush latency", f"{latency:.1f}s" if latency is not None else "N/A")
+        with col_q3:
+            st.metric("Failed batches", qstats["failures"])
+        if qstats["depth"] and qstats["last_error"]:
+            st.caption(f"Last error: {qstats['last_error']}")
+        if qstats["dead_letter"]:
+            st.warning(
+                f"{qstats['dead_letter']} interactions were rejected and set aside "
+                "(dead_letter table in the queue file)."
+            )
+
+    PROFILER.lap("analytics_metrics")
 
 
 # ---------- Footer ----------
@@ -546,3 +695,6 @@ st.markdown(
     '</div>',
     unsafe_allow_html=True,
 )
+
+PROFILER.lap("footer")
+PROFILER.end_run()
@@ -0,0 +1,214 @@
+# benchmarks/bench_pdf.py
+
+"""
+Handout PDF rendering: renders per second for what the handout page does
+on every rerun.
+
+- baseline: the original renderer (legacy_generate_pdf below) + base64
+  encode on every rerun, as the page did before the PDF cache
+- generate_pdf: today's renderer, still called on every rerun
+- cache miss: first rerun, generate_pdf_cached renders and encodes
+- cache hit: later reruns, served from the PdfCache LRU
+
+Run from the repository root:
+    python -m benchmarks.bench_pdf
+"""
+
+import base64
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fpdf import FPDF
+
+from core.handout_generator import render_template_handout
+from core.pdf_generator import (
+    BRAND_DARK,
+    BRAND_GREEN,
+    BRAND_LIGHT_GREY,
+    PdfCache,
+    category_icon,
+    generate_pdf,
+    to_latin1,
+)
+from core.retrieval import load_services, retrieve_services
+
+VISITOR = {
+    "age_group": "18-29",
+    "language": "Cree",
+    "housing_status": "Not specified",
+    "needs": ["food", "health"],
+}
+
+
+class LegacyHandoutPDF(FPDF):
+    """The original HandoutPDF: header and footer strings converted on every page."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.generated_on = ""
+
+    def header(self):
+        self.set_fill_color(*BRAND_GREEN)
+        self.rect(x=0, y=0, w=210, h=25, style="F")
+
+        self.set_xy(10, 7)
+        self.set_text_color(255, 255, 255)
+        self.set_font("Helvetica", "B", 18)
+        self.cell(0, 8, to_latin1("Service Handout"), ln=1)
+
+        if self.generated_on:
+            self.set_font("Helvetica", "", 10)
+            self.set_x(10)
+            self.cell(0, 6, to_latin1(f"Generated on: {self.generated_on}"), ln=1)
+
+        self.ln(4)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_draw_color(220, 220, 220)
+        self.set_line_width(0.3)
+        self.line(10, self.get_y(), 200, self.get_y())
+
+        self.set_y(-12)
+        self.set_font("Helvetica", "I", 8)
+        self.set_text_color(120, 120, 120)
+        footer_text = (
+            f"NFCM / Centraide - DISSA MVP  |  Page {self.page_no()}/{{nb}}"
+        )
+        self.cell(0, 6, to_latin1(footer_text), align="C")
+
+
+def legacy_generate_pdf(
+    handout_text: str,
+    visitor_context: Dict,
+    services: Optional[List[Dict]] = None,
+) -> bytes:
+    """The pre-cache implementation (Latin-1 only), kept here for comparison."""
+    pdf = LegacyHandoutPDF()
+    pdf.set_auto_page_break(auto=True, margin=20)
+    pdf.alias_nb_pages()
+    pdf.generated_on = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    pdf.add_page()
+    pdf.set_text_color(*BRAND_DARK)
+    pdf.set_font("Helvetica", size=12)
+
+    left_margin = 15
+    right_margin = 15
+    usable_width = 210 - left_margin - right_margin
+
+    intro = ""
+    closing = ""
+    if handout_text:
+        parts = handout_text.strip().split("\n\n")
+        if parts:
+            intro = parts[0]
+        if len(parts) > 1:
+            closing = parts[-1]
+
+    if intro:
+        pdf.set_xy(left_margin, pdf.get_y())
+        pdf.multi_cell(usable_width, 6, to_latin1(intro))
+        pdf.ln(4)
+
+    if services:
+        pdf.set_font("Helvetica", "B", 13)
+        pdf.cell(0, 8, to_latin1("Services that may help you:"), ln=1)
+        pdf.ln(2)
+        pdf.set_font("Helvetica", size=11)
+
+        for svc in services:
+            name = svc.get("name", "Service")
+            desc = svc.get("description", "")
+            address = svc.get("address", "")
+            hours = svc.get("hours_today", "")
+            icon = category_icon(svc.get("category", ""))
+
+            pdf.set_draw_color(210, 210, 210)
+            pdf.set_line_width(0.4)
+
+            pdf.set_fill_color(*BRAND_LIGHT_GREY)
+            pdf.set_x(left_margin)
+            pdf.multi_cell(usable_width, 7, to_latin1(f"{icon}  {name}"), border=1, fill=True)
+
+            pdf.set_x(left_margin)
+            body_lines = []
+            if desc:
+                body_lines.append(desc)
+            if hours:
+                body_lines.append(f"Today: {hours}")
+            if address:
+                body_lines.append(f"Where: {address}")
+
+            body_text = "\n".join(body_lines)
+            if body_text:
+                pdf.multi_cell(usable_width, 6, to_latin1(body_text), border=1, fill=False)
+
+            pdf.ln(3)
+
+    else:
+        pdf.set_xy(left_margin, pdf.get_y())
+        pdf.multi_cell(usable_width, 7, to_latin1(handout_text or ""))
+
+    if closing:
+        pdf.ln(4)
+        pdf.set_font("Helvetica", size=11)
+        pdf.multi_cell(usable_width, 6, to_latin1(closing))
+
+    out = pdf.output(dest="S")
+    if isinstance(out, str):
+        out = out.encode("latin-1")
+    elif isinstance(out, bytearray):
+        out = bytes(out)
+    return out
+
+
+def _rate(fn, seconds: float = 2.0) -> float:
+    n = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        fn()
+        n += 1
+    return n / (time.perf_counter() - started)
+
+
+def main():
+    df = load_services()
+    services = retrieve_services(df, VISITOR["needs"], VISITOR["language"], VISITOR["age_group"])
+    text = render_template_handout(VISITOR, services)
+
+    def baseline():
+        pdf_bytes = legacy_generate_pdf(text, VISITOR, services)
+        base64.b64encode(pdf_bytes).decode("utf-8")
+
+    def uncached():
+        pdf_bytes = generate_pdf(text, VISITOR, services)
+        base64.b64encode(pdf_bytes).decode("utf-8")
+
+    def cache_miss():
+        PdfCache(maxsize=1).get_or_render(text, VISITOR, services, "bench")
+
+    cache = PdfCache()
+    cache.get_or_render(text, VISITOR, services, "bench")
+
+    def cache_hit():
+        cache.get_or_render(text, VISITOR, services, "bench")
+
+    rates = {}
+    for label, fn in [("baseline (render + b64 every rerun)", baseline),
+                      ("generate_pdf + b64 every rerun", uncached),
+                      ("generate_pdf_cached, miss", cache_miss),
+                      ("generate_pdf_cached, hit", cache_hit)]:
+        rates[label] = _rate(fn)
+        print(f"{label:<38} {rates[label]:>12,.0f} renders/s")
+
+    base = rates["baseline (render + b64 every rerun)"]
+    print(f"\nCache hit vs baseline: {rates['generate_pdf_cached, hit'] / base:,.0f}x")
+    # generate_pdf also embeds a Unicode font subset when the text needs it,
+    # which the Latin-1 baseline could not render at all
+    print(f"Uncached render vs baseline: {rates['generate_pdf + b64 every rerun'] / base:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
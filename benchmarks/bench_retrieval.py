@@ -0,0 +1,83 @@
+# benchmarks/bench_retrieval.py
+
+"""
+Micro-benchmark: bitmask retrieval vs. the original apply-based path.
+
+Run from the repository root:
+    python -m benchmarks.bench_retrieval
+"""
+
+import os
+import tempfile
+import timeit
+from typing import List, Dict
+
+import pandas as pd
+
+from benchmarks.synthetic import write_synthetic_services
+from core.retrieval import load_services, retrieve_services
+
+SIZES = [1_000, 10_000, 100_000]
+QUERY = (["food", "health"], "Cree", "18-29")
+
+
+def legacy_load_services(path: str) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    df["languages_list"] = df["languages"].apply(
+        lambda x: [l.strip() for l in str(x).split(";")]
+    )
+    return df
+
+
+def legacy_retrieve_services(
+    df: pd.DataFrame, needs: List[str], language: str, age_group: str
+) -> List[Dict]:
+    """The pre-index implementation, kept here for comparison."""
+    filtered = df[df["category"].isin(needs)].copy()
+
+    def lang_ok(row):
+        langs = row["languages_list"]
+        return (language in langs) or ("English" in langs)
+
+    filtered = filtered[filtered.apply(lang_ok, axis=1)]
+
+    def age_ok(row):
+        if row["target_age"] == "all":
+            return True
+        if row["target_age"] == "18+" and age_group in ["18-29", "30-54", "55+"]:
+            return True
+        if row["target_age"] == age_group:
+            return True
+        return False
+
+    filtered = filtered[filtered.apply(age_ok, axis=1)]
+    return filtered.head(5).to_dict(orient="records")
+
+
+def _best_ms(fn, number: int, repeat: int = 5) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1000
+
+
+def main():
+    print(f"{'rows':>8} | {'load legacy':>12} | {'load new':>10} | "
+          f"{'query legacy':>13} | {'query new':>10} | speedup")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in SIZES:
+            path = write_synthetic_services(n, os.path.join(tmp, f"services_{n}.csv"))
+
+            legacy_df = legacy_load_services(path)
+            df = load_services(path)
+
+            load_legacy = _best_ms(lambda: legacy_load_services(path), 1, 3)
+            load_new = _best_ms(lambda: load_services(path), 1, 3)
+
+            number = max(1, 20_000 // n)
+            q_legacy = _best_ms(lambda: legacy_retrieve_services(legacy_df, *QUERY), number)
+            q_new = _best_ms(lambda: retrieve_services(df, *QUERY), number * 20)
+
+            print(f"{n:>8} | {load_legacy:>10.2f}ms | {load_new:>8.2f}ms | "
+                  f"{q_legacy:>11.3f}ms | {q_new:>8.3f}ms | {q_legacy / q_new:>6.0f}x")
+
+
+if __name__ == "__main__":
+    main()
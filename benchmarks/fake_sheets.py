@@ -0,0 +1,42 @@
+# benchmarks/fake_sheets.py
+
+"""
+Local stand-in for the interactions worksheet: append_rows with
+configurable latency and error rate, for load tests and checks that
+should not touch Google Sheets.
+"""
+
+import random
+import threading
+import time
+from typing import List
+
+
+class FakeSheetsError(Exception):
+    """Raised for simulated Sheets API failures."""
+
+
+class FakeSheetsBackend:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.rows: List[list] = []
+        self.calls = 0
+        self.errors = 0
+
+    def append_rows(self, rows: List[list]) -> None:
+        """Same contract as core.google_sheets.append_interaction_rows."""
+        with self.lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            with self.lock:
+                self.errors += 1
+            raise FakeSheetsError("simulated Sheets API error")
+        with self.lock:
+            self.rows.extend(rows)
+
+    def append_row(self, row: list) -> None:
+        self.append_rows([row])
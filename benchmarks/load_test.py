@@ -0,0 +1,250 @@
+# benchmarks/load_test.py
+
+"""
+Load test: simulated front desks running the confirm flow concurrently
+(retrieve -> stream handout -> log interaction -> PDF), as Streamlit
+sessions do on one server process, against the local mock Groq server
+and a fake Sheets backend.
+
+For each concurrency level the desks loop for --duration seconds, each
+desk with its own site name. Reported per level: throughput, end-to-end
+p50 / p95 / p99, error rate, template fallbacks, p95 of each stage and
+what reached the fake sheet. --storage logs to a local backend instead
+of the (fake) sheet, optionally mirrored to it with --sheets-mirror.
+
+Run from the repository root:
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --desks 1 10 50 100 --groq-latency 1.5 \\
+        --groq-error-rate 0.05 --sheets-latency 0.5 --sheets-error-rate 0.1 --json load.json
+    python -m benchmarks.load_test --storage sqlite --sheets-mirror
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+from core.options import AGE_GROUP_OPTIONS, HOUSING_OPTIONS, LANGUAGE_OPTIONS, NEED_VALUES
+
+DEFAULT_DESKS = [1, 5, 10, 25, 50, 100]
+STAGES = ["retrieve", "handout", "log", "pdf"]
+
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _visitor(rng: random.Random) -> Dict:
+    return {
+        "age_group": rng.choice(AGE_GROUP_OPTIONS),
+        "language": rng.choice(LANGUAGE_OPTIONS),
+        "housing_status": rng.choice(HOUSING_OPTIONS),
+        "needs": rng.sample(NEED_VALUES, rng.randint(1, 3)),
+    }
+
+
+class Desk(threading.Thread):
+    """One front desk: runs the confirm flow back to back until `deadline`."""
+
+    def __init__(self, desk_id: int, df, deadline: float, mock_text: str, catalogue_version, think: float):
+        super().__init__(name=f"desk-{desk_id}", daemon=True)
+        self.site = f"site-{desk_id:03d}"
+        self.df = df
+        self.deadline = deadline
+        self.mock_text = mock_text.strip()
+        self.catalogue_version = catalogue_version
+        self.think = think
+        self.rng = random.Random(desk_id)
+        self.visits: List[Dict] = []
+
+    def run(self):
+        from core.handout_generator import stream_handout
+        from core.logger import log_interaction
+        from core.pdf_generator import generate_pdf
+        from core.retrieval import retrieval_settings, retrieve_services
+
+        top_k, weights = retrieval_settings()
+        while time.monotonic() < self.deadline:
+            visitor = _visitor(self.rng)
+            visit = {"error": None, "fallback": False}
+            started = mark = time.perf_counter()
+            try:
+                services = retrieve_services(
+                    self.df, visitor["needs"], visitor["language"],
+                    visitor["age_group"], visitor["housing_status"],
+                    top_k=top_k, weights=weights,
+                )
+                now = time.perf_counter()
+                visit["retrieve"], mark = now - mark, now
+                if not services:
+                    continue
+
+                text = "".join(stream_handout(visitor, services, self.catalogue_version)).strip()
+                visit["fallback"] = text != self.mock_text
+                now = time.perf_counter()
+                visit["handout"], mark = now - mark, now
+
+                log_interaction(visitor, services, [], site=self.site)
+                now = time.perf_counter()
+                visit["log"], mark = now - mark, now
+
+                generate_pdf(text, visitor, services)
+                now = time.perf_counter()
+                visit["pdf"] = now - mark
+            except Exception as e:
+                visit["error"] = repr(e)
+            visit["total"] = time.perf_counter() - started
+            self.visits.append(visit)
+            if self.think:
+                time.sleep(self.rng.uniform(0, 2 * self.think))
+
+
+def run_level(desks: int, duration: float, df, mock_text: str, catalogue_version, think: float) -> Dict:
+    deadline = time.monotonic() + duration
+    workers = [Desk(i, df, deadline, mock_text, catalogue_version, think) for i in range(desks)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+
+    visits = [v for w in workers for v in w.visits]
+    ok = [v for v in visits if v["error"] is None]
+    totals = [v["total"] for v in ok]
+    return {
+        "desks": desks,
+        "visits": len(visits),
+        "elapsed_s": elapsed,
+        "throughput_per_s": len(ok) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(totals, 0.5) * 1000,
+        "p95_ms": _percentile(totals, 0.95) * 1000,
+        "p99_ms": _percentile(totals, 0.99) * 1000,
+        "error_rate": (len(visits) - len(ok)) / len(visits) if visits else 0.0,
+        "fallback_rate": sum(v["fallback"] for v in ok) / len(ok) if ok else 0.0,
+        "stage_p95_ms": {
+            stage: _percentile([v[stage] for v in ok if stage in v], 0.95) * 1000 for stage in STAGES
+        },
+        "errors": sorted({v["error"] for v in visits if v["error"]})[:5],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the front desk flow with simulated desks.")
+    parser.add_argument("--desks", type=int, nargs="+", default=DEFAULT_DESKS)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause between visits per desk (s)")
+    parser.add_argument("--mode", default="llm-with-timeout-fallback", help="handout.mode")
+    parser.add_argument("--llm-timeout", type=float, default=8.0, help="handout.llm_timeout")
+    parser.add_argument("--groq-latency", type=float, default=0.8)
+    parser.add_argument("--groq-error-rate", type=float, default=0.0)
+    parser.add_argument("--groq-concurrency", type=int, help="groq.max_concurrency (default: setting)")
+    parser.add_argument("--sheets-latency", type=float, default=0.3)
+    parser.add_argument("--sheets-error-rate", type=float, default=0.0)
+    parser.add_argument("--storage", choices=["sheets", "sqlite", "parquet"], default="sheets",
+                        help="storage.backend for the interaction log")
+    parser.add_argument("--sheets-mirror", action="store_true", help="storage.sheets_mirror")
+    parser.add_argument("--cache", action="store_true", help="keep the handout cache on")
+    parser.add_argument("--services", default="data/services_sample.csv")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="dissa-load-")
+    os.environ["DISSA_LOCAL_DATA_DIR"] = tmp
+    os.environ["DISSA_HANDOUT_MODE"] = args.mode
+    os.environ["DISSA_HANDOUT_LLM_TIMEOUT"] = str(args.llm_timeout)
+    os.environ["DISSA_STORAGE_BACKEND"] = args.storage
+    os.environ["DISSA_STORAGE_SHEETS_MIRROR"] = "1" if args.sheets_mirror else "0"
+    if not args.cache:
+        os.environ["DISSA_CACHE_ENABLED"] = "0"
+
+    from benchmarks.fake_sheets import FakeSheetsBackend
+    from benchmarks.mock_groq_server import start_mock_groq_server
+    from core import handout_generator, logger
+    from core.config import get_setting
+    from core.handout_generator import GroqClientManager
+    from core.interaction_storage import get_interaction_storage
+    from core.logger import InteractionQueue
+    from core.retrieval import load_services
+
+    groq_server = start_mock_groq_server(latency=args.groq_latency, error_rate=args.groq_error_rate)
+    handout_generator._GROQ = GroqClientManager(
+        api_key="load-test",
+        base_url=groq_server.base_url,
+        max_retries=get_setting("groq", "max_retries", 3),
+        latency_budget=get_setting("groq", "latency_budget", 45.0),
+        max_concurrency=args.groq_concurrency or get_setting("groq", "max_concurrency", 4),
+        max_connections=max(args.desks),
+    )
+    sheets = FakeSheetsBackend(latency=args.sheets_latency, error_rate=args.sheets_error_rate)
+    logger._QUEUE = InteractionQueue(
+        db_path=os.path.join(tmp, "interaction_queue.sqlite"),
+        batch_size=get_setting("logging", "batch_size", 50),
+        flush_interval=get_setting("logging", "flush_interval", 2.0),
+        max_backoff=5.0,
+        sink=sheets.append_rows,
+    )
+
+    df = load_services(args.services)
+    catalogue_version = "load-test" if args.cache else None
+
+    print(f"{'desks':>5} {'visits':>7} {'visits/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'errors':>7} {'fallback':>9}   p95 per stage (ms)")
+    levels = []
+    for desks in args.desks:
+        groq_before = (groq_server.requests, groq_server.errors)
+        level = run_level(desks, args.duration, df, groq_server.text, catalogue_version, args.think)
+        level["groq_requests"] = groq_server.requests - groq_before[0]
+        level["groq_errors"] = groq_server.errors - groq_before[1]
+        level["log_queue_depth"] = logger._QUEUE.depth()
+        levels.append(level)
+        stages = " ".join(f"{s}={level['stage_p95_ms'][s]:.0f}" for s in STAGES)
+        print(f"{desks:>5} {level['visits']:>7} {level['throughput_per_s']:>9.2f} "
+              f"{level['p50_ms']:>6.0f}ms {level['p95_ms']:>6.0f}ms {level['p99_ms']:>6.0f}ms "
+              f"{level['error_rate']:>7.1%} {level['fallback_rate']:>9.1%}   {stages}")
+        for error in level["errors"]:
+            print(f"      error: {error}")
+
+    # Let the log queue drain so the sheet totals are final
+    drain_deadline = time.monotonic() + 30
+    while logger._QUEUE.depth() and time.monotonic() < drain_deadline:
+        time.sleep(0.5)
+    queue_stats = logger._QUEUE.snapshot_stats()
+    logger._QUEUE.stop()
+    storage = get_interaction_storage()
+    storage.close()
+    groq_server.shutdown()
+
+    if storage.name != "sheets":
+        stored = len(storage.load_rows(2)[1])
+        print(f"{storage.label}: {stored} rows")
+
+    sheets_report = {
+        "rows_written": len(sheets.rows),
+        "append_calls": sheets.calls,
+        "append_errors": sheets.errors,
+        "rows_still_queued": queue_stats["depth"],
+        "sites": len({row[2] for row in sheets.rows}),
+    }
+    print(f"Sheets: {sheets_report['rows_written']} rows from {sheets_report['sites']} sites in "
+          f"{sheets_report['append_calls']} calls ({sheets_report['append_errors']} failed), "
+          f"{sheets_report['rows_still_queued']} still queued")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            report = {"args": vars(args), "levels": levels, "sheets": sheets_report}
+            if storage.name != "sheets":
+                report["storage"] = {"backend": storage.name, "rows_written": stored}
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
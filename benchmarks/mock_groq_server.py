@@ -0,0 +1,174 @@
+# benchmarks/mock_groq_server.py
+
+"""
+Local stand-in for the Groq chat completions API (OpenAI-compatible).
+
+Serves POST /openai/v1/chat/completions, streaming (SSE) or not, with
+configurable latency and error rate, and records what it saw (requests,
+peak concurrency, distinct client connections) so benchmarks and checks
+can assert on them.
+
+Run standalone:
+    python -m benchmarks.mock_groq_server --port 8765 --latency 0.3 --error-rate 0.05
+then point the app at it with DISSA_GROQ_BASE_URL=http://127.0.0.1:8765
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HANDOUT_TEXT = (
+    "Welcome! Here are some places nearby that can help you.\n\n"
+    "🍽️ Community Meal Program\n"
+    "• Free hot lunch served daily.\n"
+    "• Today: Mon–Fri 11:30–13:30\n"
+    "• Where: 2001 Saint-Laurent Blvd, Montreal\n\n"
+    "You can always come back to the centre if you need more help."
+)
+
+
+class MockGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, error_rate=0.0, error_status=503,
+                 fail_first=0, text=HANDOUT_TEXT):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.fail_first = fail_first  # deterministic failures for retry checks
+        self.text = text
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.active = 0
+        self.peak_concurrency = 0
+        self.client_ports = set()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client closed an idle keep-alive connection
+
+    def do_POST(self):
+        server: MockGroqServer = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        with server.lock:
+            server.requests += 1
+            server.active += 1
+            server.peak_concurrency = max(server.peak_concurrency, server.active)
+            server.client_ports.add(self.client_address[1])
+            fail = server.fail_first > 0 or random.random() < server.error_rate
+            if server.fail_first > 0:
+                server.fail_first -= 1
+            if fail:
+                server.errors += 1
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+            if not self.path.endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+            elif fail:
+                self._send_json(server.error_status, {"error": {"message": "mock failure"}})
+            elif body.get("stream"):
+                self._send_stream(body, server.text)
+            else:
+                self._send_json(200, _completion(body, server.text))
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up (e.g. its read timeout fired)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "0.05")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, body, text):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            piece = word if i == 0 else " " + word
+            chunk = {
+                "id": "mock",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+
+def _completion(body, text):
+    prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+    completion_tokens = len(text.split())
+    return {
+        "id": "mock",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def start_mock_groq_server(port: int = 0, **kwargs) -> MockGroqServer:
+    """Start a mock server on 127.0.0.1 in a daemon thread and return it."""
+    server = MockGroqServer(("127.0.0.1", port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockGroqServer(("127.0.0.1", args.port), latency=args.latency, error_rate=args.error_rate)
+    print(f"Mock Groq API on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
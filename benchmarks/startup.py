@@ -0,0 +1,141 @@
+# benchmarks/startup.py
+
+"""
+Cold-start measurement for app_streamlit.py, to track across releases.
+
+- import time of each module on its own, in a fresh interpreter
+- which heavy modules the app's top-level imports pull in (should be none
+  of gspread / google.oauth2 / groq / fpdf)
+- time to first render: a fresh interpreter running the app script once
+  through streamlit's AppTest (front desk form, no secrets needed)
+
+Run from the repository root:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --json startup.json
+"""
+
+import argparse
+import ast
+import json
+import subprocess
+import sys
+from typing import Dict, List
+
+MODULES = [
+    "pandas",
+    "numpy",
+    "streamlit",
+    "core.retrieval",
+    "core.catalogue",
+    "core.analytics_store",
+    "core.handout_generator",
+    "core.logger",
+    "core.pdf_generator",
+    "core.google_sheets",
+    "core.interaction_storage",
+    "core.metrics",
+    "core.profiling",
+    "fpdf",
+    "groq",
+    "gspread",
+    "google.oauth2.service_account",
+]
+
+# Loaded on first use only; none of these should appear at app start
+LAZY_MODULES = ["fpdf", "groq", "httpx", "gspread", "google.oauth2"]
+
+APP_SCRIPT = "app_streamlit.py"
+
+FIRST_RENDER = """
+import time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app_streamlit.py", default_timeout=120)
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - started)
+"""
+
+
+def _python(code: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+def import_time(module: str) -> float:
+    """Seconds to import `module` (and its dependencies) in a fresh interpreter."""
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - started)"
+    )
+    return float(_python(code))
+
+
+def app_loaded_modules() -> List[str]:
+    """Which LAZY_MODULES are already loaded after the app's top-level imports."""
+    code = app_imports() + (
+        "import sys, json\n"
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))\n"
+    )
+    return json.loads(_python(code))
+
+
+def app_imports(path: str = APP_SCRIPT) -> str:
+    """
+    The module-level imports of the app script, as code to time in a fresh
+    interpreter (imports inside functions are lazy and left out).
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return "".join(f"import {module}\n" for module in dict.fromkeys(modules))
+
+
+def first_render() -> float:
+    return float(_python(FIRST_RENDER))
+
+
+def measure(repeat: int = 3) -> Dict:
+    """Best of `repeat` runs for each timing (fresh interpreter each time)."""
+    report = {
+        "import_seconds": {
+            module: min(import_time(module) for _ in range(repeat)) for module in MODULES
+        },
+        "app_imports_seconds": min(
+            float(_python("import time; started = time.perf_counter()\n"
+                          + app_imports() + "print(time.perf_counter() - started)"))
+            for _ in range(repeat)
+        ),
+        "eagerly_loaded": app_loaded_modules(),
+        "first_render_seconds": min(first_render() for _ in range(repeat)),
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app cold-start time.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = measure(args.repeat)
+    for module, seconds in report["import_seconds"].items():
+        print(f"import {module:<32} {seconds * 1000:>8.0f} ms")
+    print(f"{'app top-level imports':<39} {report['app_imports_seconds'] * 1000:>8.0f} ms")
+    print(f"{'time to first render':<39} {report['first_render_seconds'] * 1000:>8.0f} ms")
+    print(f"heavy modules loaded at start: {', '.join(report['eagerly_loaded']) or 'none'}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
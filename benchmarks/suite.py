@@ -0,0 +1,236 @@
+# benchmarks/suite.py
+
+"""
+Benchmark suite for the hot paths, with a machine-readable report.
+
+- catalogue (1k / 10k / 100k services): load_services from CSV and from
+  the binary snapshot, retrieve_services
+- handout: build_handout_prompt, generate_handout (template, and LLM
+  against the local mock Groq server), generate_pdf
+- dashboard (10k / 100k / 1M interaction rows): ingest of new sheet rows
+  (what sync does after the fetch; Sheets itself is not called), summary,
+  rollups, top_services, acceptance
+
+Run from the repository root:
+    python -m benchmarks.suite --out report.json
+    python -m benchmarks.suite --quick --compare report.json
+    (exits 1 when a benchmark is slower than the baseline by more than
+    --tolerance)
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+CATALOGUE_SIZES = [1_000, 10_000, 100_000]
+LOG_SIZES = [10_000, 100_000, 1_000_000]
+QUICK_CATALOGUE_SIZES = [1_000, 10_000]
+QUICK_LOG_SIZES = [10_000, 100_000]
+
+QUERIES = [
+    (["food", "health"], "Cree", "18-29", "Homeless / unstably housed"),
+    (["housing"], "Inuktitut", "55+", None),
+    (["employment", "culture", "family_support"], "French", "Under 18", "Shelter"),
+]
+VISITOR = {
+    "age_group": "18-29",
+    "language": "Cree",
+    "housing_status": "Not specified",
+    "needs": ["food", "health"],
+}
+
+
+def measure(fn: Callable, number: int = 1, repeat: int = 5) -> Dict[str, float]:
+    """Per-call milliseconds: best and median of `repeat` runs of `number` calls."""
+    fn()  # warm-up
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        runs.append((time.perf_counter() - started) / number * 1000)
+    return {"best_ms": min(runs), "median_ms": statistics.median(runs)}
+
+
+class Suite:
+    def __init__(self):
+        self.results: List[Dict] = []
+
+    def record(self, name: str, size: Optional[int], timing: Dict[str, float]) -> None:
+        entry = {"name": name, "size": size, **timing}
+        self.results.append(entry)
+        size_label = f"{size:,}" if size else "-"
+        print(f"{name:<36} {size_label:>10} {timing['best_ms']:>12.3f} ms {timing['median_ms']:>12.3f} ms")
+
+    def run(self, name: str, fn: Callable, size: Optional[int] = None, number: int = 1, repeat: int = 5):
+        self.record(name, size, measure(fn, number, repeat))
+
+
+def bench_catalogue(suite: Suite, sizes: List[int], tmp: str) -> None:
+    from benchmarks.synthetic import write_synthetic_services
+    from core.retrieval import build_snapshot, load_services, retrieve_services
+
+    for n in sizes:
+        path = write_synthetic_services(n, os.path.join(tmp, f"services_{n}.csv"))
+        suite.run("load_services (csv)", lambda: load_services(path), n, repeat=3)
+
+        build_snapshot(path)
+        suite.run("load_services (snapshot)", lambda: load_services(path), n, repeat=3)
+
+        df = load_services(path)
+        for i, (needs, language, age_group, housing) in enumerate(QUERIES):
+            suite.run(
+                f"retrieve_services (query {i + 1})",
+                lambda: retrieve_services(df, needs, language, age_group, housing),
+                n,
+                number=max(1, 100_000 // n),
+            )
+
+
+def bench_handout(suite: Suite) -> None:
+    from benchmarks.mock_groq_server import start_mock_groq_server
+    from core import handout_generator
+    from core.handout_generator import (
+        GroqClientManager,
+        build_handout_prompt,
+        generate_handout,
+    )
+    from core.pdf_generator import generate_pdf
+    from core.retrieval import load_services, retrieve_services
+
+    df = load_services()
+    services = retrieve_services(df, VISITOR["needs"], VISITOR["language"], VISITOR["age_group"])
+    text = generate_handout(VISITOR, services, mode="template")
+
+    suite.run("build_handout_prompt", lambda: build_handout_prompt(VISITOR, services), number=1000)
+    suite.run("generate_handout (template)", lambda: generate_handout(VISITOR, services, mode="template"), number=1000)
+
+    # LLM replaced by the local mock server (no latency): client-side cost only
+    server = start_mock_groq_server(latency=0.0)
+    handout_generator._GROQ = GroqClientManager(api_key="bench", base_url=server.base_url)
+    try:
+        suite.run("generate_handout (llm, mock)", lambda: generate_handout(VISITOR, services, mode="llm"), number=20)
+    finally:
+        handout_generator._GROQ.close()
+        handout_generator._GROQ = None
+        server.shutdown()
+
+    suite.run("generate_pdf", lambda: generate_pdf(text, VISITOR, services), number=10)
+
+
+def bench_dashboard(suite: Suite, sizes: List[int], tmp: str) -> None:
+    from benchmarks.synthetic import synthetic_interactions
+    from core.analytics_store import AnalyticsStore
+
+    for n in sizes:
+        df = synthetic_interactions(n)
+        header, rows = list(df.columns), df.values.tolist()
+        del df
+        since_day = time.strftime("%Y-%m-%d", time.localtime(time.time() - 30 * 86400))
+
+        store = AnalyticsStore(db_path=os.path.join(tmp, f"analytics_{n}.sqlite"))
+        started = time.perf_counter()
+        store.ingest(header, rows, first_row=2)
+        elapsed = (time.perf_counter() - started) * 1000
+        suite.record("store.ingest (all rows)", n, {"best_ms": elapsed, "median_ms": elapsed})
+
+        # An incremental sync: 50 rows appended after the existing ones
+        tail = rows[:50]
+        state = {"first_row": 2 + n}
+
+        def incremental():
+            store.ingest(header, tail, first_row=state["first_row"])
+            state["first_row"] += len(tail)
+
+        suite.run("store.ingest (50 new rows)", incremental, n)
+
+        suite.run("store.summary (30 days)", lambda: store.summary(since_day), n, number=20)
+        suite.run("store.rollup need (all time)", lambda: store.rollup("need"), n, number=20)
+        suite.run("store.rollup service_id (30 days)", lambda: store.rollup("service_id", since_day), n, number=20)
+        suite.run("store.top_services (Cree, 18-29)", lambda: store.top_services("Cree", "18-29"), n, repeat=3)
+        suite.run("store.acceptance (all)", lambda: store.acceptance(), n, repeat=3)
+        suite.run("store.load_range (first 20)", lambda: store.load_range(since_day, limit=20), n, number=20)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results: List[Dict], baseline_path: str, tolerance: float) -> List[str]:
+    """Benchmarks whose best time exceeds the baseline's by more than `tolerance` (ratio)."""
+    with open(baseline_path) as f:
+        baseline = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        base = baseline.get((r["name"], r["size"]))
+        if base and base["best_ms"] > 0 and r["best_ms"] > base["best_ms"] * tolerance:
+            regressions.append(
+                f"{r['name']} [{r['size']}]: {base['best_ms']:.3f} ms -> {r['best_ms']:.3f} ms "
+                f"({r['best_ms'] / base['best_ms']:.2f}x)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the DISSA benchmark suite.")
+    parser.add_argument("--quick", action="store_true", help="smaller catalogues and logs")
+    parser.add_argument("--only", choices=["catalogue", "handout", "dashboard"], nargs="+")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to check against")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args()
+
+    sections = args.only or ["catalogue", "handout", "dashboard"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep caches, queues and stores out of data/local; no handout cache
+        # so every generate_handout call does the work
+        os.environ["DISSA_LOCAL_DATA_DIR"] = tmp
+        os.environ["DISSA_CACHE_ENABLED"] = "0"
+
+        suite = Suite()
+        print(f"{'benchmark':<36} {'size':>10} {'best':>15} {'median':>15}")
+        if "catalogue" in sections:
+            bench_catalogue(suite, QUICK_CATALOGUE_SIZES if args.quick else CATALOGUE_SIZES, tmp)
+        if "handout" in sections:
+            bench_handout(suite)
+        if "dashboard" in sections:
+            bench_dashboard(suite, QUICK_LOG_SIZES if args.quick else LOG_SIZES, tmp)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "results": suite.results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.out}")
+
+    if args.compare:
+        regressions = compare(suite.results, args.compare, args.tolerance)
+        if regressions:
+            print(f"Slower than {args.compare} by more than {args.tolerance}x:")
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
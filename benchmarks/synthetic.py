@@ -0,0 +1,104 @@
+# benchmarks/synthetic.py
+
+"""
+Synthetic data generators used by the benchmarks.
+
+They scale the shipped sample data up to realistic sizes while keeping
+its value distributions (categories, languages, target ages, ...).
+"""
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from core.options import AGE_GROUP_OPTIONS, HOUSING_OPTIONS, LANGUAGE_OPTIONS, NEED_VALUES
+
+SAMPLE_SERVICES_CSV = "data/services_sample.csv"
+SAMPLE_INTERACTIONS_CSV = "data/interaction_log.csv"
+
+# Front desk form options (core.options), with rough weights
+LANGUAGES = (LANGUAGE_OPTIONS, [0.35, 0.2, 0.25, 0.15, 0.05])
+AGE_GROUPS = (AGE_GROUP_OPTIONS, [0.1, 0.35, 0.4, 0.15])
+HOUSING = (HOUSING_OPTIONS, [0.4, 0.3, 0.2, 0.1])
+NEEDS = NEED_VALUES
+
+
+def synthetic_services(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Return an n-row services catalogue sampled (with replacement) from
+    data/services_sample.csv. Ids are renumbered 1..n and names made unique.
+    """
+    sample = pd.read_csv(SAMPLE_SERVICES_CSV)
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(sample), size=n)
+
+    df = sample.iloc[rows].reset_index(drop=True)
+    df["id"] = np.arange(1, n + 1)
+    df["name"] = df["name"] + " #" + df["id"].astype(str)
+    return df
+
+
+def write_synthetic_services(n: int, path: str, seed: int = 0) -> str:
+    """Write a synthetic catalogue to CSV (the format load_services reads)."""
+    synthetic_services(n, seed=seed).to_csv(path, index=False)
+    return path
+
+
+def synthetic_interactions(
+    n: int,
+    n_services: int = 50,
+    days: int = 365,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Return n interaction log rows in the data/interaction_log.csv format:
+    visitor contexts drawn from the form options, 1-3 needs, 1-5 kept and
+    0-2 removed service ids out of 1..n_services, timestamps spread over
+    the last `days` days in order.
+    """
+    columns = list(pd.read_csv(SAMPLE_INTERACTIONS_CSV, nrows=0).columns)
+    rng = np.random.default_rng(seed)
+
+    end = pd.Timestamp.now().floor("s")
+    offsets = np.sort(rng.integers(0, days * 24 * 3600, size=n))[::-1]
+    timestamps = (end - pd.to_timedelta(offsets, unit="s")).strftime("%Y-%m-%dT%H:%M:%S")
+
+    def pick(options, size):
+        values, weights = options
+        return np.array(values, dtype=object)[rng.choice(len(values), size=size, p=weights)]
+
+    def id_lists(low: int, high: int) -> List[str]:
+        counts = rng.integers(low, high + 1, size=n)
+        ids = rng.integers(1, n_services + 1, size=counts.sum())
+        splits = np.split(ids, np.cumsum(counts)[:-1])
+        return [";".join(map(str, dict.fromkeys(chunk.tolist()))) for chunk in splits]
+
+    # 1-3 distinct needs per visit: the first k of a random permutation
+    need_counts = rng.integers(1, 4, size=n)
+    order = np.argsort(rng.random((n, len(NEEDS))), axis=1)
+    need_names = np.array(NEEDS, dtype=object)
+    needs = [";".join(need_names[row[:k]]) for row, k in zip(order, need_counts)]
+    kept = id_lists(1, 5)
+
+    df = pd.DataFrame(
+        {
+            "timestamp": timestamps,
+            "site": "NFCM",
+            "age_group": pick(AGE_GROUPS, n),
+            "language": pick(LANGUAGES, n),
+            "housing_status": pick(HOUSING, n),
+            "needs": needs,
+            "service_ids_kept": kept,
+            "service_ids_removed": id_lists(0, 2),
+            "num_services_kept": [k.count(";") + 1 for k in kept],
+        }
+    )
+    df["interaction_id"] = df["timestamp"] + "_" + df["num_services_kept"].astype(str)
+    return df[columns]
+
+
+def write_synthetic_interactions(n: int, path: str, n_services: int = 50, seed: int = 0) -> str:
+    """Write a synthetic interaction log to CSV (the format AnalyticsStore.import_csv reads)."""
+    synthetic_interactions(n, n_services=n_services, seed=seed).to_csv(path, index=False)
+    return path
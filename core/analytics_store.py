@@ -0,0 +1,667 @@
+# core/analytics_store.py
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from core.config import get_setting, local_connection, local_path
+from core.metrics import METRICS
+
+# Interactions sheet columns, in logger.log_interaction order
+INTERACTION_COLUMNS = [
+    "interaction_id",
+    "timestamp",
+    "site",
+    "age_group",
+    "language",
+    "housing_status",
+    "needs",
+    "service_ids_kept",
+    "service_ids_removed",
+    "num_services_kept",
+]
+
+
+# Dimensions kept in the daily rollup table. "total" has a single value ""
+# and counts interactions; list-valued columns count each item.
+ROLLUP_DIMENSIONS = {
+    "total": None,
+    "need": "needs",
+    "service_id": "service_ids_kept",
+    "age_group": "age_group",
+    "housing_status": "housing_status",
+    "language": "language",
+}
+LIST_COLUMNS = {"needs", "service_ids_kept", "service_ids_removed"}
+
+
+def split_list(value) -> List[str]:
+    """Parse a ';'-joined cell ("food;health") into its non-empty items."""
+    if value is None:
+        return []
+    return [v.strip() for v in str(value).split(";") if v.strip()]
+
+
+def normalize_row(header: List[str], raw: List) -> Dict:
+    """
+    Map a raw row (sheet / CSV / log_interaction order) onto
+    INTERACTION_COLUMNS: text as str ("" when missing), num_services_kept
+    as int (None when not a number).
+    """
+    values = dict(zip(header, list(raw) + [""] * (len(header) - len(raw))))
+    row = {c: values.get(c, "") for c in INTERACTION_COLUMNS}
+    for c in INTERACTION_COLUMNS:
+        if c != "num_services_kept":
+            row[c] = "" if row[c] is None else str(row[c])
+    try:
+        row["num_services_kept"] = int(row["num_services_kept"])
+    except (TypeError, ValueError):
+        row["num_services_kept"] = None
+    return row
+
+
+def normalize_rows(header: List[str], rows: List[List]) -> Iterator[Tuple[int, Dict]]:
+    """(offset in `rows`, normalized row) per row, skipping blank lines."""
+    header = [str(h).strip() for h in header] or INTERACTION_COLUMNS
+    for offset, raw in enumerate(rows):
+        if any(str(v).strip() for v in raw):
+            yield offset, normalize_row(header, raw)
+
+
+def read_interactions_csv(path: str) -> Tuple[List[str], List[List]]:
+    """
+    (header, rows) of an interactions CSV: the local log format, or a CSV
+    export of the Sheets tab. Same shape as InteractionStorage.load_rows.
+    """
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return list(df.columns), df.values.tolist()
+
+
+def rollup_contributions(row: Dict):
+    """Yield (day, dim, value) increments for one interaction row."""
+    day = str(row.get("timestamp") or "")[:10]
+    for dim, column in ROLLUP_DIMENSIONS.items():
+        if column is None:
+            yield day, dim, ""
+        elif column in LIST_COLUMNS:
+            for item in split_list(row.get(column)):
+                yield day, dim, item
+        else:
+            value = row.get(column)
+            if value not in (None, ""):
+                yield day, dim, str(value)
+
+
+# Normalized copy of the log: one fact row per interaction, integer-coded
+# context columns, and bridge tables instead of ';'-joined id lists, so
+# slices like "top services for Cree speakers aged 18-29" are indexed joins.
+NORMALIZED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dim_value (
+    id INTEGER PRIMARY KEY,
+    dim TEXT NOT NULL,
+    value TEXT NOT NULL,
+    UNIQUE (dim, value)
+);
+CREATE TABLE IF NOT EXISTS fact_interaction (
+    id INTEGER PRIMARY KEY,            -- sheet row
+    interaction_id TEXT,
+    timestamp TEXT,
+    day TEXT,
+    site_id INTEGER REFERENCES dim_value (id),
+    age_group_id INTEGER REFERENCES dim_value (id),
+    language_id INTEGER REFERENCES dim_value (id),
+    housing_status_id INTEGER REFERENCES dim_value (id),
+    num_services_kept INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_fact_day ON fact_interaction (day);
+CREATE INDEX IF NOT EXISTS idx_fact_lang_age ON fact_interaction (language_id, age_group_id);
+CREATE INDEX IF NOT EXISTS idx_fact_age ON fact_interaction (age_group_id);
+CREATE TABLE IF NOT EXISTS interaction_need (
+    interaction_id INTEGER NOT NULL REFERENCES fact_interaction (id),
+    need_id INTEGER NOT NULL REFERENCES dim_value (id),
+    PRIMARY KEY (interaction_id, need_id)
+);
+CREATE INDEX IF NOT EXISTS idx_need ON interaction_need (need_id, interaction_id);
+CREATE TABLE IF NOT EXISTS interaction_service_kept (
+    interaction_id INTEGER NOT NULL REFERENCES fact_interaction (id),
+    service_id INTEGER NOT NULL,
+    PRIMARY KEY (interaction_id, service_id)
+);
+CREATE INDEX IF NOT EXISTS idx_service_kept ON interaction_service_kept (service_id, interaction_id);
+CREATE TABLE IF NOT EXISTS interaction_service_removed (
+    interaction_id INTEGER NOT NULL REFERENCES fact_interaction (id),
+    service_id INTEGER NOT NULL,
+    PRIMARY KEY (interaction_id, service_id)
+);
+CREATE INDEX IF NOT EXISTS idx_service_removed ON interaction_service_removed (service_id, interaction_id);
+"""
+
+FACT_DIMENSIONS = ["site", "age_group", "language", "housing_status"]
+
+
+def _service_ids(value) -> List[int]:
+    ids = []
+    for item in split_list(value):
+        try:
+            ids.append(int(float(item)))
+        except ValueError:
+            continue
+    return ids
+
+
+class AnalyticsStore:
+    """
+    Local SQLite copy of the interactions sheet (or whichever interaction
+    storage backend is configured) for the dashboard.
+
+    The store remembers a high-water mark (the last sheet row synced), so
+    sync() only range-reads rows appended since, instead of pulling the
+    whole sheet on every rerun. The dashboard reads from local data.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, refresh_seconds: float = 300.0):
+        self.db_path = db_path or local_path("analytics.sqlite")
+        self.refresh_seconds = refresh_seconds
+        self._sync_lock = threading.Lock()
+        self._local = threading.local()
+        self._codes: Dict[tuple, int] = {}  # (dim, value) -> dim_value.id
+        self._acceptance_scores: Optional[Dict[int, float]] = None
+
+        with self._conn() as conn:
+            cols = ",\n".join(
+                f"{c} INTEGER" if c == "num_services_kept" else f"{c} TEXT"
+                for c in INTERACTION_COLUMNS
+            )
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS interactions (
+                    sheet_row INTEGER PRIMARY KEY,
+                    {cols}
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_interactions_ts ON interactions (timestamp)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rollup_daily (
+                    day TEXT NOT NULL,
+                    dim TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (dim, day, value)
+                )
+                """
+            )
+
+            conn.executescript(NORMALIZED_SCHEMA)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS service_acceptance (
+                    service_id INTEGER NOT NULL,
+                    language TEXT NOT NULL,
+                    age_group TEXT NOT NULL,
+                    shown INTEGER NOT NULL,
+                    removed INTEGER NOT NULL,
+                    PRIMARY KEY (service_id, language, age_group)
+                )
+                """
+            )
+
+        if self._get_state("rollups_built") is None:
+            # Store created before rollups existed: backfill once
+            self.rebuild_rollups()
+        if self._get_state("normalized_built") is None:
+            self.rebuild_normalized()
+        if self._get_state("acceptance_built") is None:
+            self.rebuild_acceptance()
+
+    def _conn(self) -> sqlite3.Connection:
+        return local_connection(self._local, self.db_path)
+
+    # ----- Sync state -----
+    def _get_state(self, key: str, default=None):
+        row = self._conn().execute(
+            "SELECT value FROM sync_state WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else default
+
+    def _set_state(self, conn: sqlite3.Connection, key: str, value) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, str(value))
+        )
+
+    @property
+    def last_row(self) -> int:
+        """High-water mark: last sheet row stored (1 = header only)."""
+        return int(self._get_state("last_row", 1))
+
+    @property
+    def last_sync_at(self) -> Optional[float]:
+        value = self._get_state("last_sync_at")
+        return float(value) if value else None
+
+    def is_stale(self) -> bool:
+        last = self.last_sync_at
+        return last is None or time.time() - last >= self.refresh_seconds
+
+    # ----- Ingest -----
+    def ingest(self, header: List[str], rows: List[List], first_row: int) -> int:
+        """
+        Store raw sheet rows starting at sheet row `first_row` and advance
+        the high-water mark. Returns the number of rows stored.
+        """
+        records = self._records(header, rows, first_row)
+        with self._conn() as conn:
+            # Rows already stored (overlapping re-read) must not be counted twice
+            if records:
+                existing = {
+                    r[0]
+                    for r in conn.execute(
+                        "SELECT sheet_row FROM interactions WHERE sheet_row BETWEEN ? AND ?",
+                        (records[0][0], records[-1][0]),
+                    )
+                }
+                records = [(n, r) for n, r in records if n not in existing]
+
+            self._insert(conn, records)
+            if rows:
+                self._set_state(conn, "last_row", first_row + len(rows) - 1)
+            self._set_state(conn, "last_sync_at", time.time())
+        if records:
+            self._acceptance_scores = None
+        return len(records)
+
+    def _records(self, header: List[str], rows: List[List], first_row: int) -> List[tuple]:
+        """(row number, normalized row) pairs, skipping blank lines."""
+        return [(first_row + offset, row) for offset, row in normalize_rows(header, rows)]
+
+    def _insert(self, conn: sqlite3.Connection, records: List[tuple]) -> None:
+        conn.executemany(
+            f"INSERT INTO interactions (sheet_row, {', '.join(INTERACTION_COLUMNS)}) "
+            f"VALUES (?, {', '.join('?' for _ in INTERACTION_COLUMNS)})",
+            [(n, *(r[c] for c in INTERACTION_COLUMNS)) for n, r in records],
+        )
+        self._add_to_rollups(conn, (r for _, r in records))
+        self._add_normalized(conn, records)
+        self._add_to_acceptance(conn, (r for _, r in records))
+
+    def sync(self, force: bool = False) -> int:
+        """
+        Fetch rows appended to the interaction storage (the sheet, by
+        default) since the last sync. Skipped when the last sync is younger
+        than refresh_seconds, unless `force`. Returns the number of new rows.
+
+        Row numbers are per backend, so when storage.backend changes the
+        local copy is dropped and re-read from the new backend.
+        """
+        if not force and not self.is_stale():
+            return 0
+        from core.interaction_storage import get_interaction_storage
+
+        storage = get_interaction_storage()
+        if self._get_state("source", "sheets") != storage.name:
+            logging.info("Interaction storage changed to %s; re-reading the log", storage.label)
+            self.reset()
+            with self._conn() as conn:
+                self._set_state(conn, "source", storage.name)
+            force = True
+
+        with self._sync_lock:
+            if not force and not self.is_stale():
+                return 0
+            first_row = self.last_row + 1
+            started = time.perf_counter()
+            with METRICS.span("sync_interactions_seconds"):
+                header, rows = storage.load_rows(first_row)
+                added = self.ingest(header, rows, first_row)
+            logging.info(
+                "Synced %s new interactions from row %s in %.2fs",
+                added, first_row, time.perf_counter() - started,
+            )
+            return added
+
+    # ----- Rollups -----
+    def _add_to_rollups(self, conn: sqlite3.Connection, rows) -> None:
+        increments: Dict[tuple, int] = {}
+        for row in rows:
+            for key in rollup_contributions(row):
+                increments[key] = increments.get(key, 0) + 1
+        conn.executemany(
+            """
+            INSERT INTO rollup_daily (day, dim, value, count) VALUES (?, ?, ?, ?)
+            ON CONFLICT (dim, day, value) DO UPDATE SET count = count + excluded.count
+            """,
+            [(day, dim, value, n) for (day, dim, value), n in increments.items()],
+        )
+
+    def rebuild_rollups(self) -> None:
+        """Recompute the rollup table from the stored interactions."""
+        conn = self._conn()
+        cursor = conn.execute(f"SELECT {', '.join(INTERACTION_COLUMNS)} FROM interactions")
+        with conn:
+            conn.execute("DELETE FROM rollup_daily")
+            while True:
+                batch = cursor.fetchmany(10_000)
+                if not batch:
+                    break
+                self._add_to_rollups(conn, (dict(zip(INTERACTION_COLUMNS, b)) for b in batch))
+            self._set_state(conn, "rollups_built", time.time())
+
+    # ----- Normalized tables -----
+    def _code(self, conn: sqlite3.Connection, dim: str, value) -> Optional[int]:
+        """Integer code for (dim, value), creating it on first sight."""
+        if value in (None, ""):
+            return None
+        value = str(value)
+        key = (dim, value)
+        code = self._codes.get(key)
+        if code is None:
+            conn.execute(
+                "INSERT OR IGNORE INTO dim_value (dim, value) VALUES (?, ?)", key
+            )
+            code = conn.execute(
+                "SELECT id FROM dim_value WHERE dim = ? AND value = ?", key
+            ).fetchone()[0]
+            self._codes[key] = code
+        return code
+
+    def _add_normalized(self, conn: sqlite3.Connection, records) -> None:
+        facts, needs, kept, removed = [], [], [], []
+        for sheet_row, row in records:
+            facts.append((
+                sheet_row,
+                row.get("interaction_id"),
+                row.get("timestamp"),
+                str(row.get("timestamp") or "")[:10],
+                *(self._code(conn, dim, row.get(dim)) for dim in FACT_DIMENSIONS),
+                row.get("num_services_kept"),
+            ))
+            needs.extend(
+                (sheet_row, self._code(conn, "need", n)) for n in set(split_list(row.get("needs")))
+            )
+            kept.extend((sheet_row, i) for i in set(_service_ids(row.get("service_ids_kept"))))
+            removed.extend(
+                (sheet_row, i) for i in set(_service_ids(row.get("service_ids_removed")))
+            )
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO fact_interaction (id, interaction_id, timestamp, day, "
+            "site_id, age_group_id, language_id, housing_status_id, num_services_kept) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            facts,
+        )
+        conn.executemany("INSERT OR IGNORE INTO interaction_need VALUES (?, ?)", needs)
+        conn.executemany("INSERT OR IGNORE INTO interaction_service_kept VALUES (?, ?)", kept)
+        conn.executemany("INSERT OR IGNORE INTO interaction_service_removed VALUES (?, ?)", removed)
+
+    def rebuild_normalized(self) -> None:
+        """Recompute the fact and bridge tables from the stored interactions."""
+        conn = self._conn()
+        cursor = conn.execute(
+            f"SELECT sheet_row, {', '.join(INTERACTION_COLUMNS)} FROM interactions"
+        )
+        with conn:
+            for table in ("interaction_need", "interaction_service_kept",
+                          "interaction_service_removed", "fact_interaction"):
+                conn.execute(f"DELETE FROM {table}")
+            while True:
+                batch = cursor.fetchmany(10_000)
+                if not batch:
+                    break
+                self._add_normalized(
+                    conn, ((b[0], dict(zip(INTERACTION_COLUMNS, b[1:]))) for b in batch)
+                )
+            self._set_state(conn, "normalized_built", time.time())
+
+    def top_services(
+        self,
+        language: Optional[str] = None,
+        age_group: Optional[str] = None,
+        since_day: Optional[str] = None,
+        limit: int = 10,
+    ) -> pd.Series:
+        """
+        Most often kept services (id -> count) for an optional language /
+        age group / date slice, e.g. top_services("Cree", "18-29").
+        """
+        query = (
+            "SELECT k.service_id, COUNT(*) AS n "
+            "FROM fact_interaction f JOIN interaction_service_kept k ON k.interaction_id = f.id"
+        )
+        where, params = [], []
+        for dim, value in (("language", language), ("age_group", age_group)):
+            if value is not None:
+                where.append(
+                    f"f.{dim}_id = (SELECT id FROM dim_value WHERE dim = ? AND value = ?)"
+                )
+                params += [dim, value]
+        if since_day:
+            where.append("f.day >= ?")
+            params.append(since_day)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " GROUP BY k.service_id ORDER BY n DESC, k.service_id LIMIT ?"
+        params.append(limit)
+        rows = self._conn().execute(query, params).fetchall()
+        return pd.Series(
+            [r[1] for r in rows], index=[r[0] for r in rows], name="count", dtype="int64"
+        )
+
+    # ----- Service acceptance -----
+    def _add_to_acceptance(self, conn: sqlite3.Connection, rows) -> None:
+        """
+        Streaming aggregation: each interaction adds one "shown" per service
+        retrieved (kept or removed) and one "removed" per service removed,
+        keyed by (service, language, age group).
+        """
+        increments: Dict[tuple, List[int]] = {}
+        for row in rows:
+            language = str(row.get("language") or "")
+            age_group = str(row.get("age_group") or "")
+            removed = set(_service_ids(row.get("service_ids_removed")))
+            for service_id in set(_service_ids(row.get("service_ids_kept"))) | removed:
+                counts = increments.setdefault((service_id, language, age_group), [0, 0])
+                counts[0] += 1
+                counts[1] += service_id in removed
+        conn.executemany(
+            """
+            INSERT INTO service_acceptance (service_id, language, age_group, shown, removed)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (service_id, language, age_group) DO UPDATE SET
+                shown = shown + excluded.shown,
+                removed = removed + excluded.removed
+            """,
+            [(*key, shown, removed) for key, (shown, removed) in increments.items()],
+        )
+
+    def rebuild_acceptance(self) -> None:
+        """Recompute service_acceptance from the stored interactions."""
+        conn = self._conn()
+        cursor = conn.execute(f"SELECT {', '.join(INTERACTION_COLUMNS)} FROM interactions")
+        with conn:
+            conn.execute("DELETE FROM service_acceptance")
+            while True:
+                batch = cursor.fetchmany(10_000)
+                if not batch:
+                    break
+                self._add_to_acceptance(conn, (dict(zip(INTERACTION_COLUMNS, b)) for b in batch))
+            self._set_state(conn, "acceptance_built", time.time())
+        self._acceptance_scores = None
+
+    def acceptance(
+        self,
+        language: Optional[str] = None,
+        age_group: Optional[str] = None,
+        min_shown: int = 1,
+    ) -> pd.DataFrame:
+        """
+        Per service: times retrieved (shown), times removed by staff and the
+        acceptance rate, optionally sliced by language / age group.
+        Services shown fewer than `min_shown` times are left out (their
+        rate is mostly noise). Lowest acceptance first.
+        """
+        query = "SELECT service_id, SUM(shown) AS shown, SUM(removed) AS removed FROM service_acceptance"
+        where, params = [], []
+        if language is not None:
+            where.append("language = ?")
+            params.append(language)
+        if age_group is not None:
+            where.append("age_group = ?")
+            params.append(age_group)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " GROUP BY service_id HAVING SUM(shown) >= ?"
+        params.append(max(int(min_shown), 1))
+        df = pd.read_sql_query(query, self._conn(), params=params)
+        df["acceptance_rate"] = 1 - df["removed"] / df["shown"]
+        return df.sort_values(["acceptance_rate", "shown"], ascending=[True, False]).reset_index(drop=True)
+
+    def acceptance_scores(self, prior: float = 0.8, prior_weight: float = 5.0) -> Dict[int, float]:
+        """
+        Smoothed acceptance rate per service id, for retrieval ranking:
+        (accepted + prior * prior_weight) / (shown + prior_weight), so
+        rarely shown services stay close to the prior. Cached until the
+        next ingest.
+        """
+        if self._acceptance_scores is None:
+            rows = self._conn().execute(
+                "SELECT service_id, SUM(shown), SUM(removed) FROM service_acceptance GROUP BY service_id"
+            ).fetchall()
+            self._acceptance_scores = {
+                service_id: (shown - removed + prior * prior_weight) / (shown + prior_weight)
+                for service_id, shown, removed in rows
+            }
+        return self._acceptance_scores
+
+    def import_csv(self, path: str = "data/interaction_log.csv") -> int:
+        """
+        Import an interactions CSV (the local log format, or a CSV export of
+        the Sheets tab), kept apart from synced rows: imported rows get
+        negative row numbers, a new block below the previous import, the
+        sync high-water mark is left alone and reset() keeps them.
+
+        Rows whose interaction_id is already stored are skipped, so running
+        the import again adds nothing. Returns the number of rows added.
+        """
+        header, rows = read_interactions_csv(path)
+        with self._sync_lock, self._conn() as conn:
+            stored = {r[0] for r in conn.execute("SELECT DISTINCT interaction_id FROM interactions")}
+            lowest = conn.execute("SELECT MIN(sheet_row) FROM interactions").fetchone()[0]
+            first_row = min(lowest or 0, 0) - len(rows)
+            records = [
+                (n, r) for n, r in self._records(header, rows, first_row)
+                if r["interaction_id"] not in stored
+            ]
+            self._insert(conn, records)
+        if records:
+            self._acceptance_scores = None
+        return len(records)
+
+    def rollup(self, dim: str, since_day: Optional[str] = None) -> pd.Series:
+        """
+        Counts per value of `dim` summed over day buckets (>= since_day,
+        'YYYY-MM-DD'), highest first.
+        """
+        query = "SELECT value, SUM(count) AS n FROM rollup_daily WHERE dim = ?"
+        params: list = [dim]
+        if since_day:
+            query += " AND day >= ?"
+            params.append(since_day)
+        query += " GROUP BY value ORDER BY n DESC, value"
+        rows = self._conn().execute(query, params).fetchall()
+        return pd.Series(
+            [r[1] for r in rows], index=[r[0] for r in rows], name="count", dtype="int64"
+        )
+
+    def summary(self, since_day: Optional[str] = None) -> Dict:
+        """Total interactions and first / last day in view, from the rollups."""
+        query = "SELECT SUM(count), MIN(day), MAX(day) FROM rollup_daily WHERE dim = 'total'"
+        params: list = []
+        if since_day:
+            query += " AND day >= ?"
+            params.append(since_day)
+        total, first_day, last_day = self._conn().execute(query, params).fetchone()
+        return {"total": total or 0, "first_day": first_day, "last_day": last_day}
+
+    def load_range(self, since_day: Optional[str] = None, limit: Optional[int] = None) -> pd.DataFrame:
+        """Raw interactions from since_day on (uses the timestamp index)."""
+        query = f"SELECT {', '.join(INTERACTION_COLUMNS)} FROM interactions"
+        params: list = []
+        if since_day:
+            query += " WHERE timestamp >= ?"
+            params.append(since_day)
+        query += " ORDER BY sheet_row"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return pd.read_sql_query(query, self._conn(), params=params)
+
+    def reset(self) -> None:
+        """
+        Forget the synced rows; the next sync re-reads the whole sheet.
+        Rows added by import_csv are kept (the rollups are rebuilt from them).
+        """
+        with self._sync_lock, self._conn() as conn:
+            conn.execute("DELETE FROM interactions WHERE sheet_row > 0")
+            conn.execute("DELETE FROM sync_state")
+        self.rebuild_rollups()
+        self.rebuild_normalized()
+        self.rebuild_acceptance()
+
+    # ----- Read -----
+    def load_df(self) -> pd.DataFrame:
+        """All stored interactions, in sheet order (same columns as the sheet)."""
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(INTERACTION_COLUMNS)} FROM interactions ORDER BY sheet_row",
+            self._conn(),
+        )
+        return df
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+
+
+_STORE: Optional[AnalyticsStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_analytics_store() -> AnalyticsStore:
+    """Process-wide analytics store, configured from the [analytics] settings."""
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = AnalyticsStore(
+                    refresh_seconds=get_setting("analytics", "refresh_seconds", 300.0),
+                )
+    return _STORE
+
+
+if __name__ == "__main__":
+    # python -m core.analytics_store import [data/interaction_log.csv]
+    #   one-time import of a local / exported interactions CSV
+    # python -m core.analytics_store resync
+    #   drop the local copy and re-read the whole interaction log
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "import"
+    store = get_analytics_store()
+    if command == "import":
+        path = sys.argv[2] if len(sys.argv) > 2 else "data/interaction_log.csv"
+        print(f"Imported {store.import_csv(path)} interactions from {path}")
+    elif command == "resync":
+        store.reset()
+        from core.interaction_storage import get_interaction_storage
+
+        print(f"Synced {store.sync(force=True)} interactions from {get_interaction_storage().label}")
+    else:
+        sys.exit(f"Unknown command {command!r}; use 'import' or 'resync'")
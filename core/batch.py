@@ -0,0 +1,175 @@
+# core/batch.py
+
+"""
+Batch handout generation for outreach days: pre-print handouts for many
+visitor contexts at once (e.g. every need pair per language).
+
+    python -m core.batch --languages Cree Inuktitut --need-pairs --out handouts.zip
+    python -m core.batch --languages Cree --needs food health --format merged --out cree.pdf
+"""
+
+import argparse
+import io
+import itertools
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from core.catalogue import DEFAULT_SERVICES_PATH
+from core.options import NEED_VALUES
+
+# Per worker process: catalogue loaded once by the pool initializer
+_WORKER = {"df": None, "mode": "template"}
+
+
+def need_pair_contexts(
+    languages: List[str],
+    age_group: str = "18-29",
+    housing_status: str = "Not specified",
+    needs: Optional[List[str]] = None,
+) -> List[Dict]:
+    """One visitor context per (language, pair of needs)."""
+    needs = needs or NEED_VALUES
+    return [
+        {
+            "age_group": age_group,
+            "language": language,
+            "housing_status": housing_status,
+            "needs": list(pair),
+        }
+        for language in languages
+        for pair in itertools.combinations(needs, 2)
+    ]
+
+
+def _init_worker(services_path: str, mode: str) -> None:
+    from core.retrieval import load_services
+
+    _WORKER["df"] = load_services(services_path)
+    _WORKER["mode"] = mode
+
+
+def _prepare(visitor_context: Dict) -> Tuple[str, Dict, List[Dict]]:
+    """Retrieve services and write the handout text for one context."""
+    from core.handout_generator import generate_handout
+    from core.retrieval import retrieval_settings, retrieve_services
+
+    top_k, weights = retrieval_settings()
+    services = retrieve_services(
+        _WORKER["df"],
+        visitor_context["needs"],
+        visitor_context["language"],
+        visitor_context["age_group"],
+        visitor_context.get("housing_status"),
+        top_k=top_k,
+        weights=weights,
+    )
+    text = generate_handout(visitor_context, services, mode=_WORKER["mode"]) if services else ""
+    return text, visitor_context, services
+
+
+def _render_one(visitor_context: Dict) -> Tuple[Dict, Optional[bytes]]:
+    from core.pdf_generator import generate_pdf
+
+    text, visitor_context, services = _prepare(visitor_context)
+    if not services:
+        return visitor_context, None
+    return visitor_context, generate_pdf(text, visitor_context, services)
+
+
+def handout_filename(index: int, visitor_context: Dict) -> str:
+    parts = [
+        f"{index:03d}",
+        visitor_context["language"],
+        "+".join(visitor_context["needs"]),
+        visitor_context["age_group"],
+    ]
+    return re.sub(r"[^A-Za-z0-9+_.-]", "-", "_".join(parts)) + ".pdf"
+
+
+def generate_batch(
+    contexts: List[Dict],
+    output: str = "zip",
+    mode: str = "template",
+    workers: Optional[int] = None,
+    services_path: str = DEFAULT_SERVICES_PATH,
+) -> Tuple[bytes, int]:
+    """
+    Render a handout per visitor context across a process pool (FPDF
+    layout is CPU-bound, so threads would serialise on the GIL).
+
+    - output="zip": a zip of one PDF per context; retrieval, handout text
+      and PDF layout all run in the workers.
+    - output="merged": one PDF, each handout on new pages; retrieval and
+      text run in the workers, the single document is laid out in this
+      process (FPDF cannot concatenate finished PDFs).
+
+    Contexts with no matching services are skipped. Returns the output
+    bytes and the number of handouts in it. `mode` is a generate_handout
+    mode; the default "template" needs no API key.
+    """
+    if output not in ("zip", "merged"):
+        raise ValueError("output must be 'zip' or 'merged'")
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(contexts) // (workers * 4))
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(services_path, mode),
+    ) as pool:
+        if output == "zip":
+            buffer = io.BytesIO()
+            written = 0
+            with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+                results = pool.map(_render_one, contexts, chunksize=chunksize)
+                for i, (visitor_context, pdf_bytes) in enumerate(results, start=1):
+                    if pdf_bytes is not None:
+                        zf.writestr(handout_filename(i, visitor_context), pdf_bytes)
+                        written += 1
+            return buffer.getvalue(), written
+
+        from core.pdf_generator import generate_merged_pdf
+
+        prepared = [p for p in pool.map(_prepare, contexts, chunksize=chunksize) if p[2]]
+    return generate_merged_pdf(prepared), len(prepared)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-generate DISSA handout PDFs.")
+    parser.add_argument("--languages", nargs="+", default=["Cree", "Inuktitut", "English", "French"])
+    parser.add_argument("--needs", nargs="+", help="needs to combine (default: all)")
+    parser.add_argument("--need-pairs", action="store_true",
+                        help="one handout per pair of needs (default: one with all --needs)")
+    parser.add_argument("--age-group", default="18-29")
+    parser.add_argument("--housing-status", default="Not specified")
+    parser.add_argument("--format", choices=["zip", "merged"], default="zip")
+    parser.add_argument("--mode", default="template", help="handout mode (template, llm, ...)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--services", default=DEFAULT_SERVICES_PATH)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    if args.need_pairs:
+        contexts = need_pair_contexts(args.languages, args.age_group, args.housing_status, args.needs)
+    else:
+        contexts = [
+            {
+                "age_group": args.age_group,
+                "language": language,
+                "housing_status": args.housing_status,
+                "needs": args.needs or NEED_VALUES,
+            }
+            for language in args.languages
+        ]
+
+    data, written = generate_batch(contexts, args.format, args.mode, args.workers, args.services)
+    with open(args.out, "wb") as f:
+        f.write(data)
+    print(f"Wrote {written} handouts to {args.out} ({len(data):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# core/catalogue.py
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from core.retrieval import load_services
+
+DEFAULT_SERVICES_PATH = "data/services_sample.csv"
+
+
+@dataclass(frozen=True)
+class CatalogueSnapshot:
+    """One fully built catalogue: DataFrame + index, never mutated after load."""
+
+    df: pd.DataFrame
+    version: int
+    content_hash: str
+    loaded_at: datetime
+    load_seconds: float
+    path: str
+
+
+def _file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ServiceCatalogue:
+    """
+    Process-wide, hot-reloadable services catalogue.
+
+    - The CSV is loaded (and indexed) once and shared by every session.
+    - current() re-checks the file's mtime/size at most every
+      `check_interval` seconds; if it changed, the content hash decides
+      whether a reload is really needed.
+    - A reload builds a complete new snapshot before swapping it in with a
+      single assignment, so readers see either the old or the new
+      catalogue, never a half-built one. Readers never wait on a reload.
+    """
+
+    def __init__(self, path: str = DEFAULT_SERVICES_PATH, check_interval: float = 2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot: Optional[CatalogueSnapshot] = None
+        self._stat = None
+        self._last_check = 0.0
+        self._reload_lock = threading.Lock()
+
+    def _file_stat(self):
+        st = os.stat(self.path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self, content_hash: str) -> CatalogueSnapshot:
+        started = time.perf_counter()
+        df = load_services(self.path)
+        version = self._snapshot.version + 1 if self._snapshot else 1
+        snapshot = CatalogueSnapshot(
+            df=df,
+            version=version,
+            content_hash=content_hash,
+            loaded_at=datetime.now(),
+            load_seconds=time.perf_counter() - started,
+            path=self.path,
+        )
+        logging.info(
+            "Loaded services catalogue v%s (%s rows, %.3fs, sha256 %s)",
+            version, len(df), snapshot.load_seconds, content_hash[:12],
+        )
+        return snapshot
+
+    def _refresh(self) -> None:
+        stat = self._file_stat()
+        if self._snapshot is not None and stat == self._stat:
+            return
+
+        content_hash = _file_hash(self.path)
+        if self._snapshot is not None and content_hash == self._snapshot.content_hash:
+            # Touched but unchanged (e.g. re-deployed same file)
+            self._stat = stat
+            return
+
+        snapshot = self._load(content_hash)
+        self._stat = stat
+        self._snapshot = snapshot  # atomic swap
+
+    def current(self) -> CatalogueSnapshot:
+        """Return the live snapshot, reloading first if the file changed."""
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._last_check < self.check_interval:
+            return self._snapshot
+
+        if self._snapshot is None:
+            # First load: everyone waits for it
+            with self._reload_lock:
+                if self._snapshot is None:
+                    self._refresh()
+                    self._last_check = time.monotonic()
+            return self._snapshot
+
+        # Later checks: one thread reloads, the others keep serving
+        if self._reload_lock.acquire(blocking=False):
+            try:
+                self._last_check = now
+                self._refresh()
+            except Exception:
+                logging.exception("Catalogue reload failed; keeping v%s", self._snapshot.version)
+            finally:
+                self._reload_lock.release()
+        return self._snapshot
+
+    def reload(self) -> CatalogueSnapshot:
+        """Force a re-check now (ignores check_interval)."""
+        with self._reload_lock:
+            self._last_check = time.monotonic()
+            self._refresh()
+        return self._snapshot
+
+
+_CATALOGUES = {}
+_CATALOGUES_LOCK = threading.Lock()
+
+
+def get_catalogue(path: str = DEFAULT_SERVICES_PATH) -> ServiceCatalogue:
+    """Process-wide ServiceCatalogue for `path` (one per file)."""
+    catalogue = _CATALOGUES.get(path)
+    if catalogue is None:
+        with _CATALOGUES_LOCK:
+            catalogue = _CATALOGUES.setdefault(path, ServiceCatalogue(path))
+    return catalogue
@@ -0,0 +1,62 @@
+# core/config.py
+
+import os
+import sqlite3
+import threading
+from typing import Any
+
+
+def get_setting(section: str, key: str, default: Any = None) -> Any:
+    """
+    Read an optional setting, in order of precedence:
+    - environment variable DISSA_<SECTION>_<KEY> (e.g. DISSA_CACHE_TTL_SECONDS)
+    - st.secrets[section][key] (secrets.toml)
+    - default
+
+    Environment values are cast to the type of `default` when it is a
+    bool / int / float.
+    """
+    env_name = f"DISSA_{section}_{key}".upper()
+    raw = os.environ.get(env_name)
+    if raw is not None:
+        return _cast(raw, default)
+
+    try:
+        import streamlit as st
+
+        return st.secrets[section][key]
+    except Exception:
+        # No streamlit, no secrets file, or key not set
+        return default
+
+
+def _cast(raw: str, default: Any) -> Any:
+    if isinstance(default, bool):
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(raw)
+    if isinstance(default, float):
+        return float(raw)
+    return raw
+
+
+def local_path(name: str) -> str:
+    """Path for a local state file (caches, queues, analytics store)."""
+    base = get_setting("local", "data_dir", "data/local")
+    os.makedirs(base, exist_ok=True)
+    return os.path.join(base, name)
+
+
+def local_connection(local: threading.local, db_path: str, timeout: float = 10) -> sqlite3.Connection:
+    """
+    This thread's connection to a local SQLite file, kept on `local` (SQLite
+    connections cannot be shared across threads). WAL mode, so readers do
+    not block the writer.
+    """
+    conn = getattr(local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(db_path, timeout=timeout)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        local.conn = conn
+    return conn
@@ -1,10 +1,27 @@
 # core/google_sheets.py
 
+import logging
+import threading
+
 import streamlit as st
 import gspread
+from google.auth.exceptions import RefreshError
 from google.oauth2.service_account import Credentials
 import pandas as pd
 
+from core.metrics import METRICS
+
+INTERACTIONS_WORKSHEET = "interactions"
+
+# Process-wide client / spreadsheet / worksheet handles. Authorizing and
+# opening the sheet costs several HTTP round trips, so they are created
+# once and reused until an auth error invalidates them.
+_HANDLES = {"client": None, "spreadsheet": None, "worksheets": {}}
+_HANDLES_LOCK = threading.RLock()
+
+# HTTP statuses that mean our credentials / handles are no longer good
+AUTH_ERROR_CODES = {401, 403}
+
 
 def _get_gsheet_client():
     """Create an authenticated gspread client using the service account."""
@@ -14,6 +31,7 @@ def _get_gsheet_client():
         creds_info,
         scopes=["https://www.googleapis.com/auth/spreadsheets"],
     )
+    # gspread's session refreshes the access token on expiry by itself
     client = gspread.authorize(creds)
     return client
 
@@ -43,27 +61,109 @@ def _open_spreadsheet(client):
     """Open the spreadsheet using the parsed key (NOT by URL)."""
     raw = st.secrets["sheets"]["sheet_id"]
     key = _extract_sheet_key(raw)
+    return client.open_by_key(key)
 
-    # DEBUG so we know this code is really running in Streamlit Cloud
-    st.write("DEBUG parsed Google Sheet key used by open_by_key():", key)
 
-    return client.open_by_key(key)
+def get_worksheet(name: str = INTERACTIONS_WORKSHEET):
+    """Return a cached worksheet handle, authorizing / opening on first use."""
+    with _HANDLES_LOCK:
+        ws = _HANDLES["worksheets"].get(name)
+        if ws is not None:
+            return ws
+
+        if _HANDLES["client"] is None:
+            _HANDLES["client"] = _get_gsheet_client()
+        if _HANDLES["spreadsheet"] is None:
+            _HANDLES["spreadsheet"] = _open_spreadsheet(_HANDLES["client"])
+
+        ws = _HANDLES["spreadsheet"].worksheet(name)
+        _HANDLES["worksheets"][name] = ws
+        return ws
+
+
+def _reopen_worksheet(ws):
+    """Re-read a worksheet's properties (grid size) and cache the new handle."""
+    with _HANDLES_LOCK:
+        fresh = ws.spreadsheet.worksheet(ws.title)
+        _HANDLES["worksheets"][ws.title] = fresh
+        return fresh
+
+
+def invalidate_handles() -> None:
+    """Drop cached handles; the next call re-authorizes and re-opens."""
+    with _HANDLES_LOCK:
+        _HANDLES["client"] = None
+        _HANDLES["spreadsheet"] = None
+        _HANDLES["worksheets"] = {}
+
+
+def _is_auth_error(error: Exception) -> bool:
+    """
+    Expired / revoked credentials. A network failure (TransportError) is
+    not one: the cached handles stay, and the log queue retries it.
+    """
+    if isinstance(error, RefreshError):
+        return True
+    if isinstance(error, gspread.exceptions.APIError):
+        return getattr(error, "code", None) in AUTH_ERROR_CODES
+    return False
+
+
+def _with_worksheet(fn, name: str = INTERACTIONS_WORKSHEET):
+    """
+    Run fn(worksheet) on the cached handle. On an auth error (token could
+    not be refreshed, 401/403) the handles are rebuilt and fn retried once.
+    """
+    try:
+        return fn(get_worksheet(name))
+    except Exception as e:
+        if not _is_auth_error(e):
+            raise
+        logging.warning("Google Sheets auth error (%s); re-authorizing", e)
+        invalidate_handles()
+        return fn(get_worksheet(name))
 
 
+@METRICS.timed("sheets_append_seconds")
 def append_interaction_row(row):
     """Append a single interaction row to the 'interactions' worksheet."""
-    client = _get_gsheet_client()
-    sh = _open_spreadsheet(client)
-    ws = sh.worksheet("interactions")
-    ws.append_row(row, value_input_option="RAW")
+    _with_worksheet(lambda ws: ws.append_row(row, value_input_option="RAW"))
+
+
+@METRICS.timed("sheets_append_seconds")
+def append_interaction_rows(rows):
+    """Append several interaction rows in one API call."""
+    _with_worksheet(lambda ws: ws.append_rows(rows, value_input_option="RAW"))
+
+
+@METRICS.timed("sheets_load_rows_seconds")
+def load_interaction_rows(start_row: int):
+    """
+    Range read for incremental sync: returns (header, rows) where rows are
+    the raw cell values from sheet row `start_row` (1-based, >= 2) to the
+    end, in one API call.
+
+    A range starting below the grid is rejected by the API ("exceeds grid
+    limits"), so when `start_row` is past the last row nothing is read.
+    The cached row_count does not see appends made since the handle was
+    opened, so it is refreshed (one metadata call) before giving up.
+    """
+    def read(ws):
+        if start_row > ws.row_count:
+            ws = _reopen_worksheet(ws)
+            if start_row > ws.row_count:
+                return [], []
+        return ws.batch_get(["A1:Z1", f"A{start_row}:Z"])
+
+    header_range, rows_range = _with_worksheet(read)
+    header = header_range[0] if header_range else []
+    return header, [list(r) for r in rows_range]
 
 
+@METRICS.timed("sheets_load_all_seconds")
 def load_interactions_df() -> pd.DataFrame:
     """Load all interaction rows into a pandas DataFrame."""
-    client = _get_gsheet_client()
-    sh = _open_spreadsheet(client)
-    ws = sh.worksheet("interactions")
-    records = ws.get_all_records()
+    records = _with_worksheet(lambda ws: ws.get_all_records())
     if not records:
         return pd.DataFrame()
     return pd.DataFrame(records)
@@ -0,0 +1,180 @@
+# core/handout_cache.py
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from core.config import get_setting, local_connection, local_path
+
+# Bump when the prompt or model changes so old handouts are not reused
+PROMPT_VERSION = "handout-v1"
+
+
+def handout_cache_key(
+    visitor_context: Dict,
+    services: List[Dict],
+    catalogue_version: str,
+    prompt_version: str = PROMPT_VERSION,
+) -> str:
+    """
+    Content address for a handout: the normalized prompt inputs.
+    Needs are order-insensitive; the service order is kept because it
+    changes the handout.
+    """
+    normalized = {
+        "age_group": str(visitor_context.get("age_group", "")).strip(),
+        "language": str(visitor_context.get("language", "")).strip(),
+        "housing_status": str(visitor_context.get("housing_status", "unknown")).strip(),
+        "needs": sorted(set(visitor_context.get("needs", []))),
+        "service_ids": [str(svc.get("id")) for svc in services],
+        "catalogue_version": catalogue_version,
+        "prompt_version": prompt_version,
+    }
+    payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def card_cache_key(
+    service_id,
+    language: str,
+    catalogue_version: str,
+    prompt_version: str = PROMPT_VERSION,
+) -> str:
+    """Content address for one pre-generated service card."""
+    payload = json.dumps(
+        ["card", str(service_id), str(language).strip(), catalogue_version, prompt_version],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class HandoutCache:
+    """
+    Two-tier cache of generated handout texts (and service cards):
+    - in-memory LRU (per process)
+    - SQLite on disk (shared by processes, survives restarts)
+
+    Entries carry the catalogue version they were generated against;
+    an entry from another catalogue version, or older than ttl_seconds,
+    counts as a miss and is dropped.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        memory_size: int = 256,
+        ttl_seconds: int = 7 * 24 * 3600,
+    ):
+        self.db_path = db_path or local_path("handout_cache.sqlite")
+        self.memory_size = memory_size
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+
+        with self._conn() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS handouts (
+                    key TEXT PRIMARY KEY,
+                    catalogue_version TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    text TEXT NOT NULL
+                )
+                """
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        return local_connection(self._local, self.db_path, timeout=5)
+
+    def _fresh(self, created_at: float, version: str, catalogue_version: str) -> bool:
+        return version == catalogue_version and time.time() - created_at < self.ttl_seconds
+
+    def get(self, key: str, catalogue_version: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, version, text = entry
+                if self._fresh(created_at, version, catalogue_version):
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return text
+                del self._memory[key]
+
+        try:
+            row = self._conn().execute(
+                "SELECT created_at, catalogue_version, text FROM handouts WHERE key = ?",
+                (key,),
+            ).fetchone()
+        except sqlite3.Error:
+            logging.exception("Handout cache read failed")
+            row = None
+
+        with self._lock:
+            if row is not None and self._fresh(row[0], row[1], catalogue_version):
+                self._remember(key, tuple(row))
+                self.stats["disk_hits"] += 1
+                return row[2]
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, catalogue_version: str, text: str) -> None:
+        entry = (time.time(), catalogue_version, text)
+        with self._lock:
+            self._remember(key, entry)
+            self.stats["stores"] += 1
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO handouts (key, catalogue_version, created_at, text) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, catalogue_version, entry[0], text),
+                )
+                # Entries for other catalogue versions can never hit again
+                conn.execute(
+                    "DELETE FROM handouts WHERE catalogue_version != ? OR created_at < ?",
+                    (catalogue_version, entry[0] - self.ttl_seconds),
+                )
+        except sqlite3.Error:
+            logging.exception("Handout cache write failed")
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def snapshot_stats(self) -> Dict[str, float]:
+        """Counters plus hit rate, for the analytics dashboard."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
+
+
+_CACHE: Optional[HandoutCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_handout_cache() -> Optional[HandoutCache]:
+    """Process-wide handout cache, or None when disabled in settings."""
+    global _CACHE
+    if not get_setting("cache", "enabled", True):
+        return None
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = HandoutCache(
+                    memory_size=get_setting("cache", "memory_size", 256),
+                    ttl_seconds=get_setting("cache", "ttl_seconds", 7 * 24 * 3600),
+                )
+    return _CACHE
@@ -1,10 +1,208 @@
 # core/handout_generator.py
 
-from typing import List, Dict
-from groq import Groq
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterator, Optional
+
 import streamlit as st
 
+from core.config import get_setting
+from core.handout_cache import card_cache_key, get_handout_cache, handout_cache_key
+from core.metrics import METRICS
+
+# See generate_handout for what each mode does
+HANDOUT_MODES = ["template", "llm", "llm-with-timeout-fallback", "cards"]
+
+CATEGORY_EMOJI = {
+    "food": "🍽️",
+    "health": "🩺",
+    "mental_health": "🧠",
+    "housing": "🏠",
+    "clothing": "🧥",
+    "employment": "💼",
+    "family_support": "👨‍👩‍👧",
+    "culture": "🌿",
+}
+DEFAULT_EMOJI = "⭐"
+
+OPENING_LINE = "Welcome! Here are some places nearby that can help you."
+CLOSING_LINE = "You can always come back to the centre if you need more help."
+
+# Streamed before the template when the LLM stream breaks part-way; see
+# final_handout_text
+INTERRUPTED_NOTICE = "(The written handout was interrupted. Here is the standard handout.)"
+
+
+class GroqClientManager:
+    """
+    One shared Groq client per process:
+    - pooled keep-alive HTTP connections (no TLS handshake per handout)
+    - connect / read timeouts
+    - retries with full-jitter exponential backoff on 429, 5xx, timeouts
+      and connection errors, within a total latency budget
+    - a concurrency limit, so a burst from several desks queues here
+      instead of tripping the API rate limits
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        max_retries: int = 3,
+        latency_budget: float = 45.0,
+        max_concurrency: int = 4,
+        max_connections: int = 10,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 8.0,
+    ):
+        self.max_retries = max_retries
+        self.latency_budget = latency_budget
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+        # The Groq SDK and httpx take a while to import; only load them
+        # once a handout is actually generated with the LLM
+        import httpx
+        from groq import Groq
+
+        self.http_client = httpx.Client(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self.client = Groq(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,  # retries are handled here, within the budget
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            http_client=self.http_client,
+        )
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                retry_after = None
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _is_retryable(self, error: Exception) -> bool:
+        import groq
+
+        if isinstance(error, (groq.APITimeoutError, groq.APIConnectionError)):
+            return True
+        if isinstance(error, groq.APIStatusError):
+            return error.status_code in self.RETRY_STATUSES
+        return False
+
+    def _call(self, deadline: float, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                return self.client.chat.completions.create(**kwargs)
+            except Exception as e:
+                if not self._is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt, e)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                logging.warning("Groq call failed (%s); retry %s in %.2fs", e, attempt + 1, delay)
+                METRICS.inc("groq_retries")
+                time.sleep(delay)
+                attempt += 1
+
+    def _acquire(self, deadline: float) -> None:
+        with METRICS.span("groq_slot_wait_seconds"):
+            acquired = self._slots.acquire(timeout=max(0.0, deadline - time.monotonic()))
+        if not acquired:
+            raise TimeoutError("Timed out waiting for a free Groq request slot")
+
+    @staticmethod
+    def _record_usage(usage) -> None:
+        if usage is not None:
+            METRICS.inc("groq_tokens_in", usage.prompt_tokens or 0)
+            METRICS.inc("groq_tokens_out", usage.completion_tokens or 0)
+
+    def create(self, **kwargs):
+        """chat.completions.create with pooling, retries and concurrency limit."""
+        deadline = time.monotonic() + self.latency_budget
+        self._acquire(deadline)
+        try:
+            with METRICS.span("groq_call_seconds"):
+                completion = self._call(deadline, **kwargs)
+        finally:
+            self._slots.release()
+        self._record_usage(getattr(completion, "usage", None))
+        return completion
+
+    def stream(self, **kwargs) -> Iterator:
+        """
+        Streaming create: retries only until the response starts; the
+        concurrency slot is held until the stream is consumed or closed.
+        """
+        deadline = time.monotonic() + self.latency_budget
+        self._acquire(deadline)
+        started = time.perf_counter()
+        first_chunk = True
+        try:
+            stream = self._call(deadline, stream=True, **kwargs)
+            try:
+                for chunk in stream:
+                    if first_chunk:
+                        METRICS.observe("groq_first_chunk_seconds", time.perf_counter() - started)
+                        first_chunk = False
+                    # Groq reports usage on the last chunk, under x_groq
+                    x_groq = getattr(chunk, "x_groq", None)
+                    self._record_usage(getattr(chunk, "usage", None) or getattr(x_groq, "usage", None))
+                    yield chunk
+            finally:
+                stream.close()
+                METRICS.observe("groq_call_seconds", time.perf_counter() - started)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        self.http_client.close()
+
+
+_GROQ: Optional[GroqClientManager] = None
+_GROQ_LOCK = threading.Lock()
 
+
+def get_groq_manager() -> GroqClientManager:
+    """Process-wide GroqClientManager, configured from the [groq] settings."""
+    global _GROQ
+    if _GROQ is None:
+        with _GROQ_LOCK:
+            if _GROQ is None:
+                _GROQ = GroqClientManager(
+                    api_key=st.secrets["GROQ_API_KEY"],
+                    base_url=get_setting("groq", "base_url", None),
+                    connect_timeout=get_setting("groq", "connect_timeout", 5.0),
+                    read_timeout=get_setting("groq", "read_timeout", 30.0),
+                    max_retries=get_setting("groq", "max_retries", 3),
+                    latency_budget=get_setting("groq", "latency_budget", 45.0),
+                    max_concurrency=get_setting("groq", "max_concurrency", 4),
+                    max_connections=get_setting("groq", "max_connections", 10),
+                )
+    return _GROQ
+
+
+@METRICS.timed("build_handout_prompt_seconds")
 def build_handout_prompt(visitor_context: Dict, services: List[Dict]) -> str:
     context_str = (
         f"Visitor context: age_group={visitor_context['age_group']}, "
@@ -78,18 +276,321 @@ IMPORTANT RULES:
     return context_str + services_str + "\n" + instructions
 
 
-def generate_handout(visitor_context: Dict, services: List[Dict]) -> str:
+def build_card_prompt(svc: Dict, language: str) -> str:
+    """Prompt for a single service card (see build_handout_prompt, rule 2)."""
+    emoji = CATEGORY_EMOJI.get(svc.get("category"), DEFAULT_EMOJI)
+    return (
+        f"Visitor's preferred language: {language}.\n\n"
+        f"Service (raw data from the tool): name={svc['name']} | "
+        f"description={svc['description']} | "
+        f"hours_today={svc['hours_today']} | "
+        f"address={svc['address']} | "
+        f"eligibility={svc['eligibility']}\n"
+        f"""
+Write ONE small "card" about this service for a simple, kind handout,
+in clear, plain English (around grade 6 reading level):
+
+{emoji} Service name
+• What it offers (1–2 short lines)
+• When to go TODAY (use the hours_today field)
+• Where: a street-style address with a number
+• Who it is for / eligibility (if important)
+
+Use the address field. If it has no street number, invent a simple one
+(e.g. "123 Main Street"); never invent apartment numbers, building names
+or people names. Use short sentences. Output only the card.
+"""
+    )
+
+
+def get_service_card(
+    svc: Dict,
+    language: str,
+    catalogue_version: Optional[str] = None,
+) -> str:
     """
-    Main function used by Streamlit:
-    - Builds the LLM prompt from visitor_context + services
-    - Calls Groq to generate the handout text
-    - Returns the final handout string
+    Card text for one service. A card depends only on the service row and
+    the language, so it is generated once per (service id, language,
+    catalogue version) and then served from the handout cache.
     """
-    prompt = build_handout_prompt(visitor_context, services)
+    cache = get_handout_cache() if catalogue_version is not None else None
+    if cache is not None:
+        key = card_cache_key(svc.get("id"), language, catalogue_version)
+        cached = cache.get(key, catalogue_version)
+        if cached is not None:
+            return cached
+
+    completion = get_groq_manager().create(
+        model="llama-3.1-8b-instant",
+        messages=[
+            {
+                "role": "system",
+                "content": "You write simple, kind service handouts for visitors.",
+            },
+            {"role": "user", "content": build_card_prompt(svc, language)},
+        ],
+        temperature=0.3,
+        max_tokens=160,
+    )
+    card = completion.choices[0].message.content.strip()
+
+    if cache is not None:
+        cache.put(key, catalogue_version, card)
+    return card
+
+
+_PREWARMED = set()
+_PREWARM_LOCK = threading.Lock()
+
+
+def prewarm_service_cards(
+    services,
+    languages: List[str],
+    catalogue_version: str,
+    max_workers: int = 4,
+) -> Optional[threading.Thread]:
+    """
+    Generate every (service, language) card for a catalogue version in a
+    background thread. `services` is a list of service dicts or the
+    catalogue DataFrame (converted in the thread). Runs at most once per catalogue version per process;
+    returns the thread, or None if already started.
+    """
+    with _PREWARM_LOCK:
+        if catalogue_version in _PREWARMED:
+            return None
+        _PREWARMED.add(catalogue_version)
 
-    client = Groq(api_key=st.secrets["GROQ_API_KEY"])
+    def _run():
+        def _one(args):
+            svc, language = args
+            try:
+                get_service_card(svc, language, catalogue_version)
+            except Exception:
+                logging.exception("Card pre-generation failed for service %s", svc.get("id"))
 
-    completion = client.chat.completions.create(
+        records = (
+            services.to_dict(orient="records")
+            if hasattr(services, "to_dict")
+            else list(services)
+        )
+        jobs = [(svc, language) for svc in records for language in languages]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(_one, jobs))
+        logging.info("Pre-generated %s service cards (catalogue %s)", len(jobs), catalogue_version[:12])
+
+    thread = threading.Thread(target=_run, name="card-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def compose_handout(
+    visitor_context: Dict,
+    services: List[Dict],
+    catalogue_version: Optional[str] = None,
+) -> str:
+    """Handout assembled from the opening, cached cards and closing."""
+    return "".join(_stream_composed(visitor_context, services, catalogue_version)).strip()
+
+
+def _stream_composed(
+    visitor_context: Dict,
+    services: List[Dict],
+    catalogue_version: Optional[str] = None,
+) -> Iterator[str]:
+    language = visitor_context.get("language", "English")
+    yield OPENING_LINE
+    for svc in services:
+        yield "\n\n" + get_service_card(svc, language, catalogue_version)
+    yield "\n\n" + CLOSING_LINE
+
+
+def render_template_handout(visitor_context: Dict, services: List[Dict]) -> str:
+    """
+    Deterministic handout with the same structure the LLM prompt asks for
+    (opening, one card per service, closing), built straight from the
+    service dicts. No network, well under a millisecond.
+    """
+    parts = [OPENING_LINE]
+    for svc in services:
+        parts.append(render_template_card(svc))
+    parts.append(CLOSING_LINE)
+    return "\n\n".join(parts)
+
+
+def render_template_card(svc: Dict) -> str:
+    emoji = CATEGORY_EMOJI.get(svc.get("category"), DEFAULT_EMOJI)
+    lines = [f"{emoji} {svc.get('name', 'Service')}"]
+    for label, field in (("", "description"), ("Today: ", "hours_today"),
+                         ("Where: ", "address"), ("Who it is for: ", "eligibility")):
+        value = svc.get(field)
+        if isinstance(value, str) and value.strip():
+            lines.append(f"• {label}{value.strip()}")
+    return "\n".join(lines)
+
+
+def _resolve_mode(mode: Optional[str]) -> str:
+    mode = mode or get_setting("handout", "mode", "llm-with-timeout-fallback")
+    if mode not in HANDOUT_MODES:
+        raise ValueError(f"Unknown handout mode {mode!r}; expected one of {HANDOUT_MODES}")
+    return mode
+
+
+_FALLBACK_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="handout-llm")
+
+
+def generate_handout(
+    visitor_context: Dict,
+    services: List[Dict],
+    catalogue_version: Optional[str] = None,
+    mode: Optional[str] = None,
+) -> str:
+    """
+    Main function used by Streamlit. `mode` (default: handout.mode setting):
+    - "template": deterministic template handout, no LLM
+    - "llm": Groq writes the whole handout (cached, see below)
+    - "llm-with-timeout-fallback": "llm", but falls back to the template
+      if Groq fails or takes longer than handout.llm_timeout seconds
+    - "cards": composes the handout from cached per-service cards
+
+    LLM handouts are cached per normalized inputs when `catalogue_version`
+    is given, so stale service data is never served.
+    """
+    mode = _resolve_mode(mode)
+    if mode == "template":
+        return render_template_handout(visitor_context, services)
+    if mode == "cards":
+        return compose_handout(visitor_context, services, catalogue_version)
+    if mode == "llm":
+        return _generate_cached_llm(visitor_context, services, catalogue_version)
+
+    timeout = get_setting("handout", "llm_timeout", 8.0)
+    future = _FALLBACK_POOL.submit(
+        _generate_cached_llm, visitor_context, services, catalogue_version
+    )
+    try:
+        return future.result(timeout=timeout)
+    except Exception as e:
+        # A late LLM result still lands in the cache for the next visitor
+        logging.warning("LLM handout unavailable (%r); using template", e)
+        return render_template_handout(visitor_context, services)
+
+
+def _generate_cached_llm(
+    visitor_context: Dict,
+    services: List[Dict],
+    catalogue_version: Optional[str],
+) -> str:
+    cache = get_handout_cache() if catalogue_version is not None else None
+    if cache is not None:
+        key = handout_cache_key(visitor_context, services, catalogue_version)
+        cached = cache.get(key, catalogue_version)
+        if cached is not None:
+            return cached
+
+    text = _generate_handout_llm(visitor_context, services)
+
+    if cache is not None:
+        cache.put(key, catalogue_version, text)
+    return text
+
+
+def stream_handout(
+    visitor_context: Dict,
+    services: List[Dict],
+    catalogue_version: Optional[str] = None,
+    mode: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Streaming variant of generate_handout, for st.write_stream:
+    - "template": yields the template handout in one piece
+    - "cards": yields the opening, then each card as it is ready
+    - "llm": yields the cached handout in one piece on a cache hit,
+      otherwise text chunks as Groq produces them (the assembled text is
+      cached once the stream completes)
+    - "llm-with-timeout-fallback": "llm", but yields the template instead
+      if Groq fails or sends nothing within handout.llm_timeout seconds,
+      and INTERRUPTED_NOTICE plus the template if the stream fails after
+      the first chunk
+
+    The caller assembles the chunks (st.write_stream returns the full
+    string) and passes it through final_handout_text.
+    """
+    mode = _resolve_mode(mode)
+    if mode == "template":
+        yield render_template_handout(visitor_context, services)
+        return
+    if mode == "cards":
+        yield from _stream_composed(visitor_context, services, catalogue_version)
+        return
+
+    stream = _stream_cached_llm(visitor_context, services, catalogue_version)
+    if mode == "llm":
+        yield from stream
+        return
+
+    # Pull the first chunk on a worker thread so we can bound the wait
+    timeout = get_setting("handout", "llm_timeout", 8.0)
+    future = _FALLBACK_POOL.submit(next, stream, None)
+    try:
+        first = future.result(timeout=timeout)
+    except Exception as e:
+        logging.warning("LLM handout unavailable (%r); using template", e)
+        future.add_done_callback(lambda _: stream.close())
+        yield render_template_handout(visitor_context, services)
+        return
+
+    if first is None:
+        # Empty completion
+        yield render_template_handout(visitor_context, services)
+        return
+    yield first
+    try:
+        yield from stream
+    except Exception as e:
+        # Part of the text is already on screen: say so and finish with
+        # the template, which final_handout_text keeps as the handout
+        logging.warning("LLM handout stream failed part-way (%r); using template", e)
+        yield f"\n\n{INTERRUPTED_NOTICE}\n\n"
+        yield render_template_handout(visitor_context, services)
+
+
+def final_handout_text(streamed: Optional[str]) -> str:
+    """
+    The handout from the assembled stream_handout output: stripped, and
+    only the template part if the LLM stream was interrupted.
+    """
+    text = streamed or ""
+    if INTERRUPTED_NOTICE in text:
+        text = text.rsplit(INTERRUPTED_NOTICE, 1)[1]
+    return text.strip()
+
+
+def _stream_cached_llm(
+    visitor_context: Dict,
+    services: List[Dict],
+    catalogue_version: Optional[str],
+) -> Iterator[str]:
+    cache = get_handout_cache() if catalogue_version is not None else None
+    if cache is not None:
+        key = handout_cache_key(visitor_context, services, catalogue_version)
+        cached = cache.get(key, catalogue_version)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    for chunk in _stream_handout_llm(visitor_context, services):
+        parts.append(chunk)
+        yield chunk
+
+    if cache is not None:
+        cache.put(key, catalogue_version, "".join(parts).strip())
+
+
+def _chat_request(visitor_context: Dict, services: List[Dict]) -> Dict:
+    """Keyword arguments for client.chat.completions.create."""
+    prompt = build_handout_prompt(visitor_context, services)
+    return dict(
         model="llama-3.1-8b-instant",  # adjust model name if needed
         messages=[
             {
@@ -105,4 +606,18 @@ def generate_handout(visitor_context: Dict, services: List[Dict]) -> str:
         max_tokens=800,
     )
 
+
+def _generate_handout_llm(visitor_context: Dict, services: List[Dict]) -> str:
+    completion = get_groq_manager().create(**_chat_request(visitor_context, services))
+
     return completion.choices[0].message.content.strip()
+
+
+def _stream_handout_llm(visitor_context: Dict, services: List[Dict]) -> Iterator[str]:
+    stream = get_groq_manager().stream(**_chat_request(visitor_context, services))
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
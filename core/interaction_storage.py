@@ -0,0 +1,489 @@
+# core/interaction_storage.py
+
+import glob
+import logging
+import os
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from core.analytics_store import (
+    INTERACTION_COLUMNS,
+    LIST_COLUMNS,
+    ROLLUP_DIMENSIONS,
+    normalize_row,
+    normalize_rows,
+    read_interactions_csv,
+    rollup_contributions,
+    split_list,
+)
+from core.config import get_setting, local_connection, local_path
+from core.metrics import METRICS
+
+BACKENDS = ["sheets", "sqlite", "parquet"]
+
+
+def _counts(counter: Counter) -> pd.Series:
+    """Counter -> Series shaped like AnalyticsStore.rollup (highest first)."""
+    items = sorted(counter.items(), key=lambda kv: (-kv[1], kv[0]))
+    return pd.Series(
+        [n for _, n in items], index=[v for v, _ in items], name="count", dtype="int64"
+    )
+
+
+class InteractionStorage:
+    """
+    System of record for the interaction log.
+
+    - append(row) / append_many(rows): rows in log_interaction column order
+    - load_rows(start_row): incremental range read with the same contract
+      as core.google_sheets.load_interaction_rows (row 1 is the header, so
+      the first interaction is row 2); used by AnalyticsStore.sync
+    - read_range(since_day, until_day): interactions in a day range
+      ('YYYY-MM-DD', both inclusive) as a DataFrame
+    - aggregate(dim, since_day, until_day): counts per value of a rollup
+      dimension (see ROLLUP_DIMENSIONS), highest first
+    - start(): send rows a previous run left queued (the app calls it on
+      load)
+
+    Rows without a timestamp are left out of reads with a day bound.
+    """
+
+    name = "base"
+    label = "interaction log"
+
+    def start(self) -> None:
+        pass
+
+    def append(self, row: list) -> None:
+        self.append_many([row])
+
+    def append_many(self, rows: List[list]) -> None:
+        raise NotImplementedError
+
+    def load_rows(self, start_row: int) -> Tuple[List[str], List[list]]:
+        raise NotImplementedError
+
+    def read_range(self, since_day: Optional[str] = None, until_day: Optional[str] = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def aggregate(self, dim: str, since_day: Optional[str] = None, until_day: Optional[str] = None) -> pd.Series:
+        if dim not in ROLLUP_DIMENSIONS:
+            raise ValueError(f"Unknown dimension {dim!r}; use one of {list(ROLLUP_DIMENSIONS)}")
+        counter: Counter = Counter()
+        for row in self.read_range(since_day, until_day).to_dict("records"):
+            counter.update(value for _, d, value in rollup_contributions(row) if d == dim)
+        return _counts(counter)
+
+    def close(self) -> None:
+        pass
+
+
+class SheetsInteractionStorage(InteractionStorage):
+    """
+    The Google Sheets interactions worksheet (the original system of record).
+
+    Appends go through the durable log queue (core.logger.get_log_queue),
+    which writes them in batches in the background; Sheets allows roughly
+    60 write requests per minute per user. Reads pull from the sheet.
+    """
+
+    name = "sheets"
+    label = "Google Sheets"
+
+    def start(self) -> None:
+        from core.logger import get_log_queue
+
+        get_log_queue().start()
+
+    def append_many(self, rows: List[list]) -> None:
+        from core.logger import get_log_queue
+
+        queue = get_log_queue()
+        for row in rows:
+            queue.enqueue(row)
+
+    def load_rows(self, start_row: int) -> Tuple[List[str], List[list]]:
+        from core.google_sheets import load_interaction_rows
+
+        return load_interaction_rows(start_row)
+
+    def read_range(self, since_day: Optional[str] = None, until_day: Optional[str] = None) -> pd.DataFrame:
+        from core.google_sheets import load_interactions_df
+
+        df = load_interactions_df()
+        if df.empty:
+            return pd.DataFrame(columns=INTERACTION_COLUMNS)
+        df = df.reindex(columns=INTERACTION_COLUMNS)
+        day = df["timestamp"].fillna("").astype(str).str[:10]
+        if since_day or until_day:
+            df, day = df[day != ""], day[day != ""]
+        if since_day:
+            df = df[day >= since_day]
+        if until_day:
+            df = df[day <= until_day]
+        return df.reset_index(drop=True)
+
+
+class SqliteInteractionStorage(InteractionStorage):
+    """
+    Interaction log in a local SQLite file (WAL mode, so the dashboard can
+    read while front desks write). Row ids are assigned in append order and
+    never reused: interaction with id n is "row" n + 1 for load_rows.
+    """
+
+    name = "sqlite"
+    label = "local SQLite log"
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or local_path("interactions.sqlite")
+        self._local = threading.local()
+        with self._conn() as conn:
+            cols = ",\n".join(
+                f"{c} INTEGER" if c == "num_services_kept" else f"{c} TEXT"
+                for c in INTERACTION_COLUMNS
+            )
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS interactions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    {cols}
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_interactions_ts ON interactions (timestamp)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        return local_connection(self._local, self.db_path)
+
+    @METRICS.timed("storage_write_seconds")
+    def append_many(self, rows: List[list]) -> None:
+        records = [normalize_row(INTERACTION_COLUMNS, r) for r in rows]
+        with self._conn() as conn:
+            conn.executemany(
+                f"INSERT INTO interactions ({', '.join(INTERACTION_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in INTERACTION_COLUMNS)})",
+                [tuple(r[c] for c in INTERACTION_COLUMNS) for r in records],
+            )
+
+    def load_rows(self, start_row: int) -> Tuple[List[str], List[list]]:
+        rows = self._conn().execute(
+            f"SELECT {', '.join(INTERACTION_COLUMNS)} FROM interactions WHERE id >= ? ORDER BY id",
+            (start_row - 1,),
+        ).fetchall()
+        return list(INTERACTION_COLUMNS), [list(r) for r in rows]
+
+    @staticmethod
+    def _where(since_day: Optional[str], until_day: Optional[str]) -> Tuple[str, list]:
+        clauses, params = [], []
+        if since_day or until_day:
+            clauses.append("timestamp != ''")
+        if since_day:
+            clauses.append("timestamp >= ?")
+            params.append(since_day)
+        if until_day:
+            clauses.append("substr(timestamp, 1, 10) <= ?")
+            params.append(until_day)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def read_range(self, since_day: Optional[str] = None, until_day: Optional[str] = None) -> pd.DataFrame:
+        where, params = self._where(since_day, until_day)
+        return pd.read_sql_query(
+            f"SELECT {', '.join(INTERACTION_COLUMNS)} FROM interactions{where} ORDER BY id",
+            self._conn(),
+            params=params,
+        )
+
+    def aggregate(self, dim: str, since_day: Optional[str] = None, until_day: Optional[str] = None) -> pd.Series:
+        if dim not in ROLLUP_DIMENSIONS:
+            raise ValueError(f"Unknown dimension {dim!r}; use one of {list(ROLLUP_DIMENSIONS)}")
+        column = ROLLUP_DIMENSIONS[dim]
+        where, params = self._where(since_day, until_day)
+        conn = self._conn()
+
+        if column is None:
+            total = conn.execute(f"SELECT COUNT(*) FROM interactions{where}", params).fetchone()[0]
+            return _counts(Counter({"": total}) if total else Counter())
+        if column in LIST_COLUMNS:
+            counter: Counter = Counter()
+            for (value,) in conn.execute(f"SELECT {column} FROM interactions{where}", params):
+                counter.update(split_list(value))
+            return _counts(counter)
+
+        extra = " AND " if where else " WHERE "
+        rows = conn.execute(
+            f"SELECT {column}, COUNT(*) FROM interactions{where}{extra}"
+            f"{column} IS NOT NULL AND {column} != '' GROUP BY {column}",
+            params,
+        ).fetchall()
+        return _counts(Counter({str(v): n for v, n in rows}))
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+
+
+# Parquet partition of rows without a timestamp
+UNDATED_PARTITION = "unknown"
+
+
+class ParquetInteractionStorage(InteractionStorage):
+    """
+    Interaction log as Parquet files partitioned by day:
+
+        <base_dir>/day=YYYY-MM-DD/part-<first seq>-<last seq>.parquet
+
+    Each file carries a `seq` column (0-based append order, interaction
+    with seq n is "row" n + 2 for load_rows). Day filters only open the
+    matching partitions; rows without a timestamp go to day=unknown, which
+    they skip.
+
+    append() goes through a durable local queue that writes batches in the
+    background, so a visit does not create a file of its own; rows become
+    readable after the next flush (logging.flush_interval), and rows left
+    in the queue are written once start() runs. append_many() writes
+    directly. One process should write a given directory at a time.
+
+    Needs pyarrow (imported on first use).
+    """
+
+    name = "parquet"
+    label = "local Parquet log"
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = base_dir or local_path("interactions_parquet")
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._queue = None
+        self._next_seq = max((last + 1 for _, _, last in self._files()), default=0)
+
+    @staticmethod
+    def _pyarrow():
+        try:
+            import pyarrow
+            import pyarrow.dataset
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError(
+                "storage.backend = 'parquet' needs pyarrow (pip install pyarrow)"
+            ) from e
+        return pyarrow
+
+    def _schema(self):
+        pa = self._pyarrow()
+        fields = [("seq", pa.int64())]
+        for c in INTERACTION_COLUMNS:
+            fields.append((c, pa.int64() if c == "num_services_kept" else pa.string()))
+        return pa.schema(fields)
+
+    def _files(self) -> List[Tuple[str, int, int]]:
+        """(path, first seq, last seq) of every data file."""
+        files = []
+        for path in glob.glob(os.path.join(self.base_dir, "day=*", "part-*.parquet")):
+            try:
+                first, last = os.path.basename(path)[len("part-"):-len(".parquet")].split("-")
+                files.append((path, int(first), int(last)))
+            except ValueError:
+                continue
+        return files
+
+    # ----- Write -----
+    def _log_queue(self):
+        if self._queue is None:
+            with self._lock:
+                if self._queue is None:
+                    from core.logger import InteractionQueue
+
+                    self._queue = InteractionQueue(
+                        db_path=local_path("interaction_parquet_queue.sqlite"),
+                        batch_size=get_setting("logging", "batch_size", 50),
+                        flush_interval=get_setting("logging", "flush_interval", 2.0),
+                        max_attempts=get_setting("logging", "max_attempts", 20),
+                        sink=self.append_many,
+                        target=self.label,
+                    )
+        return self._queue
+
+    def start(self) -> None:
+        self._log_queue().start()
+
+    def append(self, row: list) -> None:
+        self._log_queue().enqueue(row)
+
+    @METRICS.timed("storage_write_seconds")
+    def append_many(self, rows: List[list]) -> None:
+        if not rows:
+            return
+        pa = self._pyarrow()
+        records = [normalize_row(INTERACTION_COLUMNS, r) for r in rows]
+
+        with self._lock:
+            by_day: Dict[str, List[Dict]] = {}
+            for seq, record in enumerate(records, start=self._next_seq):
+                record["seq"] = seq
+                by_day.setdefault(record["timestamp"][:10] or UNDATED_PARTITION, []).append(record)
+
+            for day, day_records in by_day.items():
+                directory = os.path.join(self.base_dir, f"day={day}")
+                os.makedirs(directory, exist_ok=True)
+                name = f"part-{day_records[0]['seq']:012d}-{day_records[-1]['seq']:012d}.parquet"
+                table = pa.Table.from_pylist(day_records, schema=self._schema())
+                tmp = os.path.join(directory, f".{name}.tmp")
+                pa.parquet.write_table(table, tmp)
+                os.replace(tmp, os.path.join(directory, name))
+            self._next_seq += len(records)
+
+    # ----- Read -----
+    def _dataset(self, paths: Optional[List[str]] = None):
+        pa = self._pyarrow()
+        partitioning = pa.dataset.partitioning(pa.schema([("day", pa.string())]), flavor="hive")
+        return pa.dataset.dataset(
+            paths if paths is not None else self.base_dir,
+            schema=self._schema().append(pa.field("day", pa.string())),
+            format="parquet",
+            partitioning=partitioning,
+            partition_base_dir=self.base_dir,
+        )
+
+    def _table(self, since_day: Optional[str], until_day: Optional[str], columns: List[str]):
+        pa = self._pyarrow()
+        files = [path for path, _, _ in self._files()]
+        if not files:
+            return self._schema().empty_table().select(columns)
+        condition = None
+        if since_day or until_day:
+            condition = pa.dataset.field("day") != UNDATED_PARTITION
+        for op, day in (("ge", since_day), ("le", until_day)):
+            if day:
+                field = pa.dataset.field("day")
+                clause = field >= day if op == "ge" else field <= day
+                condition = clause if condition is None else condition & clause
+        return self._dataset(files).to_table(columns=columns, filter=condition)
+
+    def load_rows(self, start_row: int) -> Tuple[List[str], List[list]]:
+        start_seq = start_row - 2
+        files = [path for path, _, last in self._files() if last >= start_seq]
+        if not files:
+            return list(INTERACTION_COLUMNS), []
+        pa = self._pyarrow()
+        table = self._dataset(files).to_table(
+            columns=["seq"] + INTERACTION_COLUMNS,
+            filter=pa.dataset.field("seq") >= start_seq,
+        )
+        table = table.sort_by("seq").drop_columns(["seq"])
+        return list(INTERACTION_COLUMNS), [list(r.values()) for r in table.to_pylist()]
+
+    def read_range(self, since_day: Optional[str] = None, until_day: Optional[str] = None) -> pd.DataFrame:
+        table = self._table(since_day, until_day, ["seq"] + INTERACTION_COLUMNS)
+        return table.sort_by("seq").drop_columns(["seq"]).to_pandas()
+
+    def aggregate(self, dim: str, since_day: Optional[str] = None, until_day: Optional[str] = None) -> pd.Series:
+        if dim not in ROLLUP_DIMENSIONS:
+            raise ValueError(f"Unknown dimension {dim!r}; use one of {list(ROLLUP_DIMENSIONS)}")
+        self._pyarrow()
+        import pyarrow.compute as pc
+
+        column = ROLLUP_DIMENSIONS[dim]
+        if column is None:
+            total = self._table(since_day, until_day, ["seq"]).num_rows
+            return _counts(Counter({"": total}) if total else Counter())
+
+        values = self._table(since_day, until_day, [column]).column(column)
+        if column in LIST_COLUMNS:
+            values = pc.utf8_trim_whitespace(pc.list_flatten(pc.split_pattern(values, ";")))
+        values = values.filter(pc.and_(pc.is_valid(values), pc.not_equal(values, "")))
+        if not len(values):
+            return _counts(Counter())
+        return _counts(Counter({c["values"]: c["counts"] for c in pc.value_counts(values).to_pylist()}))
+
+    def close(self) -> None:
+        if self._queue is not None:
+            self._queue.stop()
+
+
+def make_interaction_storage(backend: str, path: Optional[str] = None) -> InteractionStorage:
+    """Build a storage backend by name ('sheets', 'sqlite' or 'parquet')."""
+    if backend == "sheets":
+        return SheetsInteractionStorage()
+    if backend == "sqlite":
+        return SqliteInteractionStorage(path)
+    if backend == "parquet":
+        return ParquetInteractionStorage(path)
+    raise ValueError(f"Unknown storage backend {backend!r}; use one of {BACKENDS}")
+
+
+def sheets_mirror_enabled(storage: InteractionStorage) -> bool:
+    """Whether rows should also be copied to Sheets (asynchronously) after storage."""
+    return storage.name != "sheets" and bool(get_setting("storage", "sheets_mirror", False))
+
+
+_STORAGE: Optional[InteractionStorage] = None
+_STORAGE_LOCK = threading.Lock()
+
+
+def get_interaction_storage() -> InteractionStorage:
+    """
+    Process-wide interaction storage, from the [storage] settings:
+
+    - backend: 'sheets' (default), 'sqlite' or 'parquet'
+    - path: SQLite file / Parquet directory (default under local.data_dir)
+    - sheets_mirror: with a local backend, also queue every row for Sheets
+    """
+    global _STORAGE
+    if _STORAGE is None:
+        with _STORAGE_LOCK:
+            if _STORAGE is None:
+                _STORAGE = make_interaction_storage(
+                    get_setting("storage", "backend", "sheets"),
+                    get_setting("storage", "path", None),
+                )
+                logging.info("Interaction storage: %s", _STORAGE.label)
+    return _STORAGE
+
+
+def append_interactions(
+    target: InteractionStorage, header: List[str], rows: List[list], batch_size: int = 5000
+) -> int:
+    """
+    Append raw rows (columns named by `header`, see normalize_rows) to
+    `target` in order, skipping blank lines; returns the number appended.
+    """
+    records = [[row[c] for c in INTERACTION_COLUMNS] for _, row in normalize_rows(header, rows)]
+    for i in range(0, len(records), batch_size):
+        target.append_many(records[i:i + batch_size])
+    return len(records)
+
+
+def copy_interactions(source: InteractionStorage, target: InteractionStorage, batch_size: int = 5000) -> int:
+    """Append every row of `source` to `target` in order; returns the number copied."""
+    header, rows = source.load_rows(2)
+    return append_interactions(target, header, rows, batch_size)
+
+
+if __name__ == "__main__":
+    # python -m core.interaction_storage copy sheets
+    #   copy the whole log from another backend into the configured one
+    #   (e.g. before switching storage.backend from sheets to sqlite)
+    # python -m core.interaction_storage import [data/interaction_log.csv]
+    #   append a local / exported interactions CSV to the configured backend
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    storage = get_interaction_storage()
+    if command == "copy" and len(sys.argv) > 2:
+        source = make_interaction_storage(sys.argv[2])
+        if source.name == storage.name:
+            sys.exit("Source and configured backend are the same")
+        print(f"Copied {copy_interactions(source, storage)} interactions "
+              f"from {source.label} to {storage.label}")
+    elif command == "import":
+        path = sys.argv[2] if len(sys.argv) > 2 else "data/interaction_log.csv"
+        imported = append_interactions(storage, *read_interactions_csv(path))
+        print(f"Imported {imported} interactions from {path} into {storage.label}")
+    else:
+        sys.exit("Usage: python -m core.interaction_storage copy <backend> | import [csv]")
+    storage.close()
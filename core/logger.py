@@ -1,10 +1,297 @@
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
+import json
 import logging
+import random
+import sqlite3
+import threading
+import time
 
-from core.google_sheets import append_interaction_row
+from core.config import get_setting, local_connection, local_path
+from core.metrics import METRICS
 
+# 4xx statuses worth retrying (401 / 403 are re-authorized by
+# google_sheets; 408 / 429 are timeouts and rate limits)
+RETRYABLE_CLIENT_ERRORS = {401, 403, 408, 429}
 
+
+def _status_code(error: Exception) -> Optional[int]:
+    code = getattr(error, "code", None)
+    if not isinstance(code, int):
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """A 4xx rejection of the request itself, e.g. a malformed row."""
+    code = _status_code(error)
+    return code is not None and 400 <= code < 500 and code not in RETRYABLE_CLIENT_ERRORS
+
+
+def is_data_error(error: Exception) -> bool:
+    """A row the sink could not encode (not an outage or a config problem)."""
+    return _status_code(error) is None and isinstance(error, (ValueError, TypeError))
+
+
+class InteractionQueue:
+    """
+    Durable local queue of interaction rows, drained to Google Sheets (or
+    another sink, e.g. a batched storage backend) by a background worker
+    thread.
+
+    - enqueue() commits the row to SQLite and returns immediately
+    - the worker sends rows in batches with append_rows, deleting them only
+      after the write succeeded; failures are retried with jittered
+      exponential backoff
+    - outages and config problems are retried as they are; after a
+      permanent error (4xx), or max_attempts failures with a data error
+      (ValueError / TypeError), the batch is halved on each retry so one
+      bad row cannot hold up the rows behind it, and a row that still
+      fails on its own moves to the dead_letter table (see
+      requeue_dead_letters)
+    - rows left in the file (crash, restart, Sheets outage) are sent when
+      the next process starts its worker (the app starts it on load)
+
+    One process should drain a given queue file at a time.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        batch_size: int = 50,
+        flush_interval: float = 2.0,
+        max_backoff: float = 300.0,
+        max_attempts: int = 20,
+        sink=None,
+        target: str = "Google Sheets",
+    ):
+        self.db_path = db_path or local_path("interaction_queue.sqlite")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self._batch_limit = batch_size  # halved after a failed batch
+        self._sink = sink
+        self.target = target
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._local = threading.local()
+        self._failures_in_row = 0
+        # Request threads (enqueue) and the worker both update stats
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "enqueued": 0,
+            "flushed": 0,
+            "batches": 0,
+            "failures": 0,
+            "dead_lettered": 0,
+            "last_batch_size": 0,
+            "last_flush_seconds": None,   # duration of the last append_rows call
+            "last_flush_latency": None,   # enqueue -> written, oldest row of last batch
+            "last_error": None,
+        }
+
+        with self._conn() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS queue (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    enqueued_at REAL NOT NULL,
+                    row TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS dead_letter (
+                    id INTEGER PRIMARY KEY,
+                    enqueued_at REAL NOT NULL,
+                    row TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    failed_at REAL NOT NULL,
+                    error TEXT
+                )
+                """
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        return local_connection(self._local, self.db_path)
+
+    def _send(self, rows: List[list]) -> None:
+        if self._sink is not None:
+            self._sink(rows)
+            return
+        from core.google_sheets import append_interaction_rows
+
+        append_interaction_rows(rows)
+
+    # ----- Producer side -----
+    def enqueue(self, row: list) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO queue (enqueued_at, row) VALUES (?, ?)",
+                (time.time(), json.dumps(row, ensure_ascii=False)),
+            )
+        with self._stats_lock:
+            self.stats["enqueued"] += 1
+        self.start()
+        if self.depth() >= self.batch_size:
+            self._wakeup.set()
+
+    def depth(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM queue").fetchone()[0]
+
+    # ----- Worker side -----
+    def start(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stop.clear()
+                self._worker = threading.Thread(
+                    target=self._run, name="interaction-logger", daemon=True
+                )
+                self._worker.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def flush_once(self) -> int:
+        """Send one batch; returns the number of rows written (0 if empty)."""
+        conn = self._conn()
+        batch = conn.execute(
+            "SELECT id, enqueued_at, row, attempts FROM queue ORDER BY id LIMIT ?",
+            (self._batch_limit,),
+        ).fetchall()
+        if not batch:
+            return 0
+
+        ids = [b[0] for b in batch]
+        rows = [json.loads(b[2]) for b in batch]
+        started = time.time()
+        try:
+            self._send(rows)
+        except Exception as e:
+            row_specific = is_permanent_error(e) or (
+                is_data_error(e) and max(b[3] for b in batch) + 1 >= self.max_attempts
+            )
+            with conn:
+                conn.executemany(
+                    "UPDATE queue SET attempts = attempts + 1 WHERE id = ?",
+                    [(i,) for i in ids],
+                )
+                if row_specific and len(batch) == 1:
+                    self._dead_letter(conn, ids[0], e)
+            if row_specific:
+                self._batch_limit = max(1, len(batch) // 2)
+            with self._stats_lock:
+                self.stats["failures"] += 1
+                self.stats["last_error"] = repr(e)
+            raise
+
+        finished = time.time()
+        self._batch_limit = self.batch_size
+        with conn:
+            conn.executemany("DELETE FROM queue WHERE id = ?", [(i,) for i in ids])
+        with self._stats_lock:
+            self.stats["flushed"] += len(rows)
+            self.stats["batches"] += 1
+            self.stats["last_batch_size"] = len(rows)
+            self.stats["last_flush_seconds"] = finished - started
+            self.stats["last_flush_latency"] = finished - batch[0][1]
+        logging.info("Logged %s interactions to %s", len(rows), self.target)
+        return len(rows)
+
+    def _dead_letter(self, conn: sqlite3.Connection, row_id: int, error: Exception) -> None:
+        conn.execute(
+            """
+            INSERT INTO dead_letter (id, enqueued_at, row, attempts, failed_at, error)
+            SELECT id, enqueued_at, row, attempts, ?, ? FROM queue WHERE id = ?
+            """,
+            (time.time(), repr(error), row_id),
+        )
+        conn.execute("DELETE FROM queue WHERE id = ?", (row_id,))
+        with self._stats_lock:
+            self.stats["dead_lettered"] += 1
+        logging.error("Moved interaction %s to the dead-letter table after %r", row_id, error)
+
+    def dead_letter_count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+
+    def requeue_dead_letters(self) -> int:
+        """Put dead-lettered rows back in the queue (e.g. after fixing the sheet)."""
+        with self._conn() as conn:
+            moved = conn.execute(
+                "INSERT INTO queue (enqueued_at, row) SELECT enqueued_at, row FROM dead_letter ORDER BY id"
+            ).rowcount
+            conn.execute("DELETE FROM dead_letter")
+        self._wakeup.set()
+        return moved
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            limit = self._batch_limit
+            try:
+                sent = self.flush_once()
+                self._failures_in_row = 0
+            except Exception as e:
+                if is_permanent_error(e):
+                    # Not an outage: retry the halved batch right away
+                    logging.warning("%s rejected a batch (%r); retrying smaller batches", self.target, e)
+                    continue
+                logging.exception("Failed to log interactions to %s; will retry", self.target)
+                self._failures_in_row += 1
+                delay = random.uniform(
+                    0, min(self.max_backoff, self.flush_interval * 2 ** self._failures_in_row)
+                )
+                self._stop.wait(delay)
+                continue
+
+            if sent < limit:
+                # Queue drained: wait for more rows (or the next tick)
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+
+    def snapshot_stats(self) -> Dict:
+        """Queue depth and flush metrics, for the dashboard."""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["depth"] = self.depth()
+        stats["dead_letter"] = self.dead_letter_count()
+        oldest = self._conn().execute("SELECT MIN(enqueued_at) FROM queue").fetchone()[0]
+        stats["oldest_age_seconds"] = time.time() - oldest if oldest else 0.0
+        return stats
+
+
+_QUEUE: Optional[InteractionQueue] = None
+_QUEUE_LOCK = threading.Lock()
+
+
+def get_log_queue() -> InteractionQueue:
+    """
+    Process-wide queue to Google Sheets (configured from the [logging]
+    settings): the system of record with storage.backend = 'sheets', or
+    the asynchronous mirror with storage.sheets_mirror.
+    """
+    global _QUEUE
+    if _QUEUE is None:
+        with _QUEUE_LOCK:
+            if _QUEUE is None:
+                _QUEUE = InteractionQueue(
+                    batch_size=get_setting("logging", "batch_size", 50),
+                    flush_interval=get_setting("logging", "flush_interval", 2.0),
+                    max_attempts=get_setting("logging", "max_attempts", 20),
+                )
+    return _QUEUE
+
+
+@METRICS.timed("log_interaction_seconds")
 def log_interaction(
     visitor_context: Dict,
     kept_services: List[Dict],
@@ -12,7 +299,13 @@ def log_interaction(
     site: str = "NFCM",
 ) -> None:
     """
-    Log one interaction to Google Sheets (interactions worksheet).
+    Log one interaction to the configured storage backend (see
+    core.interaction_storage; Google Sheets by default).
+
+    With Sheets the row is committed to a durable local queue and written
+    in the background (see InteractionQueue), so this returns immediately.
+    With a local backend the row is stored there, and also queued for
+    Sheets when storage.sheets_mirror is on.
 
     Columns:
     interaction_id, timestamp, site, age_group, language, housing_status,
@@ -43,9 +336,19 @@ def log_interaction(
         num_services_kept,
     ]
 
+    from core.interaction_storage import get_interaction_storage, sheets_mirror_enabled
+
     try:
-        append_interaction_row(row)
-        logging.info("Logged interaction to Google Sheets: %s", row)
+        storage = get_interaction_storage()
+        storage.append(row)
+        logging.info("Logged interaction to %s: %s", storage.label, row)
     except Exception as e:
         # Don't crash the app if logging fails; just print error.
-        logging.exception("Failed to log interaction to Google Sheets: %s", e)
+        logging.exception("Failed to log interaction: %s", e)
+        return
+
+    if sheets_mirror_enabled(storage):
+        try:
+            get_log_queue().enqueue(row)
+        except Exception as e:
+            logging.exception("Failed to queue interaction for the Sheets mirror: %s", e)
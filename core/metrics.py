@@ -0,0 +1,203 @@
+# core/metrics.py
+
+import functools
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from core.config import get_setting
+
+QUANTILES = [0.5, 0.95, 0.99]
+METRIC_PREFIX = "dissa_"
+
+
+class _Histogram:
+    """Count / sum since start, plus the most recent samples for quantiles."""
+
+    __slots__ = ("count", "total", "samples")
+
+    def __init__(self, reservoir: int):
+        self.count = 0
+        self.total = 0.0
+        self.samples: deque = deque(maxlen=reservoir)
+
+    def quantiles(self) -> Dict[float, Optional[float]]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: None for q in QUANTILES}
+        # Nearest rank: the smallest sample with at least q of them at or below it
+        return {q: ordered[max(0, math.ceil(q * len(ordered)) - 1)] for q in QUANTILES}
+
+
+class MetricsRegistry:
+    """
+    In-process timing histograms and counters for the front desk pipeline.
+
+    - span(name) / @timed(name): wall time of a block / call, in seconds
+    - observe(name, value): one sample of any histogram
+    - inc(name, value): monotonically increasing counter (e.g. tokens)
+
+    Quantiles (p50 / p95 / p99) are over the last `reservoir` samples of
+    each histogram; counts and sums are since process start. When disabled
+    (metrics.enabled, read on first use) every call is a single flag check.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, reservoir: int = 2048):
+        self._enabled = enabled
+        self.reservoir = reservoir
+        self._histograms: Dict[str, _Histogram] = {}
+        self._counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is None:
+            self._enabled = bool(get_setting("metrics", "enabled", False))
+        return self._enabled
+
+    def observe(self, name: str, value: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram(self.reservoir)
+            histogram.count += 1
+            histogram.total += value
+            histogram.samples.append(value)
+
+    def inc(self, name: str, value: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    @contextmanager
+    def span(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def timed(self, name: str):
+        """Decorator: record each call's wall time under `name`."""
+
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - started)
+
+            return wrapper
+
+        return decorator
+
+    def snapshot(self) -> List[Dict]:
+        """One row per histogram: name, count, mean, p50, p95, p99."""
+        with self._lock:
+            items = [
+                (name, h.count, h.total, h.quantiles())
+                for name, h in sorted(self._histograms.items())
+            ]
+        return [
+            {
+                "name": name,
+                "count": count,
+                "mean": total / count if count else None,
+                "p50": quantiles[0.5],
+                "p95": quantiles[0.95],
+                "p99": quantiles[0.99],
+            }
+            for name, count, total, quantiles in items
+        ]
+
+    def counters(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition: a summary per histogram, a counter per counter."""
+        lines = []
+        with self._lock:
+            for name, h in sorted(self._histograms.items()):
+                metric = METRIC_PREFIX + name
+                lines.append(f"# HELP {metric} {name}, quantiles over the last {self.reservoir} samples")
+                lines.append(f"# TYPE {metric} summary")
+                for q, value in h.quantiles().items():
+                    if value is not None:
+                        lines.append(f'{metric}{{quantile="{q}"}} {value:.6g}')
+                lines.append(f"{metric}_sum {h.total:.6g}")
+                lines.append(f"{metric}_count {h.count}")
+            for name, value in sorted(self._counters.items()):
+                metric = METRIC_PREFIX + name + "_total"
+                lines.append(f"# HELP {metric} {name} since process start")
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value:.6g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+# Process-wide registry; instrumented modules decorate with METRICS.timed(...)
+METRICS = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = METRICS.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_SERVER: Optional[ThreadingHTTPServer] = None
+_SERVER_LOCK = threading.Lock()
+
+
+def start_metrics_server() -> Optional[int]:
+    """
+    Serve GET /metrics on metrics.host:metrics.port (once per process, in
+    a daemon thread). Returns the port, or None when metrics or the port
+    are off. The host defaults to 127.0.0.1; set it to "0.0.0.0" only when
+    a scraper on another machine needs it.
+    """
+    global _SERVER
+    port = get_setting("metrics", "port", 0)
+    host = get_setting("metrics", "host", "127.0.0.1")
+    if not METRICS.enabled or not port:
+        return None
+    with _SERVER_LOCK:
+        if _SERVER is None:
+            try:
+                _SERVER = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError:
+                # Another Streamlit process on this host already serves it
+                return None
+            threading.Thread(
+                target=_SERVER.serve_forever, name="metrics-server", daemon=True
+            ).start()
+    return _SERVER.server_address[1]
@@ -0,0 +1,22 @@
+# core/options.py
+
+"""
+Front desk form options, shared by the app, the batch handout CLI and
+the benchmarks so they all describe the same visitors.
+"""
+
+LANGUAGE_OPTIONS = ["Cree", "Inuktitut", "English", "French", "Other"]
+AGE_GROUP_OPTIONS = ["Under 18", "18-29", "30-54", "55+"]
+HOUSING_OPTIONS = ["Not specified", "Homeless / unstably housed", "Stably housed", "Shelter"]
+
+NEED_OPTIONS = [
+    {"label": "Food",                 "value": "food",           "emoji": "🍽️"},
+    {"label": "Health & Wellness",    "value": "health",         "emoji": "🩺"},
+    {"label": "Mental Health",        "value": "mental_health",  "emoji": "🧠"},
+    {"label": "Housing & Shelter",    "value": "housing",        "emoji": "🏠"},
+    {"label": "Clothes & Hygiene",    "value": "clothing",       "emoji": "🧥"},
+    {"label": "Work / Employment",    "value": "employment",     "emoji": "💼"},
+    {"label": "Family & Children",    "value": "family_support", "emoji": "👨‍👩‍👧"},
+    {"label": "Culture / Community",  "value": "culture",        "emoji": "🌿"},
+]
+NEED_VALUES = [option["value"] for option in NEED_OPTIONS]
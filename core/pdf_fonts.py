@@ -0,0 +1,312 @@
+# core/pdf_fonts.py
+
+"""
+TrueType fonts for the unicode PDF mode, parsed once per process.
+
+FPDF 1.7 re-opens and re-parses the whole TTF (cmap, hmtx, loca, glyf)
+for every document it writes, ~50 ms per font per PDF. TrueTypeFont reads
+the file once, keeps those tables, and builds each document's subset (only
+the glyphs used) from memory; HandoutPDF._putfonts embeds the result.
+"""
+
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from fpdf.ttfonts import TTFontFile
+
+# Composite glyph flags (glyf table)
+ARG_1_AND_2_ARE_WORDS = 1 << 0
+WE_HAVE_A_SCALE = 1 << 3
+MORE_COMPONENTS = 1 << 5
+WE_HAVE_AN_X_AND_Y_SCALE = 1 << 6
+WE_HAVE_A_TWO_BY_TWO = 1 << 7
+
+# Tables copied into every subset unchanged (when the font has them)
+COPIED_TABLES = ["name", "OS/2", "cvt ", "fpgm", "prep", "gasp"]
+
+
+def _checksum(data: bytes) -> int:
+    data += b"\0" * (-len(data) % 4)
+    return sum(struct.unpack(f">{len(data) // 4}L", data)) & 0xFFFFFFFF
+
+
+class FontSubset:
+    """One embedded subset: the font program and its character -> glyph map."""
+
+    def __init__(self, program: bytes, code_to_glyph: Dict[int, int], max_code: int):
+        self.size = len(program)
+        self.compressed = zlib.compress(program)
+        self.code_to_glyph = code_to_glyph
+        self.max_code = max_code
+        cid_to_gid = bytearray(256 * 256 * 2)
+        for code, glyph in code_to_glyph.items():
+            cid_to_gid[code * 2] = glyph >> 8
+            cid_to_gid[code * 2 + 1] = glyph & 0xFF
+        self.cid_to_gid = zlib.compress(bytes(cid_to_gid))
+
+
+class TrueTypeFont:
+    """
+    A TTF parsed once: metrics for FPDF's font dict (via fpdf's own
+    TTFontFile.getMetrics) and the tables subsetting needs. subset() builds
+    a font program from memory and keeps the last few per character set.
+    """
+
+    def __init__(self, path: str, max_subsets: int = 32):
+        self.path = path
+        self.metrics = self._read_metrics(path)
+        with open(path, "rb") as f:
+            self.data = f.read()
+        self.tables = self._read_tables()
+        self.index_to_loc_format = struct.unpack_from(">h", self.data, self.tables["head"][0] + 50)[0]
+        self.num_h_metrics = struct.unpack_from(">H", self.data, self.tables["hhea"][0] + 34)[0]
+        self.num_glyphs = struct.unpack_from(">H", self.data, self.tables["maxp"][0] + 4)[0]
+        self.char_to_glyph = self._read_cmap()
+        self.loca = self._read_loca()
+        self._subsets: "OrderedDict[frozenset, FontSubset]" = OrderedDict()
+        self._max_subsets = max_subsets
+        self._lock = threading.Lock()
+
+    # ----- Parse -----
+    @staticmethod
+    def _read_metrics(path: str) -> Dict:
+        ttf = TTFontFile()
+        ttf.getMetrics(path)
+        return {
+            "name": ttf.fullName.replace(" ", "").replace("(", "").replace(")", ""),
+            "desc": {
+                "Ascent": int(round(ttf.ascent, 0)),
+                "Descent": int(round(ttf.descent, 0)),
+                "CapHeight": int(round(ttf.capHeight, 0)),
+                "Flags": ttf.flags,
+                "FontBBox": "[%s %s %s %s]" % tuple(int(round(b, 0)) for b in ttf.bbox),
+                "ItalicAngle": int(ttf.italicAngle),
+                "StemV": int(round(ttf.stemV, 0)),
+                "MissingWidth": int(round(ttf.defaultWidth, 0)),
+            },
+            "up": round(ttf.underlinePosition),
+            "ut": round(ttf.underlineThickness),
+            "cw": ttf.charWidths,
+            "originalsize": os.stat(path).st_size,
+        }
+
+    def _read_tables(self) -> Dict[str, Tuple[int, int]]:
+        version, num_tables = struct.unpack_from(">LH", self.data, 0)
+        if version not in (0x00010000, 0x74727565):
+            raise ValueError(f"{self.path} is not a TrueType font")
+        tables = {}
+        for i in range(num_tables):
+            tag, _, offset, length = struct.unpack_from(">4sLLL", self.data, 12 + 16 * i)
+            tables[tag.decode("latin-1")] = (offset, length)
+        return tables
+
+    def table(self, tag: str) -> bytes:
+        offset, length = self.tables[tag]
+        return self.data[offset:offset + length]
+
+    def _read_cmap(self) -> Dict[int, int]:
+        """Unicode -> glyph id, from the (3, 10) format 12 or a format 4 subtable."""
+        base = self.tables["cmap"][0]
+        count = struct.unpack_from(">H", self.data, base + 2)[0]
+        format4 = format12 = None
+        for i in range(count):
+            platform, encoding, offset = struct.unpack_from(">HHL", self.data, base + 4 + 8 * i)
+            fmt = struct.unpack_from(">H", self.data, base + offset)[0]
+            if platform == 3 and encoding == 10 and fmt == 12:
+                format12 = base + offset
+            elif (platform == 3 and encoding == 1 or platform == 0) and fmt == 4 and format4 is None:
+                format4 = base + offset
+
+        char_to_glyph: Dict[int, int] = {}
+        if format12 is not None:
+            groups = struct.unpack_from(">L", self.data, format12 + 12)[0]
+            for i in range(groups):
+                start, end, glyph = struct.unpack_from(">LLL", self.data, format12 + 16 + 12 * i)
+                for code in range(start, end + 1):
+                    char_to_glyph[code] = glyph + code - start
+            return char_to_glyph
+        if format4 is None:
+            raise ValueError(f"{self.path} has no Unicode cmap")
+
+        segments = struct.unpack_from(">H", self.data, format4 + 6)[0] // 2
+        ends = struct.unpack_from(f">{segments}H", self.data, format4 + 14)
+        starts = struct.unpack_from(f">{segments}H", self.data, format4 + 16 + 2 * segments)
+        deltas = struct.unpack_from(f">{segments}h", self.data, format4 + 16 + 4 * segments)
+        range_base = format4 + 16 + 6 * segments
+        range_offsets = struct.unpack_from(f">{segments}H", self.data, range_base)
+        for n in range(segments):
+            for code in range(starts[n], ends[n] + 1):
+                if range_offsets[n] == 0:
+                    glyph = (code + deltas[n]) & 0xFFFF
+                else:
+                    at = range_base + 2 * n + range_offsets[n] + 2 * (code - starts[n])
+                    glyph = struct.unpack_from(">H", self.data, at)[0]
+                    if glyph:
+                        glyph = (glyph + deltas[n]) & 0xFFFF
+                if glyph:
+                    char_to_glyph[code] = glyph
+        return char_to_glyph
+
+    def _read_loca(self) -> Tuple[int, ...]:
+        offset = self.tables["loca"][0]
+        if self.index_to_loc_format == 0:
+            return tuple(2 * v for v in struct.unpack_from(f">{self.num_glyphs + 1}H", self.data, offset))
+        return struct.unpack_from(f">{self.num_glyphs + 1}L", self.data, offset)
+
+    def _glyph(self, glyph: int) -> bytes:
+        start = self.tables["glyf"][0]
+        return self.data[start + self.loca[glyph]:start + self.loca[glyph + 1]]
+
+    def _h_metric(self, glyph: int) -> bytes:
+        start = self.tables["hmtx"][0]
+        if glyph < self.num_h_metrics:
+            return self.data[start + 4 * glyph:start + 4 * glyph + 4]
+        advance = start + 4 * (self.num_h_metrics - 1)
+        lsb = start + 4 * self.num_h_metrics + 2 * (glyph - self.num_h_metrics)
+        return self.data[advance:advance + 2] + self.data[lsb:lsb + 2]
+
+    @staticmethod
+    def _components(data: bytes):
+        """(offset of the glyph index, glyph index) per component of a composite glyph."""
+        pos = 10
+        flags = MORE_COMPONENTS
+        while flags & MORE_COMPONENTS:
+            flags, glyph = struct.unpack_from(">HH", data, pos)
+            yield pos + 2, glyph
+            pos += 8 if flags & ARG_1_AND_2_ARE_WORDS else 6
+            if flags & WE_HAVE_A_SCALE:
+                pos += 2
+            elif flags & WE_HAVE_AN_X_AND_Y_SCALE:
+                pos += 4
+            elif flags & WE_HAVE_A_TWO_BY_TWO:
+                pos += 8
+
+    # ----- Subset -----
+    def subset(self, codes) -> FontSubset:
+        """Font program with the glyphs for `codes` (BMP code points), memoized."""
+        key = frozenset(code for code in codes if 0 < code < 0xFFFF)
+        with self._lock:
+            entry = self._subsets.get(key)
+            if entry is not None:
+                self._subsets.move_to_end(key)
+                return entry
+        entry = self._build_subset(key)
+        with self._lock:
+            self._subsets[key] = entry
+            while len(self._subsets) > self._max_subsets:
+                self._subsets.popitem(last=False)
+        return entry
+
+    def _build_subset(self, codes: frozenset) -> FontSubset:
+        used = {0} | {self.char_to_glyph[c] for c in codes if c in self.char_to_glyph}
+        pending = list(used)
+        while pending:  # add the parts of composite glyphs
+            data = self._glyph(pending.pop())
+            if len(data) > 10 and struct.unpack_from(">h", data)[0] < 0:
+                for _, component in self._components(data):
+                    if component not in used:
+                        used.add(component)
+                        pending.append(component)
+        old_glyphs = sorted(used)
+        new_id = {old: new for new, old in enumerate(old_glyphs)}
+        code_to_glyph = {
+            c: new_id[self.char_to_glyph[c]] for c in sorted(codes) if c in self.char_to_glyph
+        }
+
+        glyf, loca, hmtx = [], [0], []
+        for old in old_glyphs:
+            data = self._glyph(old)
+            if len(data) > 10 and struct.unpack_from(">h", data)[0] < 0:
+                data = bytearray(data)
+                for pos, component in list(self._components(bytes(data))):
+                    struct.pack_into(">H", data, pos, new_id[component])
+                data = bytes(data)
+            data += b"\0" * (-len(data) % 4)
+            glyf.append(data)
+            loca.append(loca[-1] + len(data))
+            hmtx.append(self._h_metric(old))
+
+        head = bytearray(self.table("head"))
+        struct.pack_into(">L", head, 8, 0)  # checkSumAdjustment, set below
+        struct.pack_into(">h", head, 50, 1)  # long loca offsets
+        hhea = bytearray(self.table("hhea"))
+        struct.pack_into(">H", hhea, 34, len(old_glyphs))
+        maxp = bytearray(self.table("maxp"))
+        struct.pack_into(">H", maxp, 4, len(old_glyphs))
+        post = b"\x00\x03\x00\x00" + self.table("post")[4:16] + b"\0" * 16
+
+        tables = {
+            "cmap": self._cmap(code_to_glyph),
+            "glyf": b"".join(glyf),
+            "head": bytes(head),
+            "hhea": bytes(hhea),
+            "hmtx": b"".join(hmtx),
+            "loca": struct.pack(f">{len(loca)}L", *loca),
+            "maxp": bytes(maxp),
+            "post": post,
+        }
+        for tag in COPIED_TABLES:
+            if tag in self.tables:
+                tables[tag] = self.table(tag)
+        program, offsets = self._assemble(tables)
+        program = bytearray(program)
+        struct.pack_into(">L", program, offsets["head"] + 8, (0xB1B0AFBA - _checksum(bytes(program))) & 0xFFFFFFFF)
+        return FontSubset(bytes(program), code_to_glyph, max(codes, default=0))
+
+    @staticmethod
+    def _cmap(code_to_glyph: Dict[int, int]) -> bytes:
+        """A format 4 cmap: one segment per run of consecutive codes and glyphs."""
+        segments: List[List[int]] = []
+        for code, glyph in sorted(code_to_glyph.items()):
+            if segments and code == segments[-1][1] + 1 and glyph - code == segments[-1][2]:
+                segments[-1][1] = code
+            else:
+                segments.append([code, code, glyph - code])
+        segments.append([0xFFFF, 0xFFFF, 1])
+        count = len(segments)
+        search_range = 2 * 2 ** (count.bit_length() - 1)
+        subtable = struct.pack(
+            f">HHHHHHH{count}HH{count}H{count}H{count}H",
+            4, 16 + 8 * count, 0,
+            2 * count, search_range, search_range.bit_length() - 2, 2 * count - search_range,
+            *(end for _, end, _ in segments), 0,
+            *(start for start, _, _ in segments),
+            *(delta & 0xFFFF for _, _, delta in segments),
+            *([0] * count),
+        )
+        return struct.pack(">HHHHL", 0, 1, 3, 1, 12) + subtable
+
+    @staticmethod
+    def _assemble(tables: Dict[str, bytes]) -> Tuple[bytes, Dict[str, int]]:
+        """The font file and the offset of each table in it."""
+        count = len(tables)
+        search_range = 16 * 2 ** (count.bit_length() - 1)
+        header = [struct.pack(">LHHHH", 0x00010000, count, search_range,
+                              count.bit_length() - 1, 16 * count - search_range)]
+        body = []
+        offsets = {}
+        offset = 12 + 16 * count
+        for tag, data in sorted(tables.items()):
+            offsets[tag] = offset
+            header.append(struct.pack(">4sLLL", tag.encode("latin-1"), _checksum(data), offset, len(data)))
+            data += b"\0" * (-len(data) % 4)
+            body.append(data)
+            offset += len(data)
+        return b"".join(header + body), offsets
+
+
+# Parsed fonts per TTF path, shared by every document in the process
+_FONTS: Dict[str, TrueTypeFont] = {}
+_FONTS_LOCK = threading.Lock()
+
+
+def get_font(path: str) -> TrueTypeFont:
+    with _FONTS_LOCK:
+        font = _FONTS.get(path)
+        if font is None:
+            font = _FONTS[path] = TrueTypeFont(path)
+        return font
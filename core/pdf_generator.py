@@ -1,7 +1,17 @@
-from datetime import datetime
-from typing import List, Dict, Optional
+import base64
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import List, Dict, Optional, Tuple
 from fpdf import FPDF
 
+from core.config import get_setting
+from core.metrics import METRICS
+from core.pdf_fonts import FontSubset, get_font
+
 # Brand colours
 BRAND_GREEN = (0, 120, 90)
 BRAND_DARK = (30, 30, 30)
@@ -20,8 +30,8 @@ def to_latin1(text: str) -> str:
 
 def category_icon(category: str) -> str:
     """
-    ASCII-safe 'icon' per category. If you later want true emoji,
-    we need a Unicode font instead of Latin-1.
+    ASCII-safe 'icon' per category, for latin-1 mode
+    (unicode mode uses category_symbol).
     """
     if not category:
         return "[SERVICE]"
@@ -45,10 +55,219 @@ def category_icon(category: str) -> str:
     return "[SERVICE]"
 
 
+# Unicode mode: body text in an embedded TrueType font (only the glyphs
+# used are written to the PDF), for handouts whose text is not Latin-1
+# (Cree syllabics, Inuktitut, emoji). fpdf 1.7 handles the Basic
+# Multilingual Plane only, so colour emoji map to BMP symbols the font has.
+UNICODE_FAMILY = "DejaVu"
+DEFAULT_FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+DEFAULT_BOLD_FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+
+EMOJI_SYMBOLS = {
+    "🍽": "☕",
+    "🩺": "⚕",
+    "🧠": "❤",
+    "🏠": "⌂",
+    "🧥": "✂",
+    "💼": "⚒",
+    "👨‍👩‍👧": "☺",
+    "🌿": "☘",
+    "⭐": "★",
+}
+
+
+def category_symbol(category: str) -> str:
+    """Unicode-mode counterpart of category_icon."""
+    icon = category_icon(category)
+    return {
+        "[FOOD]": "☕",
+        "[HEALTH]": "⚕",
+        "[MENTAL]": "❤",
+        "[HOME]": "⌂",
+        "[BASICS]": "✂",
+        "[WORK]": "⚒",
+        "[FAMILY]": "☺",
+        "[CULTURE]": "☘",
+    }.get(icon, "★")
+
+
+def is_latin1(text: Optional[str]) -> bool:
+    try:
+        (text or "").encode("latin-1")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def needs_unicode(handout_text: str, services: Optional[List[Dict]] = None) -> bool:
+    """
+    True if the handout has text Helvetica cannot draw. Latin-1 text keeps
+    the built-in font: no font program to subset and embed (~1 ms and ~2 KB
+    per PDF instead of ~10 ms and ~35 KB).
+    """
+    texts = [handout_text]
+    for svc in services or []:
+        texts.extend(str(svc.get(field) or "") for field in ("name", "description", "address", "hours_today"))
+    return not all(is_latin1(text) for text in texts)
+
+
+def unicode_font_paths() -> Optional[Dict[str, str]]:
+    """
+    {style: ttf path} for unicode mode, or None to render in latin-1:
+    - pdf.font_mode is "latin1" (the default "unicode" embeds the font
+      only for text that needs it, see needs_unicode), or
+    - the regular font file is missing.
+    A missing bold file falls back to the regular one.
+    """
+    if get_setting("pdf", "font_mode", "unicode") != "unicode":
+        return None
+    regular = get_setting("pdf", "font_path", DEFAULT_FONT_PATH)
+    if not os.path.exists(regular):
+        logging.warning("PDF font %s not found; rendering in latin-1", regular)
+        return None
+    bold = get_setting("pdf", "bold_font_path", DEFAULT_BOLD_FONT_PATH)
+    return {"": regular, "B": bold if os.path.exists(bold) else regular}
+
+
+# ToUnicode CMap of the embedded fonts: character codes are Unicode
+TO_UNICODE_CMAP = (
+    "/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+    "/CIDSystemInfo\n<</Registry (Adobe)\n/Ordering (UCS)\n/Supplement 0\n>> def\n"
+    "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+    "1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+    "1 beginbfrange\n<0000> <FFFF> <0000>\nendbfrange\n"
+    "endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend"
+)
+
+# Static header / footer strings, converted once at import
+HEADER_TITLE = "Service Handout"
+FOOTER_TEXT = "NFCM / Centraide - DISSA MVP  |  Page {page}/{{nb}}"
+CARDS_HEADING = "Services that may help you:"
+
+
 class HandoutPDF(FPDF):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.generated_on = ""
+        # Header / footer are ASCII and keep the built-in Helvetica
+        self.body_font = "Helvetica"
+        self.unicode_text = False
+
+    def use_unicode_font(self, paths: Dict[str, str]) -> None:
+        """
+        Register the TTF(s) for the body text from the process-wide parsed
+        fonts (core.pdf_fonts); the subset is built from the glyphs used when
+        the PDF is output.
+        """
+        family = UNICODE_FAMILY.lower()
+        for style, path in paths.items():
+            fontkey = family + style
+            if fontkey in self.fonts:
+                continue
+            metrics = get_font(path).metrics
+            # Same entries as FPDF.add_font(uni=True); digits are always in
+            # the subset so the {nb} page alias can be filled in
+            subset = list(range(0, 57)) if hasattr(self, "str_alias_nb_pages") else list(range(0, 32))
+            self.fonts[fontkey] = {
+                "i": len(self.fonts) + 1, "type": "TTF",
+                "name": metrics["name"], "desc": metrics["desc"],
+                "up": metrics["up"], "ut": metrics["ut"],
+                "cw": metrics["cw"],
+                "ttffile": path, "fontkey": fontkey,
+                "subset": subset, "unifilename": None,
+            }
+            self.font_files[fontkey] = {"length1": metrics["originalsize"], "type": "TTF", "ttffile": path}
+        self.body_font = UNICODE_FAMILY
+        self.unicode_text = True
+
+    def safe_text(self, text: str) -> str:
+        """Body text the current font can draw."""
+        if not self.unicode_text:
+            return to_latin1(text)
+        if not text:
+            return ""
+        for emoji, symbol in EMOJI_SYMBOLS.items():
+            text = text.replace(emoji, symbol)
+        cw = self.fonts[UNICODE_FAMILY.lower()]["cw"]
+        # Drop what the font has no glyph for (astral emoji, ZWJ, variation selectors)
+        return "".join(
+            ch for ch in text
+            if ch in "\n\t" or (ord(ch) < len(cw) and cw[ord(ch)])
+        )
+
+    def icon(self, category: str) -> str:
+        return category_symbol(category) if self.unicode_text else category_icon(category)
+
+    def _putfonts(self):
+        # FPDF writes the core fonts; the embedded TTFs are written here from
+        # the parsed-once fonts instead of FPDF re-reading the file per PDF
+        fonts = self.fonts
+        embedded = sorted(
+            (font for font in fonts.values() if font.get("type") == "TTF"), key=lambda f: f["i"]
+        )
+        self.fonts = {key: font for key, font in fonts.items() if font.get("type") != "TTF"}
+        try:
+            super()._putfonts()
+        finally:
+            self.fonts = fonts
+        for font in embedded:
+            # FPDF appends every character drawn to the subset list and
+            # tests membership in it per code point (_putTTfontwidths)
+            font["subset"] = set(font["subset"])
+            self._put_ttf(font, get_font(font["ttffile"]).subset(font["subset"]))
+
+    def _put_ttf(self, font: Dict, subset: FontSubset) -> None:
+        """
+        Type0 font with an Identity-H CIDFontType2 descendant (objects n+1 to
+        n+7), as FPDF.add_font(uni=True) fonts are written.
+        """
+        n = self.n
+        font["n"] = n + 1
+        fontname = "MPDFAA+" + font["name"]
+
+        self._newobj()
+        self._out("<</Type /Font /Subtype /Type0 /BaseFont /" + fontname + " /Encoding /Identity-H")
+        self._out(f"/DescendantFonts [{n + 2} 0 R] /ToUnicode {n + 3} 0 R>>")
+        self._out("endobj")
+
+        self._newobj()
+        self._out("<</Type /Font /Subtype /CIDFontType2 /BaseFont /" + fontname)
+        self._out(f"/CIDSystemInfo {n + 4} 0 R /FontDescriptor {n + 5} 0 R")
+        if font["desc"].get("MissingWidth"):
+            self._out("/DW %d" % font["desc"]["MissingWidth"])
+        self._putTTfontwidths(font, subset.max_code)
+        self._out(f"/CIDToGIDMap {n + 6} 0 R>>")
+        self._out("endobj")
+
+        self._newobj()
+        self._out("<</Length " + str(len(TO_UNICODE_CMAP)) + ">>")
+        self._putstream(TO_UNICODE_CMAP)
+        self._out("endobj")
+
+        self._newobj()
+        self._out("<</Registry (Adobe) /Ordering (UCS) /Supplement 0>>")
+        self._out("endobj")
+
+        self._newobj()
+        self._out("<</Type /FontDescriptor /FontName /" + fontname)
+        for key in ("Ascent", "Descent", "CapHeight", "Flags", "FontBBox", "ItalicAngle", "StemV", "MissingWidth"):
+            value = font["desc"][key]
+            if key == "Flags":
+                value = (value | 4) & ~32  # symbolic, not nonsymbolic
+            self._out(f" /{key} {value}")
+        self._out(f"/FontFile2 {n + 7} 0 R>>")
+        self._out("endobj")
+
+        self._newobj()
+        self._out("<</Length " + str(len(subset.cid_to_gid)) + " /Filter /FlateDecode>>")
+        self._putstream(subset.cid_to_gid)
+        self._out("endobj")
+
+        self._newobj()
+        self._out("<</Length " + str(len(subset.compressed)) + " /Filter /FlateDecode")
+        self._out("/Length1 " + str(subset.size) + ">>")
+        self._putstream(subset.compressed)
+        self._out("endobj")
 
     # ----- Header -----
     def header(self):
@@ -58,7 +277,7 @@ class HandoutPDF(FPDF):
         self.set_xy(10, 7)
         self.set_text_color(255, 255, 255)
         self.set_font("Helvetica", "B", 18)
-        self.cell(0, 8, to_latin1("Service Handout"), ln=1)
+        self.cell(0, 8, HEADER_TITLE_LATIN1, ln=1)
 
         if self.generated_on:
             self.set_font("Helvetica", "", 10)
@@ -77,31 +296,36 @@ class HandoutPDF(FPDF):
         self.set_y(-12)
         self.set_font("Helvetica", "I", 8)
         self.set_text_color(120, 120, 120)
-        footer_text = (
-            f"NFCM / Centraide - DISSA MVP  |  Page {self.page_no()}/{{nb}}"
-        )
-        self.cell(0, 6, to_latin1(footer_text), align="C")
+        footer_text = FOOTER_TEXT_LATIN1.format(page=self.page_no())
+        self.cell(0, 6, footer_text, align="C")
 
 
-def generate_pdf(
-    handout_text: str,
-    visitor_context: Dict,
-    services: Optional[List[Dict]] = None,
-) -> bytes:
+HEADER_TITLE_LATIN1 = to_latin1(HEADER_TITLE)
+FOOTER_TEXT_LATIN1 = to_latin1(FOOTER_TEXT)
+
+
+def _new_document(generated_on: str, unicode_text: bool = False) -> HandoutPDF:
     """
-    Generate a styled PDF.
-    If `services` is provided, we render one 'card' per service.
+    Document with the static parts set up: page format, header band, footer,
+    fonts (the unicode body font only if `unicode_text`).
     """
-
     pdf = HandoutPDF()
     pdf.set_auto_page_break(auto=True, margin=20)
     pdf.alias_nb_pages()
-    pdf.generated_on = datetime.now().strftime("%Y-%m-%d %H:%M")
+    pdf.generated_on = generated_on
+
+    paths = unicode_font_paths() if unicode_text else None
+    if paths:
+        pdf.use_unicode_font(paths)
 
     pdf.add_page()
     pdf.set_text_color(*BRAND_DARK)
-    pdf.set_font("Helvetica", size=12)
+    pdf.set_font(pdf.body_font, size=12)
+    return pdf
 
+
+def _layout_body(pdf: HandoutPDF, handout_text: str, services: Optional[List[Dict]]) -> None:
+    """Lay out the per-request part: intro, service cards, closing."""
     left_margin = 15
     right_margin = 15
     usable_width = 210 - left_margin - right_margin
@@ -118,15 +342,15 @@ def generate_pdf(
 
     if intro:
         pdf.set_xy(left_margin, pdf.get_y())
-        pdf.multi_cell(usable_width, 6, to_latin1(intro))
+        pdf.multi_cell(usable_width, 6, pdf.safe_text(intro))
         pdf.ln(4)
 
     # ----- Service cards -----
     if services:
-        pdf.set_font("Helvetica", "B", 13)
-        pdf.cell(0, 8, to_latin1("Services that may help you:"), ln=1)
+        pdf.set_font(pdf.body_font, "B", 13)
+        pdf.cell(0, 8, pdf.safe_text(CARDS_HEADING), ln=1)
         pdf.ln(2)
-        pdf.set_font("Helvetica", size=11)
+        pdf.set_font(pdf.body_font, size=11)
 
         for svc in services:
             name = svc.get("name", "Service")
@@ -134,7 +358,7 @@ def generate_pdf(
             address = svc.get("address", "")
             hours = svc.get("hours_today", "")
             category = svc.get("category", "")
-            icon = category_icon(category)
+            icon = pdf.icon(category)
 
             title_line = f"{icon}  {name}"
 
@@ -146,7 +370,7 @@ def generate_pdf(
             pdf.multi_cell(
                 usable_width,
                 7,
-                to_latin1(title_line),
+                pdf.safe_text(title_line),
                 border=1,
                 fill=True,
             )
@@ -165,7 +389,7 @@ def generate_pdf(
                 pdf.multi_cell(
                     usable_width,
                     6,
-                    to_latin1(body_text),
+                    pdf.safe_text(body_text),
                     border=1,
                     fill=False,
                 )
@@ -174,15 +398,16 @@ def generate_pdf(
 
     else:
         pdf.set_xy(left_margin, pdf.get_y())
-        pdf.multi_cell(usable_width, 7, to_latin1(handout_text or ""))
+        pdf.multi_cell(usable_width, 7, pdf.safe_text(handout_text or ""))
 
     # ----- Closing text -----
     if closing:
         pdf.ln(4)
-        pdf.set_font("Helvetica", size=11)
-        pdf.multi_cell(usable_width, 6, to_latin1(closing))
+        pdf.set_font(pdf.body_font, size=11)
+        pdf.multi_cell(usable_width, 6, pdf.safe_text(closing))
+
 
-    # ----------- FIXED RETURN BLOCK -----------
+def _output_bytes(pdf: HandoutPDF) -> bytes:
     out = pdf.output(dest="S")
 
     # FPDF (older) returns string → encode to bytes
@@ -195,3 +420,112 @@ def generate_pdf(
 
     # now always bytes
     return out
+
+
+@METRICS.timed("generate_pdf_seconds")
+def generate_pdf(
+    handout_text: str,
+    visitor_context: Dict,
+    services: Optional[List[Dict]] = None,
+    generated_on: Optional[str] = None,
+) -> bytes:
+    """
+    Generate a styled PDF.
+    If `services` is provided, we render one 'card' per service.
+    `generated_on` is the header stamp (default: now, to the minute).
+    """
+    pdf = _new_document(
+        generated_on or datetime.now().strftime("%Y-%m-%d %H:%M"),
+        needs_unicode(handout_text, services),
+    )
+    _layout_body(pdf, handout_text, services)
+    return _output_bytes(pdf)
+
+
+def generate_merged_pdf(handouts: List[Tuple[str, Dict, Optional[List[Dict]]]]) -> bytes:
+    """
+    One PDF with several handouts, each starting on a new page.
+    `handouts` is a list of (handout_text, visitor_context, services).
+    """
+    pdf = _new_document(
+        datetime.now().strftime("%Y-%m-%d %H:%M"),
+        any(needs_unicode(text, services) for text, _visitor_context, services in handouts),
+    )
+    for i, (handout_text, _visitor_context, services) in enumerate(handouts):
+        if i > 0:
+            pdf.add_page()
+            pdf.set_text_color(*BRAND_DARK)
+            pdf.set_font(pdf.body_font, size=12)
+        _layout_body(pdf, handout_text, services)
+    return _output_bytes(pdf)
+
+
+class PdfCache:
+    """
+    Bounded LRU of rendered handouts: (pdf bytes, base64 preview) per
+    (handout text hash, service ids, catalogue version, render date).
+    Streamlit reruns the handout page on every interaction; with this, only
+    the first run lays out and encodes the PDF. Cached handouts are stamped
+    with the date only, so the stamp is right for every hit.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, Tuple[bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(
+        handout_text: str,
+        services: Optional[List[Dict]],
+        catalogue_version: Optional[str],
+        day: str,
+    ) -> tuple:
+        text_hash = hashlib.sha256((handout_text or "").encode("utf-8")).hexdigest()
+        ids = tuple(str(svc.get("id")) for svc in services or [])
+        return (text_hash, ids, catalogue_version, day)
+
+    def get_or_render(
+        self,
+        handout_text: str,
+        visitor_context: Dict,
+        services: Optional[List[Dict]] = None,
+        catalogue_version: Optional[str] = None,
+    ) -> Tuple[bytes, str]:
+        day = date.today().isoformat()
+        key = self.key(handout_text, services, catalogue_version, day)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        pdf_bytes = generate_pdf(handout_text, visitor_context, services, generated_on=day)
+        entry = (pdf_bytes, base64.b64encode(pdf_bytes).decode("utf-8"))
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+
+_PDF_CACHE = PdfCache()
+
+
+def generate_pdf_cached(
+    handout_text: str,
+    visitor_context: Dict,
+    services: Optional[List[Dict]] = None,
+    catalogue_version: Optional[str] = None,
+) -> Tuple[bytes, str]:
+    """
+    Memoized generate_pdf: returns (pdf bytes, base64 for the inline
+    preview). The "Generated on" stamp is today's date.
+    """
+    return _PDF_CACHE.get_or_render(handout_text, visitor_context, services, catalogue_version)
@@ -0,0 +1,128 @@
+# core/profiling.py
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from core.config import get_setting
+
+log = logging.getLogger("dissa.reruns")
+
+
+class RerunProfiler:
+    """
+    Wall time per section of each Streamlit script run.
+
+    A full app run is bracketed by start_run() / end_run(); lap(name)
+    charges the time since the previous mark to section `name`. A fragment
+    wraps its body in fragment(name): inside a full run it is one more
+    section, on its own (a fragment-only rerun) it is a run of that name.
+
+    Each finished run is logged as one line and kept in a short history
+    for the sidebar panel. When disabled every call returns immediately.
+    """
+
+    def __init__(self, enabled: bool = False, history: int = 200):
+        self.enabled = enabled
+        self._history: deque = deque(maxlen=history)
+        self._lock = threading.Lock()
+        # Streamlit runs each session's script in its own thread
+        self._local = threading.local()
+
+    def _current(self) -> Optional[Dict]:
+        return getattr(self._local, "run", None)
+
+    def start_run(self, kind: str = "app") -> None:
+        if not self.enabled:
+            return
+        # A run cut short by st.rerun() / st.stop() never reached end_run
+        if self._current() is not None:
+            self.end_run(interrupted=True)
+        now = time.perf_counter()
+        self._local.run = {"kind": kind, "started": now, "mark": now, "sections": {}}
+
+    def lap(self, name: str) -> None:
+        run = self._current() if self.enabled else None
+        if run is None:
+            return
+        now = time.perf_counter()
+        run["sections"][name] = run["sections"].get(name, 0.0) + now - run["mark"]
+        run["mark"] = now
+
+    def end_run(self, interrupted: bool = False) -> None:
+        run = self._current() if self.enabled else None
+        if run is None:
+            return
+        self._local.run = None
+        total = time.perf_counter() - run["started"]
+        record = {
+            "at": time.time(),
+            "kind": run["kind"] + (" (interrupted)" if interrupted else ""),
+            "total": total,
+            "sections": run["sections"],
+        }
+        with self._lock:
+            self._history.append(record)
+        log.info(
+            "rerun %s %.1fms: %s",
+            record["kind"],
+            total * 1000,
+            " ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in run["sections"].items()),
+        )
+
+    @contextmanager
+    def fragment(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        if self._current() is not None:
+            # Rendered as part of a full run: the time so far belongs to
+            # whatever came before, the fragment body is its own section
+            self.lap("(before " + name + ")")
+            try:
+                yield
+            finally:
+                self.lap(name)
+            return
+        self.start_run(name)
+        try:
+            yield
+        finally:
+            self.lap(name)
+            self.end_run()
+
+    def recent(self, n: int = 20) -> List[Dict]:
+        with self._lock:
+            return list(self._history)[-n:]
+
+    def averages(self) -> Dict[str, Dict[str, float]]:
+        """Mean seconds per section, per run kind, over the history."""
+        with self._lock:
+            history = list(self._history)
+        sums: Dict[str, Dict[str, List[float]]] = {}
+        for record in history:
+            kind = sums.setdefault(record["kind"], {})
+            kind.setdefault("(total)", []).append(record["total"])
+            for name, seconds in record["sections"].items():
+                kind.setdefault(name, []).append(seconds)
+        return {
+            kind: {name: sum(values) / len(values) for name, values in sections.items()}
+            for kind, sections in sums.items()
+        }
+
+
+_PROFILER: Optional[RerunProfiler] = None
+_PROFILER_LOCK = threading.Lock()
+
+
+def get_rerun_profiler() -> RerunProfiler:
+    """Process-wide profiler, enabled by the profiling.reruns setting."""
+    global _PROFILER
+    if _PROFILER is None:
+        with _PROFILER_LOCK:
+            if _PROFILER is None:
+                _PROFILER = RerunProfiler(enabled=get_setting("profiling", "reruns", False))
+    return _PROFILER
@@ -1,53 +1,682 @@
+import heapq
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import weakref
+
+import numpy as np
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+
+from core.config import get_setting
+from core.metrics import METRICS
+
+
+# Visitor age groups offered by the front desk form
+AGE_GROUPS = ["Under 18", "18-29", "30-54", "55+"]
+ADULT_AGE_GROUPS = ["18-29", "30-54", "55+"]
+
+# Bitmasks are stored as uint64 words, one bit per vocabulary entry;
+# category / language masks grow extra words past 64 distinct values
+WORD_BITS = 64
+ALL_BITS = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Age bit reserved for age groups that no service names explicitly;
+# only "All" services carry it.
+OTHER_AGE_BIT = np.uint64(1 << (WORD_BITS - 1))
+
+# Housing situation (front desk form) -> keywords in the `population`
+# column that signal a service aimed at people in that situation.
+HOUSING_AFFINITY = {
+    "Homeless / unstably housed": ["homeless", "unstable housing", "unhoused"],
+    "Shelter": ["homeless", "shelter", "unstable housing"],
+}
+
+# Ranking weights, see ServiceIndex.score
+DEFAULT_WEIGHTS = {
+    "need": 1.0,            # per need matched by the service's categories
+    "language_exact": 2.0,  # offers the visitor's language (vs English fallback)
+    "age_specific": 1.0,    # targets the visitor's age group (vs "All")
+    "housing": 1.5,         # population matches the visitor's housing situation
+    "acceptance": 1.0,      # x staff acceptance rate (see set_acceptance_scores)
+}
+
+# Acceptance score for services with no history (set_acceptance_scores)
+DEFAULT_ACCEPTANCE = 0.8
+DEFAULT_TOP_K = 5
+
+# Binary snapshot of the catalogue, see build_snapshot
+SNAPSHOT_FORMAT = 4
+SNAPSHOT_SUFFIX = ".snapshot"
+
+# Index per loaded DataFrame, keyed by id() and dropped when the frame is
+# garbage collected. (df.attrs is deep-copied by pandas on every derived
+# frame, so it is not a good home for the index.)
+_INDEXES: Dict[int, "ServiceIndex"] = {}
+
+
+def normalize_age(value) -> str:
+    """Normalize a target_age cell / age group for matching ("All" == "all")."""
+    return str(value).strip().lower()
+
+
+def _bit(position: int) -> np.uint64:
+    return np.uint64(1 << position)
+
+
+if hasattr(np, "bitwise_count"):
+    _popcount = np.bitwise_count
+else:  # NumPy < 2.0
+    def _popcount(values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.uint64)
+        as_bytes = values.reshape(-1).view(np.uint8).reshape(-1, 8)
+        return np.unpackbits(as_bytes, axis=1).sum(axis=1).reshape(values.shape)
+
+
+def _multi_value_masks(values: pd.Series, sep: str = ";"):
+    """
+    Turn a ';'-separated column into one bitmask per row, as an
+    (rows, words) uint64 array with one word per 64 distinct values.
+    Returns (masks, vocabulary) where vocabulary maps value -> bit position.
+    """
+    values = values.reset_index(drop=True)
+    tokens = values.fillna("").astype(str).str.split(sep).explode().str.strip()
+    tokens = tokens[tokens != ""]
+    codes, uniques = pd.factorize(tokens, sort=True)
+
+    words = max(1, -(-len(uniques) // WORD_BITS))
+    masks = np.zeros((len(values), words), dtype=np.uint64)
+    rows = tokens.index.to_numpy()
+    codes = codes.astype(np.uint64)
+    np.bitwise_or.at(
+        masks,
+        (rows, (codes // WORD_BITS).astype(np.intp)),
+        np.left_shift(np.uint64(1), codes % np.uint64(WORD_BITS)),
+    )
+    vocabulary = {value: i for i, value in enumerate(uniques)}
+    return masks, vocabulary
+
+
+def _query_words(vocabulary: Dict[str, int], keys, words: int) -> np.ndarray:
+    """Bit positions of `keys` (unknown keys ignored) as a (words,) uint64 array."""
+    out = np.zeros(words, dtype=np.uint64)
+    for key in keys:
+        position = vocabulary.get(key)
+        if position is not None:
+            out[position // WORD_BITS] |= _bit(position % WORD_BITS)
+    return out
+
+
+def _any_bits(masks: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Per row: does the (rows, words) mask share any bit with the query?"""
+    if masks.shape[1] == 1:
+        return (masks[:, 0] & query[0]) != 0
+    return ((masks & query) != 0).any(axis=1)
+
+
+def _mask_column(masks: np.ndarray):
+    """Mask column for the DataFrame: uint64, or Python ints past 64 bits."""
+    if masks.shape[1] == 1:
+        return masks[:, 0]
+    return [
+        sum(int(word) << (WORD_BITS * i) for i, word in enumerate(row)) for row in masks
+    ]
+
+
+def _age_masks(target_ages: pd.Series):
+    """
+    Map target_age to the set of visitor age groups (AGE_GROUPS) it accepts:
+    - "All" / "all" -> every group
+    - "18+"         -> every adult group
+    - a group name  -> that group (case-insensitive); ';'-separated lists
+      accept each listed group
+    - anything else -> no group (never matched)
+    """
+    vocabulary = {normalize_age(g): _bit(i) for i, g in enumerate(AGE_GROUPS)}
+    adult = np.uint64(0)
+    for g in ADULT_AGE_GROUPS:
+        adult |= vocabulary[normalize_age(g)]
+
+    lookup = dict(vocabulary)
+    lookup["all"] = ALL_BITS
+    lookup["18+"] = adult
+
+    masks = {}
+    for value in target_ages.map(normalize_age).unique():
+        mask = np.uint64(0)
+        for part in value.split(";"):
+            mask |= lookup.get(part.strip(), np.uint64(0))
+        masks[value] = mask
+    normalized = target_ages.map(normalize_age)
+    return normalized.map(masks).to_numpy(dtype=np.uint64), vocabulary
+
+
+class ServiceIndex:
+    """
+    Compact numeric view of the services catalogue, built once at load time.
+
+    Category, languages and target_age are each stored as a uint64
+    bitmask per service (category / language masks use one word per 64
+    distinct values), so a query is a few vectorised bitwise ANDs over
+    the whole catalogue instead of a DataFrame scan.
+    """
+
+    # Array attributes persisted in a snapshot (besides housing_affinity)
+    ARRAYS = ["category_mask", "language_mask", "age_mask", "age_specific", "service_ids"]
+
+    def __init__(self, df: Optional[pd.DataFrame] = None):
+        if df is None:
+            return  # filled in by from_snapshot
+        self.size = len(df)
+        self.category_mask, self.category_bits = _multi_value_masks(df["category"])
+        self.language_mask, self.language_bits = _multi_value_masks(df["languages"])
+        self.age_mask, self.age_bits = _age_masks(df["target_age"])
+        self.age_specific = self.age_mask != ALL_BITS
+        self.service_ids = df["id"].to_numpy()
+        self.acceptance = np.full(self.size, DEFAULT_ACCEPTANCE)
+        self._acceptance_source = None
+        self._record_cache = None
+
+        population = df["population"].fillna("").astype(str).reset_index(drop=True)
+        self.housing_affinity = {
+            status: population.str.contains(
+                "|".join(re.escape(k) for k in keywords), case=False, regex=True
+            ).to_numpy()
+            for status, keywords in HOUSING_AFFINITY.items()
+        }
+        self._build_groups()
+
+    def _build_groups(self) -> None:
+        """
+        Group rows that share every attribute matching and scoring look at
+        (category, languages, target age, housing affinity). A catalogue
+        has few such groups, so a query evaluates the bitmasks once per
+        group instead of once per row.
+        - group_rows lists each group's rows in catalogue order,
+          group_starts[g]:group_starts[g + 1] being group g's slice
+        - ranked_rows is the same with each group sorted by acceptance
+          (see set_acceptance), so top_k can merge the groups lazily
+        """
+        columns = [self.category_mask, self.language_mask, self.age_mask[:, None]]
+        columns += [np.asarray(a, dtype=np.uint64)[:, None] for a in self.housing_affinity.values()]
+        rows = np.ascontiguousarray(np.concatenate(columns, axis=1))
+        keys = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+        self.row_group = inverse.reshape(-1)
+        self.group_category = self.category_mask[first]
+        self.group_language = self.language_mask[first]
+        self.group_age = self.age_mask[first]
+        self.group_age_specific = self.age_specific[first]
+        self.group_housing = {status: a[first] for status, a in self.housing_affinity.items()}
+
+        self.group_rows = np.argsort(self.row_group, kind="stable")
+        self.group_starts = np.concatenate(
+            [[0], np.cumsum(np.bincount(self.row_group, minlength=len(first)))]
+        )
+        self._rank_by_acceptance(self.acceptance)
+
+    def _rank_by_acceptance(self, acceptance: np.ndarray) -> None:
+        # Within each group: highest acceptance first, then catalogue order
+        order = np.lexsort((np.arange(self.size), -acceptance, self.row_group))
+        # Swapped in as one tuple so top_k never mixes old and new
+        self._ranking = (acceptance, order)
+
+    def to_snapshot(self):
+        """Return (arrays, manifest entries) for build_snapshot."""
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        statuses = list(self.housing_affinity)
+        for i, status in enumerate(statuses):
+            arrays[f"housing_{i}"] = self.housing_affinity[status]
+        meta = {name: dict(getattr(self, name)) for name in ("category_bits", "language_bits")}
+        meta["age_bits"] = {key: int(bit).bit_length() - 1 for key, bit in self.age_bits.items()}
+        meta["housing_statuses"] = statuses
+        meta["size"] = self.size
+        return arrays, meta
+
+    @classmethod
+    def from_snapshot(cls, arrays: Dict[str, np.ndarray], meta: Dict) -> "ServiceIndex":
+        index = cls()
+        index.size = meta["size"]
+        for name in cls.ARRAYS:
+            setattr(index, name, arrays[name])
+        index.category_bits = dict(meta["category_bits"])
+        index.language_bits = dict(meta["language_bits"])
+        index.age_bits = {key: _bit(pos) for key, pos in meta["age_bits"].items()}
+        index.housing_affinity = {
+            status: arrays[f"housing_{i}"]
+            for i, status in enumerate(meta["housing_statuses"])
+        }
+        index.acceptance = np.full(index.size, DEFAULT_ACCEPTANCE)
+        index._acceptance_source = None
+        index._record_cache = None
+        index._build_groups()
+        return index
+
+    def set_acceptance(self, scores: Dict[int, float]) -> None:
+        """
+        Per-service acceptance scores (service id -> 0..1), e.g. from
+        AnalyticsStore.acceptance_scores(). Services not in `scores` get
+        DEFAULT_ACCEPTANCE. The array is swapped in whole.
+        """
+        if scores is self._acceptance_source:
+            return
+        acceptance = np.array(
+            [scores.get(int(i), DEFAULT_ACCEPTANCE) for i in self.service_ids],
+            dtype=np.float64,
+        )
+        self._rank_by_acceptance(acceptance)
+        self.acceptance = acceptance
+        self._acceptance_source = scores
+
+    def _group_eligible(self, needs: List[str], language: str, age_group: str) -> np.ndarray:
+        need_bits = _query_words(self.category_bits, needs, self.category_mask.shape[1])
+        lang_bits = _query_words(self.language_bits, [language, "English"], self.language_mask.shape[1])
+        age_bits = self.age_bits.get(normalize_age(age_group), OTHER_AGE_BIT)
+
+        return (
+            _any_bits(self.group_category, need_bits)
+            & _any_bits(self.group_language, lang_bits)
+            & ((self.group_age & age_bits) != 0)
+        )
+
+    def _group_scores(
+        self,
+        needs: List[str],
+        language: str,
+        housing_status: Optional[str],
+        w: Dict[str, float],
+    ) -> np.ndarray:
+        # Every score component except acceptance, per group
+        need_bits = _query_words(self.category_bits, needs, self.category_mask.shape[1])
+        lang_bit = _query_words(self.language_bits, [language], self.language_mask.shape[1])
+
+        scores = w["need"] * _popcount(self.group_category & need_bits).sum(axis=1)
+        scores = scores + w["language_exact"] * _any_bits(self.group_language, lang_bit)
+        scores = scores + w["age_specific"] * self.group_age_specific
+
+        affinity = self.group_housing.get(housing_status)
+        if affinity is not None:
+            scores = scores + w["housing"] * affinity
+
+        return scores.astype(np.float64)
+
+    def eligible(self, needs: List[str], language: str, age_group: str) -> np.ndarray:
+        """Boolean array: which services pass the need, language and age filters."""
+        return self._group_eligible(needs, language, age_group)[self.row_group]
+
+    def match(self, needs: List[str], language: str, age_group: str) -> np.ndarray:
+        """Return matching row positions, in catalogue (CSV) order."""
+        return np.flatnonzero(self.eligible(needs, language, age_group))
+
+    def score(
+        self,
+        positions: np.ndarray,
+        needs: List[str],
+        language: str,
+        housing_status: Optional[str] = None,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> np.ndarray:
+        """
+        Relevance score for the given candidate positions:
+        - more needs matched ranks higher
+        - exact language beats the English fallback
+        - a specific age group beats "All"
+        - population matching the housing situation ranks higher
+        - services staff keep (rather than remove) rank higher
+        """
+        w = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        scores = self._group_scores(needs, language, housing_status, w)[self.row_group[positions]]
+        if w["acceptance"]:
+            scores = scores + w["acceptance"] * self.acceptance[positions]
+        return scores
+
+    def top_k(
+        self,
+        needs: List[str],
+        language: str,
+        age_group: str,
+        housing_status: Optional[str] = None,
+        k: int = DEFAULT_TOP_K,
+        weights: Optional[Dict[str, float]] = None,
+    ) -> List[int]:
+        """
+        Best k eligible positions, highest score first; ties keep
+        catalogue order.
+
+        Rows of a group share every score component but acceptance, so
+        each group's rows are already in score order (ranked_rows, or
+        group_rows when acceptance is not weighted). The groups are then
+        merged with a heap until k rows are out: the cost depends on k
+        and the number of groups, not on the catalogue size.
+        """
+        if k <= 0:
+            return []
+        w = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        weight = w["acceptance"]
+        if weight < 0:
+            return self._top_k_scan(needs, language, age_group, housing_status, k, w)
+
+        acceptance, ranked = self._ranking
+        rows = ranked if weight else self.group_rows
+        starts = self.group_starts
+        group_scores = self._group_scores(needs, language, housing_status, w).tolist()
+
+        heap = []
+        for group in np.flatnonzero(self._group_eligible(needs, language, age_group)).tolist():
+            start = int(starts[group])
+            row = int(rows[start])
+            score = group_scores[group] + weight * acceptance[row] if weight else group_scores[group]
+            heap.append((-score, row, start, group))
+        heapq.heapify(heap)
+
+        best = []
+        while heap and len(best) < k:
+            _, row, i, group = heapq.heappop(heap)
+            best.append(row)
+            i += 1
+            if i < starts[group + 1]:
+                row = int(rows[i])
+                score = group_scores[group] + weight * acceptance[row] if weight else group_scores[group]
+                heapq.heappush(heap, (-score, row, i, group))
+        return best
+
+    def _top_k_scan(
+        self,
+        needs: List[str],
+        language: str,
+        age_group: str,
+        housing_status: Optional[str],
+        k: int,
+        w: Dict[str, float],
+    ) -> List[int]:
+        # Scores every eligible row; used when acceptance counts against a
+        # service, which reverses the per-group order top_k relies on.
+        positions = self.match(needs, language, age_group)
+        if len(positions) == 0:
+            return []
+
+        scores = self.score(positions, needs, language, housing_status, w)
+
+        # Cut the candidate set down to exactly k with a linear-time
+        # partition, then order just those with a bounded heap. Positions
+        # are ascending, so ties at the threshold keep catalogue order.
+        if len(positions) > k:
+            threshold = np.partition(scores, -k)[-k]
+            above = scores > threshold
+            ties = np.flatnonzero(scores == threshold)[: k - int(above.sum())]
+            keep = np.concatenate([np.flatnonzero(above), ties])
+            positions, scores = positions[keep], scores[keep]
+
+        best = heapq.nlargest(
+            k, zip(scores.tolist(), (-positions).tolist())
+        )
+        return [-neg_pos for _, neg_pos in best]
+
+    def records(self, df: pd.DataFrame, positions: List[int]) -> List[Dict]:
+        """
+        Rows of df at `positions` as plain dicts, same as
+        df.iloc[positions].to_dict(orient="records"). A row is converted
+        the first time it is retrieved and copied out of a per-index cache
+        after that, so the columns are never converted wholesale (snapshot
+        text columns stay memory-mapped). df is treated as read-only.
+        """
+        columns = tuple(df.columns)
+        cache = self._record_cache
+        if cache is None or cache[0] != columns:
+            cache = (columns, {})
+            self._record_cache = cache
+
+        rows = cache[1]
+        missing = [p for p in dict.fromkeys(positions) if p not in rows]
+        if missing:
+            rows.update(zip(missing, df.iloc[missing].to_dict(orient="records")))
+        return [dict(rows[p]) for p in positions]
 
 
 def load_services(path: str = "data/services_sample.csv") -> pd.DataFrame:
+    """
+    Load the services catalogue with its retrieval index.
+    Uses the binary snapshot next to the CSV when it is newer than the CSV,
+    otherwise parses the CSV.
+    """
+    snapshot_dir = snapshot_path(path)
+    if _snapshot_is_fresh(path, snapshot_dir):
+        try:
+            return load_snapshot(snapshot_dir)
+        except Exception:
+            logging.exception("Could not read snapshot %s; parsing CSV", snapshot_dir)
+
     df = pd.read_csv(path)
-    # Normalize language column into list
-    df["languages_list"] = df["languages"].apply(
-        lambda x: [l.strip() for l in str(x).split(";")]
+    # Build the retrieval index once; retrieve_services reuses it
+    index = get_service_index(df)
+    _add_mask_columns(df, index)
+    return df
+
+
+def retrieval_settings() -> Tuple[int, Dict[str, float]]:
+    """
+    top_k and ranking weights from the [retrieval] settings:
+    - top_k (DISSA_RETRIEVAL_TOP_K)
+    - weight_<name> for each DEFAULT_WEIGHTS entry
+      (e.g. DISSA_RETRIEVAL_WEIGHT_HOUSING)
+    """
+    top_k = int(get_setting("retrieval", "top_k", DEFAULT_TOP_K))
+    weights = {
+        name: float(get_setting("retrieval", f"weight_{name}", default))
+        for name, default in DEFAULT_WEIGHTS.items()
+    }
+    return top_k, weights
+
+
+def set_acceptance_scores(df: pd.DataFrame, scores: Dict[int, float]) -> None:
+    """Feed staff acceptance scores (service id -> 0..1) into ranking for df."""
+    get_service_index(df).set_acceptance(scores)
+
+
+def _add_mask_columns(df: pd.DataFrame, index: ServiceIndex) -> None:
+    # Expose the numeric columns alongside the raw ones
+    df["language_mask"] = _mask_column(index.language_mask)
+    df["age_mask"] = index.age_mask
+
+
+def _register_index(df: pd.DataFrame, index: ServiceIndex) -> None:
+    key = id(df)
+    _INDEXES[key] = index
+    weakref.finalize(df, _INDEXES.pop, key, None)
+
+
+def get_service_index(df: pd.DataFrame) -> ServiceIndex:
+    """Return the index registered for df, building it on first use."""
+    index = _INDEXES.get(id(df))
+    if index is None or index.size != len(df):
+        index = ServiceIndex(df)
+        _register_index(df, index)
+    return index
+
+
+# ---------- Binary snapshot ----------
+#
+# A snapshot is a directory next to the CSV (services_sample.csv.snapshot/)
+# holding one uncompressed .npy file per column and per index array, plus a
+# manifest.json with column order and index vocabularies. A text column is
+# a UTF-8 byte blob plus int64 offsets, the Arrow large_string layout, so
+# load_snapshot can wrap the memory-mapped files in Arrow string arrays
+# without copying. Every column and index array is then shared through the
+# page cache by all worker processes.
+
+
+def snapshot_path(csv_path: str) -> str:
+    return csv_path + SNAPSHOT_SUFFIX
+
+
+def _snapshot_is_fresh(csv_path: str, snapshot_dir: str) -> bool:
+    manifest = os.path.join(snapshot_dir, "manifest.json")
+    try:
+        return os.path.getmtime(manifest) >= os.path.getmtime(csv_path)
+    except OSError:
+        return False
+
+
+def build_snapshot(csv_path: str, out_dir: Optional[str] = None) -> str:
+    """Compile the CSV into a binary snapshot directory; returns its path."""
+    out_dir = out_dir or snapshot_path(csv_path)
+    df = pd.read_csv(csv_path)
+    index = ServiceIndex(df)
+
+    columns = []
+    arrays = {}
+    for name in df.columns:
+        col = df[name]
+        if pd.api.types.is_numeric_dtype(col) and not col.isna().any():
+            arrays[f"col_{len(columns)}"] = col.to_numpy()
+            kind = "numeric"
+        else:
+            blob, offsets = _encode_text(col.fillna("").astype(str))
+            arrays[f"col_{len(columns)}"] = blob
+            arrays[f"offsets_{len(columns)}"] = offsets
+            if col.isna().any():
+                arrays[f"null_{len(columns)}"] = col.isna().to_numpy()
+            kind = "text"
+        columns.append({"name": name, "kind": kind})
+
+    index_arrays, index_meta = index.to_snapshot()
+    arrays.update({f"index_{k}": v for k, v in index_arrays.items()})
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "source": os.path.abspath(csv_path),
+        "rows": len(df),
+        "columns": columns,
+        "index": index_meta,
+    }
+
+    # Write into a temp dir and swap it in, so readers never see a partial one
+    tmp_dir = f"{out_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, arr in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), arr, allow_pickle=False)
+    # Manifest last: its mtime marks the snapshot as complete
+    with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+    old_dir = f"{out_dir}.old-{os.getpid()}"
+    if os.path.exists(out_dir):
+        os.replace(out_dir, old_dir)
+    os.replace(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return out_dir
+
+
+def _encode_text(values: pd.Series):
+    """Strings -> (UTF-8 blob as uint8, int64 offsets with len(values) + 1 entries)."""
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    # At least one byte: numpy cannot memory-map an empty array
+    blob = np.frombuffer(b"".join(encoded) or b"\0", dtype=np.uint8)
+    return blob, offsets
+
+
+def _text_column(blob: np.ndarray, offsets: np.ndarray, nulls: Optional[np.ndarray]) -> pd.Series:
+    """
+    Text column over the snapshot buffers. With pyarrow the Series reads
+    straight from the (memory-mapped) blob and offsets; without it the
+    strings are decoded into a per-process object column.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        data = bytes(blob)
+        bounds = offsets.tolist()
+        values = [data[a:b].decode("utf-8") for a, b in zip(bounds[:-1], bounds[1:])]
+        series = pd.Series(values, dtype=object)
+        if nulls is not None:
+            series[nulls] = np.nan
+        return series
+
+    validity = None if nulls is None else pa.py_buffer(np.packbits(~nulls, bitorder="little"))
+    array = pa.LargeStringArray.from_buffers(
+        len(offsets) - 1, pa.py_buffer(offsets), pa.py_buffer(blob), validity
     )
+    return pd.Series(array, dtype=pd.StringDtype("pyarrow", na_value=np.nan))
+
+
+def load_snapshot(snapshot_dir: str, mmap: bool = True) -> pd.DataFrame:
+    """
+    Load a catalogue snapshot. With mmap (and pyarrow installed for the
+    text columns) the frame and the index are views over the memory-mapped
+    files; only the derived mask columns and per-group index arrays are
+    built per process.
+    """
+    with open(os.path.join(snapshot_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format: {manifest.get('format')}")
+
+    mmap_mode = "r" if mmap else None
+
+    def _load(name):
+        return np.load(os.path.join(snapshot_dir, f"{name}.npy"), mmap_mode=mmap_mode)
+
+    data = {}
+    for i, column in enumerate(manifest["columns"]):
+        values = _load(f"col_{i}")
+        if column["kind"] == "text":
+            null_file = os.path.join(snapshot_dir, f"null_{i}.npy")
+            nulls = np.load(null_file) if os.path.exists(null_file) else None
+            data[column["name"]] = _text_column(values, _load(f"offsets_{i}"), nulls)
+        else:
+            data[column["name"]] = pd.Series(values.view(np.ndarray), copy=False)
+    # copy=False keeps the memory-mapped buffers instead of consolidating them
+    df = pd.DataFrame(data, copy=False)
+
+    index_meta = manifest["index"]
+    index_arrays = {name: _load(f"index_{name}") for name in ServiceIndex.ARRAYS}
+    for i in range(len(index_meta["housing_statuses"])):
+        index_arrays[f"housing_{i}"] = _load(f"index_housing_{i}")
+    index = ServiceIndex.from_snapshot(index_arrays, index_meta)
+
+    _register_index(df, index)
+    _add_mask_columns(df, index)
     return df
 
 
+@METRICS.timed("retrieve_services_seconds")
 def retrieve_services(
     df: pd.DataFrame,
     needs: List[str],
     language: str,
     age_group: str,
+    housing_status: Optional[str] = None,
+    top_k: int = DEFAULT_TOP_K,
+    weights: Optional[Dict[str, float]] = None,
 ) -> List[Dict]:
     """
-    Simple tag-based retrieval:
+    Tag-based retrieval with relevance ranking:
     - category matches one of the needs
     - language matches or falls back to English
-    - age_group roughly compatible (or 'all')
-    """
-
-    # Filter by category / need
-    filtered = df[df["category"].isin(needs)].copy()
+    - age_group compatible ("All", "18+" for adults, or exact group)
+    - the top_k best-scoring services are returned (see ServiceIndex.score;
+      `weights` overrides entries of DEFAULT_WEIGHTS)
 
-    # Language filter with English fallback
-    def lang_ok(row):
-        langs = row["languages_list"]
-        return (language in langs) or ("English" in langs)
-
-    filtered = filtered[filtered.apply(lang_ok, axis=1)]
-
-    # Age filter (rough for MVP)
-    def age_ok(row):
-        if row["target_age"] == "all":
-            return True
-        if row["target_age"] == "18+" and age_group in ["18-29", "30-54", "55+"]:
-            return True
-        if row["target_age"] == age_group:
-            return True
-        return False
+    Matching and scoring run against the precomputed ServiceIndex
+    bitmasks, so only the selected rows are ever materialised.
+    """
+    index = get_service_index(df)
+    positions = index.top_k(
+        needs, language, age_group, housing_status, k=top_k, weights=weights
+    )
 
-    filtered = filtered[filtered.apply(age_ok, axis=1)]
+    # Convert to list of dicts for the LLM
+    return index.records(df, positions)
 
-    # Limit to top N for readability
-    top = filtered.head(5)
 
-    # Convert to list of dicts for the LLM
-    return top.to_dict(orient="records")
+if __name__ == "__main__":
+    # python -m core.retrieval [path/to/services.csv]
+    csv = sys.argv[1] if len(sys.argv) > 1 else "data/services_sample.csv"
+    print("Wrote", build_snapshot(csv))
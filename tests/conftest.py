@@ -0,0 +1,10 @@
+# tests/conftest.py
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def local_data_dir(tmp_path, monkeypatch):
+    """Keep caches, queues and stores of every test in its own temp dir."""
+    monkeypatch.setenv("DISSA_LOCAL_DATA_DIR", str(tmp_path / "local"))
+    return tmp_path / "local"
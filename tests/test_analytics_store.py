@@ -0,0 +1,191 @@
+# tests/test_analytics_store.py
+
+import pandas as pd
+import pytest
+
+from core import interaction_storage
+from core.analytics_store import INTERACTION_COLUMNS, AnalyticsStore
+
+
+def interaction(
+    i: int,
+    day: str = "2026-01-15",
+    needs: str = "food;health",
+    kept: str = "1;2",
+    removed: str = "",
+    language: str = "Cree",
+) -> list:
+    timestamp = f"{day}T10:{i // 60 % 60:02d}:{i % 60:02d}"
+    return [f"{timestamp}_2", timestamp, "NFCM", "18-29", language, "Shelter", needs, kept, removed, 2]
+
+
+class FakeSheet:
+    """Stands in for the interactions worksheet behind the storage interface."""
+
+    name = "sheets"
+    label = "fake sheet"
+
+    def __init__(self):
+        self.rows = []
+        self.reads = []
+
+    def load_rows(self, start_row: int):
+        self.reads.append(start_row)
+        return list(INTERACTION_COLUMNS), [list(r) for r in self.rows[start_row - 2:]]
+
+
+@pytest.fixture
+def sheet(monkeypatch):
+    fake = FakeSheet()
+    monkeypatch.setattr(interaction_storage, "_STORAGE", fake)
+    return fake
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AnalyticsStore(db_path=str(tmp_path / "analytics.sqlite"))
+
+
+def test_sync_reads_only_rows_after_high_water_mark(store, sheet):
+    sheet.rows = [interaction(i) for i in range(3)]
+    assert store.sync(force=True) == 3
+    assert store.last_row == 4
+
+    sheet.rows += [interaction(i) for i in range(3, 5)]
+    assert store.sync(force=True) == 2
+    assert sheet.reads == [2, 5]
+    assert store.last_row == 6
+    assert store.count() == 5
+    assert store.summary()["total"] == 5
+
+    assert store.sync(force=True) == 0
+    assert sheet.reads[-1] == 7
+    assert store.last_row == 6
+
+
+def test_sync_skipped_until_stale(store, sheet):
+    sheet.rows = [interaction(0)]
+    store.sync(force=True)
+    sheet.rows.append(interaction(1))
+    assert store.sync() == 0
+    assert sheet.reads == [2]
+
+
+def test_overlapping_ingest_is_not_counted_twice(store):
+    rows = [interaction(i) for i in range(4)]
+    store.ingest(INTERACTION_COLUMNS, rows, first_row=2)
+    store.ingest(INTERACTION_COLUMNS, rows[2:], first_row=4)
+    assert store.count() == 4
+    assert store.rollup("need").to_dict() == {"food": 4, "health": 4}
+    assert store.last_row == 5
+
+
+def test_blank_rows_advance_the_mark(store):
+    rows = [interaction(0), ["", "", ""], interaction(1)]
+    assert store.ingest(INTERACTION_COLUMNS, rows, first_row=2) == 2
+    assert store.last_row == 4
+
+
+def test_rollups_survive_rebuild(store):
+    store.ingest(INTERACTION_COLUMNS, [interaction(0), interaction(1, day="2026-01-16", kept="3")], first_row=2)
+    before = {dim: store.rollup(dim).to_dict() for dim in ("need", "service_id", "language")}
+    store.rebuild_rollups()
+    assert {dim: store.rollup(dim).to_dict() for dim in before} == before
+    assert store.rollup("service_id", since_day="2026-01-16").to_dict() == {"3": 1}
+
+
+def test_import_then_sync_reads_every_sheet_row(store, sheet, tmp_path):
+    path = tmp_path / "history.csv"
+    history = [interaction(i, day="2025-06-01", needs="culture", kept="9") for i in range(2)]
+    pd.DataFrame(history, columns=INTERACTION_COLUMNS).to_csv(path, index=False)
+    assert store.import_csv(str(path)) == 2
+    assert store.last_row == 1
+
+    sheet.rows = [interaction(i) for i in range(3)]
+    assert store.sync(force=True) == 3
+    assert sheet.reads == [2]
+    assert store.count() == 5
+    assert store.rollup("need").to_dict() == {"culture": 2, "food": 3, "health": 3}
+
+    # Importing the same file again adds nothing
+    assert store.import_csv(str(path)) == 0
+    assert store.count() == 5
+
+    # Another file goes below the first and still leaves the cursor alone
+    other = tmp_path / "older.csv"
+    pd.DataFrame([interaction(0, day="2025-05-01", needs="housing")], columns=INTERACTION_COLUMNS).to_csv(other, index=False)
+    assert store.import_csv(str(other)) == 1
+    assert store.last_row == 4
+    sheet.rows.append(interaction(3))
+    assert store.sync(force=True) == 1
+    assert store.count() == 7
+    assert store.load_df()["needs"].tolist()[:3] == ["housing", "culture", "culture"]
+
+
+def test_reset_keeps_imported_rows(store, sheet, tmp_path):
+    path = tmp_path / "history.csv"
+    pd.DataFrame([interaction(0, day="2025-06-01", needs="culture")], columns=INTERACTION_COLUMNS).to_csv(path, index=False)
+    store.import_csv(str(path))
+    sheet.rows = [interaction(i) for i in range(3)]
+    store.sync(force=True)
+
+    store.reset()
+    assert store.count() == 1
+    assert store.last_row == 1
+    assert store.rollup("need").to_dict() == {"culture": 1}
+    assert store.top_services().to_dict() == {1: 1, 2: 1}
+
+    assert store.sync(force=True) == 3
+    assert store.count() == 4
+    assert store.rollup("need").to_dict() == {"culture": 1, "food": 3, "health": 3}
+
+
+def acceptance_rows() -> list:
+    """Service 1: shown 4, removed 1. Service 2: shown 4, never removed. Service 3: shown once (French), removed."""
+    return [
+        interaction(0, kept="2", removed="1"),
+        interaction(1),
+        interaction(2),
+        interaction(3),
+        interaction(4, kept="", removed="3", language="French"),
+    ]
+
+
+def test_acceptance_rate_is_kept_over_shown(store):
+    store.ingest(INTERACTION_COLUMNS, acceptance_rows(), first_row=2)
+    df = store.acceptance()
+    assert df["service_id"].tolist() == [3, 1, 2]  # lowest acceptance first
+    by_id = df.set_index("service_id")
+    assert by_id.loc[1, ["shown", "removed"]].tolist() == [4, 1]
+    assert by_id["acceptance_rate"].to_dict() == pytest.approx({1: 0.75, 2: 1.0, 3: 0.0})
+
+    assert store.acceptance(language="French")["service_id"].tolist() == [3]
+    assert store.acceptance(language="Cree", age_group="18-29")["service_id"].tolist() == [1, 2]
+    assert store.acceptance(age_group="55+").empty
+
+
+def test_acceptance_min_shown_hides_rare_services(store):
+    store.ingest(INTERACTION_COLUMNS, acceptance_rows(), first_row=2)
+    assert store.acceptance(min_shown=2)["service_id"].tolist() == [1, 2]
+    assert store.acceptance(min_shown=5).empty
+    assert len(store.acceptance(min_shown=0)) == 3
+
+
+def test_acceptance_scores_are_smoothed_towards_prior(store):
+    store.ingest(INTERACTION_COLUMNS, acceptance_rows(), first_row=2)
+    # (shown - removed + prior * weight) / (shown + weight), prior 0.8, weight 5
+    assert store.acceptance_scores() == pytest.approx({1: 7 / 9, 2: 8 / 9, 3: 4 / 6})
+    # A single removal moves a rarely shown service less than a raw rate would
+    assert store.acceptance_scores()[3] > store.acceptance().set_index("service_id").loc[3, "acceptance_rate"]
+
+
+def test_acceptance_scores_refresh_after_ingest(store):
+    store.ingest(INTERACTION_COLUMNS, acceptance_rows(), first_row=2)
+    first = store.acceptance_scores()
+    assert store.acceptance_scores() is first
+
+    store.ingest(INTERACTION_COLUMNS, [interaction(5, kept="", removed="2")], first_row=7)
+    assert store.acceptance_scores()[2] == pytest.approx(8 / 10)
+
+    store.rebuild_acceptance()
+    assert store.acceptance_scores()[2] == pytest.approx(8 / 10)
@@ -0,0 +1,23 @@
+import io
+import zipfile
+
+from core.batch import generate_batch, need_pair_contexts
+from core.options import NEED_VALUES
+
+
+def test_need_pairs_cover_every_form_option():
+    contexts = need_pair_contexts(["Cree"])
+    assert {n for c in contexts for n in c["needs"]} == set(NEED_VALUES)
+
+
+def test_count_skips_contexts_without_services():
+    contexts = need_pair_contexts(["English"], needs=["food", "health"])
+    contexts.append(dict(contexts[0], needs=["no_such_need"]))
+
+    data, written = generate_batch(contexts, "zip", workers=1)
+    assert written == 1
+    assert len(zipfile.ZipFile(io.BytesIO(data)).namelist()) == 1
+
+    data, written = generate_batch(contexts, "merged", workers=1)
+    assert written == 1
+    assert data.startswith(b"%PDF")
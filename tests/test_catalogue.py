@@ -0,0 +1,113 @@
+# tests/test_catalogue.py
+
+import os
+
+import pytest
+
+from core import catalogue
+from core.catalogue import ServiceCatalogue, get_catalogue
+
+HEADER = "id,name,category,languages,target_age,population,description,address,hours_today,eligibility\n"
+ROW_1 = '1,Community Meal Program,food,"Cree;English",All,Everyone,Hot lunch.,1 Main St,Mon 11:30,Open to all.\n'
+ROW_2 = '2,Drop-In Clinic,health,"English;French",18+,Adults,Walk-in care.,2 Main St,Tue 9:00,Adults 18+.\n'
+
+
+def write_csv(path, *rows, mtime_ns=None):
+    path.write_text(HEADER + "".join(rows), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "services.csv"
+    write_csv(path, ROW_1, mtime_ns=1_000_000_000_000)
+    return path
+
+
+@pytest.fixture
+def hash_calls(monkeypatch):
+    """Count how often the catalogue hashes the file."""
+    calls = []
+    real_hash = catalogue._file_hash
+
+    def counting_hash(path):
+        calls.append(path)
+        return real_hash(path)
+
+    monkeypatch.setattr(catalogue, "_file_hash", counting_hash)
+    return calls
+
+
+def test_first_load_builds_version_one(csv_path):
+    snapshot = ServiceCatalogue(str(csv_path), check_interval=0).current()
+    assert snapshot.version == 1
+    assert list(snapshot.df["id"]) == [1]
+    assert len(snapshot.content_hash) == 64
+
+
+def test_unchanged_stat_skips_hashing(csv_path, hash_calls):
+    cat = ServiceCatalogue(str(csv_path), check_interval=0)
+    first = cat.current()
+    assert cat.current() is first
+    assert cat.reload() is first
+    assert len(hash_calls) == 1
+
+
+def test_check_interval_skips_stat(csv_path):
+    cat = ServiceCatalogue(str(csv_path), check_interval=3600)
+    first = cat.current()
+    write_csv(csv_path, ROW_1, ROW_2)
+    assert cat.current() is first
+    assert cat.reload().version == 2
+
+
+def test_touched_but_identical_file_keeps_version(csv_path, hash_calls):
+    cat = ServiceCatalogue(str(csv_path), check_interval=0)
+    first = cat.current()
+    write_csv(csv_path, ROW_1, mtime_ns=2_000_000_000_000)
+
+    assert cat.current() is first
+    assert len(hash_calls) == 2
+    # The new stat is remembered, so the next check does not hash again
+    assert cat.current() is first
+    assert len(hash_calls) == 2
+
+
+def test_changed_content_bumps_version(csv_path):
+    cat = ServiceCatalogue(str(csv_path), check_interval=0)
+    first = cat.current()
+    write_csv(csv_path, ROW_1, ROW_2, mtime_ns=2_000_000_000_000)
+
+    second = cat.current()
+    assert second.version == 2
+    assert second.content_hash != first.content_hash
+    assert list(second.df["id"]) == [1, 2]
+    # The old snapshot is left untouched for readers still holding it
+    assert list(first.df["id"]) == [1]
+
+
+def test_bad_file_keeps_old_snapshot(csv_path):
+    cat = ServiceCatalogue(str(csv_path), check_interval=0)
+    first = cat.current()
+    csv_path.write_text("", encoding="utf-8")
+
+    assert cat.current() is first
+    with pytest.raises(Exception):
+        cat.reload()
+    assert cat.current() is first
+
+    # Once the file is fixed, the reload goes through
+    write_csv(csv_path, ROW_1, ROW_2)
+    assert cat.current().version == 2
+
+
+def test_get_catalogue_reuses_one_instance_per_path(tmp_path, csv_path, monkeypatch):
+    monkeypatch.setattr(catalogue, "_CATALOGUES", {})
+    other = tmp_path / "other.csv"
+    write_csv(other, ROW_2)
+
+    cat = get_catalogue(str(csv_path))
+    assert get_catalogue(str(csv_path)) is cat
+    assert get_catalogue(str(other)) is not cat
+    assert get_catalogue(str(other)).current().df["id"].tolist() == [2]
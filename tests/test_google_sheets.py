@@ -0,0 +1,109 @@
+# tests/test_google_sheets.py
+
+import gspread
+import pytest
+from google.auth.exceptions import RefreshError, TransportError
+
+from core import google_sheets
+
+
+class FakeResponse:
+    def __init__(self, status: int):
+        self.status_code = status
+        self.text = "{}"
+
+    def json(self):
+        return {"error": {"code": self.status_code, "message": "error", "status": "ERROR"}}
+
+
+def api_error(status: int) -> gspread.exceptions.APIError:
+    return gspread.exceptions.APIError(FakeResponse(status))
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (RefreshError("token revoked"), True),
+        (api_error(401), True),
+        (api_error(403), True),
+        (TransportError("connection reset"), False),
+        (api_error(429), False),
+        (api_error(500), False),
+        (ConnectionError("reset"), False),
+    ],
+)
+def test_is_auth_error(error, expected):
+    assert google_sheets._is_auth_error(error) is expected
+
+
+def test_network_error_keeps_cached_handles(monkeypatch):
+    worksheet = object()
+    monkeypatch.setitem(google_sheets._HANDLES, "worksheets", {"interactions": worksheet})
+
+    def fail(ws):
+        raise TransportError("connection reset")
+
+    with pytest.raises(TransportError):
+        google_sheets._with_worksheet(fail)
+    assert google_sheets._HANDLES["worksheets"] == {"interactions": worksheet}
+
+
+class FakeWorksheet:
+    title = "interactions"
+
+    def __init__(self, spreadsheet, row_count: int):
+        self.spreadsheet = spreadsheet
+        self.row_count = row_count
+
+    def batch_get(self, ranges):
+        self.spreadsheet.reads.append(ranges)
+        start = int(ranges[1][1:].split(":")[0])
+        rows = self.spreadsheet.rows[start - 2:]
+        return [[["interaction_id", "timestamp"]], rows]
+
+
+class FakeSpreadsheet:
+    """The sheet's true grid size, and an operation log."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.reads = []
+        self.reopens = 0
+
+    @property
+    def grid_rows(self) -> int:
+        return len(self.rows) + 1
+
+    def worksheet(self, title):
+        self.reopens += 1
+        return FakeWorksheet(self, self.grid_rows)
+
+
+@pytest.fixture
+def spreadsheet(monkeypatch):
+    sheet = FakeSpreadsheet([["a", "1"], ["b", "2"]])
+    monkeypatch.setitem(
+        google_sheets._HANDLES, "worksheets", {"interactions": FakeWorksheet(sheet, sheet.grid_rows)}
+    )
+    return sheet
+
+
+def test_range_read_inside_the_grid(spreadsheet):
+    header, rows = google_sheets.load_interaction_rows(3)
+    assert header == ["interaction_id", "timestamp"]
+    assert rows == [["b", "2"]]
+    assert spreadsheet.reopens == 0
+
+
+def test_no_read_past_the_last_row(spreadsheet):
+    assert google_sheets.load_interaction_rows(4) == ([], [])
+    assert spreadsheet.reads == []
+    assert spreadsheet.reopens == 1
+
+
+def test_stale_row_count_is_refreshed(spreadsheet):
+    spreadsheet.rows.append(["c", "3"])  # appended by another process
+    header, rows = google_sheets.load_interaction_rows(4)
+    assert rows == [["c", "3"]]
+    assert spreadsheet.reopens == 1
+    assert google_sheets._HANDLES["worksheets"]["interactions"].row_count == 4
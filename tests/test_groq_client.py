@@ -0,0 +1,99 @@
+# tests/test_groq_client.py
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import groq
+import pytest
+
+from benchmarks.mock_groq_server import start_mock_groq_server
+from core.handout_generator import GroqClientManager
+
+REQUEST = dict(
+    model="llama-3.1-8b-instant",
+    messages=[{"role": "user", "content": "hello"}],
+    max_tokens=50,
+)
+
+
+@pytest.fixture
+def mock_groq():
+    """Start mock Groq servers (start_mock_groq_server kwargs); all are shut down after the test."""
+    servers = []
+
+    def start(**kwargs):
+        server = start_mock_groq_server(**kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def manager(server, **kwargs) -> GroqClientManager:
+    kwargs.setdefault("backoff_base", 0.01)
+    return GroqClientManager(api_key="test", base_url=server.base_url, **kwargs)
+
+
+def test_requests_reuse_one_connection(mock_groq):
+    server = mock_groq()
+    client = manager(server)
+    for _ in range(10):
+        client.create(**REQUEST)
+    assert server.requests == 10
+    assert len(server.client_ports) == 1
+
+
+@pytest.mark.parametrize("status", [503, 429])
+def test_retries_then_succeeds(mock_groq, status):
+    server = mock_groq(fail_first=2, error_status=status)
+    text = manager(server, max_retries=3).create(**REQUEST).choices[0].message.content
+    assert text
+    assert server.requests == 3
+
+
+def test_gives_up_after_max_retries(mock_groq):
+    server = mock_groq(fail_first=10, error_status=500)
+    with pytest.raises(groq.InternalServerError):
+        manager(server, max_retries=2).create(**REQUEST)
+    assert server.requests == 3
+
+
+def test_client_errors_are_not_retried(mock_groq):
+    server = mock_groq(error_status=400, fail_first=1)
+    with pytest.raises(groq.BadRequestError):
+        manager(server).create(**REQUEST)
+    assert server.requests == 1
+
+
+def test_latency_budget_stops_retries(mock_groq):
+    server = mock_groq(fail_first=100, error_status=503)
+    client = manager(server, max_retries=100, backoff_base=0.2, latency_budget=0.5)
+    started = time.monotonic()
+    with pytest.raises(groq.APIStatusError):
+        client.create(**REQUEST)
+    assert time.monotonic() - started < 1.0
+    assert server.requests < 100
+
+
+def test_read_timeout(mock_groq):
+    server = mock_groq(latency=1.0)
+    with pytest.raises(groq.APITimeoutError):
+        manager(server, read_timeout=0.2, max_retries=0).create(**REQUEST)
+
+
+def test_concurrency_limit(mock_groq):
+    server = mock_groq(latency=0.1)
+    client = manager(server, max_concurrency=3)
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        list(pool.map(lambda _: client.create(**REQUEST), range(12)))
+    assert server.requests == 12
+    assert server.peak_concurrency <= 3
+
+
+def test_streaming(mock_groq):
+    server = mock_groq()
+    chunks = [c.choices[0].delta.content for c in manager(server).stream(**REQUEST) if c.choices]
+    assert "".join(chunks) == server.text
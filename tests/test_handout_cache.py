@@ -0,0 +1,94 @@
+# tests/test_handout_cache.py
+
+import types
+
+import pytest
+
+from core import handout_cache
+from core.handout_cache import HandoutCache, card_cache_key, handout_cache_key
+
+VISITOR = {"age_group": "18-29", "language": "Cree", "housing_status": "Shelter", "needs": ["food", "health"]}
+SERVICES = [{"id": 1}, {"id": 2}]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake time.time() for the cache module; advance with clock.now += seconds."""
+    fake = types.SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(handout_cache, "time", types.SimpleNamespace(time=lambda: fake.now))
+    return fake
+
+
+def make_cache(tmp_path, **kwargs) -> HandoutCache:
+    return HandoutCache(db_path=str(tmp_path / "handouts.sqlite"), **kwargs)
+
+
+def test_keys_normalize_need_order_but_not_service_order():
+    key = handout_cache_key(VISITOR, SERVICES, "v1")
+    assert handout_cache_key(dict(VISITOR, needs=["health", "food", "food"]), SERVICES, "v1") == key
+    assert handout_cache_key(VISITOR, SERVICES[::-1], "v1") != key
+    assert handout_cache_key(VISITOR, SERVICES, "v2") != key
+    assert card_cache_key(1, "Cree", "v1") != card_cache_key(1, "French", "v1")
+
+
+def test_memory_lru_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path, memory_size=2)
+    cache.put("a", "v1", "A")
+    cache.put("b", "v1", "B")
+    assert cache.get("a", "v1") == "A"  # "b" is now the oldest
+    cache.put("c", "v1", "C")
+    assert list(cache._memory) == ["a", "c"]
+    assert cache.snapshot_stats()["memory_entries"] == 2
+
+
+def test_evicted_entries_fall_back_to_sqlite(tmp_path):
+    cache = make_cache(tmp_path, memory_size=1)
+    cache.put("a", "v1", "A")
+    cache.put("b", "v1", "B")
+    assert "a" not in cache._memory
+    assert cache.get("a", "v1") == "A"
+    assert cache.stats["disk_hits"] == 1
+    assert "a" in cache._memory  # promoted back to memory
+    assert cache.get("a", "v1") == "A"
+    assert cache.stats["memory_hits"] == 1
+
+    # Another process (or a restart) sees the same entries
+    assert make_cache(tmp_path).get("b", "v1") == "B"
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl_seconds=60)
+    cache.put("a", "v1", "A")
+    clock.now += 59
+    assert cache.get("a", "v1") == "A"
+    clock.now += 2
+    assert cache.get("a", "v1") is None
+    assert "a" not in cache._memory
+    assert make_cache(tmp_path, ttl_seconds=60).get("a", "v1") is None
+
+
+def test_catalogue_version_change_invalidates(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("a", "v1", "A")
+    assert cache.get("a", "v2") is None
+    assert "a" not in cache._memory
+    assert cache.stats["misses"] == 1
+
+    # Storing under a new version clears the old version from disk
+    cache.put("b", "v2", "B")
+    assert make_cache(tmp_path).get("a", "v1") is None
+
+
+def test_stats_for_the_dashboard(tmp_path):
+    cache = make_cache(tmp_path, memory_size=1)
+    assert cache.snapshot_stats()["hit_rate"] == 0.0
+    cache.put("a", "v1", "A")
+    cache.put("b", "v1", "B")
+    cache.get("b", "v1")  # memory hit
+    cache.get("a", "v1")  # disk hit
+    cache.get("c", "v1")  # miss
+    stats = cache.snapshot_stats()
+    assert {k: stats[k] for k in ("memory_hits", "disk_hits", "misses", "stores")} == {
+        "memory_hits": 1, "disk_hits": 1, "misses": 1, "stores": 2,
+    }
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
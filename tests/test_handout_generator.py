@@ -0,0 +1,143 @@
+# tests/test_handout_generator.py
+
+import threading
+import types
+
+import pytest
+
+from core import handout_generator
+from core.handout_cache import HandoutCache, card_cache_key
+from core.handout_generator import (
+    CLOSING_LINE,
+    OPENING_LINE,
+    final_handout_text,
+    generate_handout,
+    prewarm_service_cards,
+    render_template_handout,
+    stream_handout,
+)
+from core.retrieval import load_services, retrieve_services
+
+VISITOR = {"age_group": "18-29", "language": "Cree", "housing_status": "Not specified", "needs": ["food", "health"]}
+
+
+@pytest.fixture
+def services():
+    df = load_services("data/services_sample.csv")
+    return retrieve_services(df, VISITOR["needs"], VISITOR["language"], VISITOR["age_group"])
+
+
+def fake_llm_stream(monkeypatch, chunks, error=None):
+    def fake(visitor_context, services, catalogue_version):
+        yield from chunks
+        if error is not None:
+            raise error
+
+    monkeypatch.setattr(handout_generator, "_stream_cached_llm", fake)
+
+
+class FakeGroqManager:
+    """Stands in for GroqClientManager: one card per call, naming the service."""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def create(self, **kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        with self.lock:
+            self.calls.append(prompt)
+        name = prompt.split("name=", 1)[1].split(" | ", 1)[0]
+        message = types.SimpleNamespace(content=f"  Card for {name}  ")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def groq(monkeypatch):
+    fake = FakeGroqManager()
+    monkeypatch.setattr(handout_generator, "get_groq_manager", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    cache = HandoutCache(db_path=str(tmp_path / "handouts.sqlite"))
+    monkeypatch.setattr(handout_generator, "get_handout_cache", lambda: cache)
+    return cache
+
+
+def run(services, mode="llm-with-timeout-fallback") -> str:
+    return final_handout_text("".join(stream_handout(VISITOR, services, mode=mode)))
+
+
+def test_complete_stream_is_kept(monkeypatch, services):
+    fake_llm_stream(monkeypatch, ["Hello ", "there."])
+    assert run(services) == "Hello there."
+
+
+def test_failure_before_first_chunk_uses_template(monkeypatch, services):
+    fake_llm_stream(monkeypatch, [], error=RuntimeError("groq down"))
+    assert run(services) == render_template_handout(VISITOR, services)
+
+
+def test_failure_mid_stream_finishes_with_template(monkeypatch, services):
+    fake_llm_stream(monkeypatch, ["Welcome! Here is ", "a partial"], error=ConnectionError("reset"))
+    chunks = list(stream_handout(VISITOR, services, mode="llm-with-timeout-fallback"))
+    assert chunks[:2] == ["Welcome! Here is ", "a partial"]
+    assert final_handout_text("".join(chunks)) == render_template_handout(VISITOR, services)
+
+
+def test_llm_mode_still_raises(monkeypatch, services):
+    fake_llm_stream(monkeypatch, ["partial"], error=ConnectionError("reset"))
+    with pytest.raises(ConnectionError):
+        run(services, mode="llm")
+
+
+def test_cards_mode_assembles_opening_cards_and_closing(groq, cache, services):
+    text = generate_handout(VISITOR, services, catalogue_version="v1", mode="cards")
+    cards = [f"Card for {svc['name']}" for svc in services]
+    assert text == "\n\n".join([OPENING_LINE, *cards, CLOSING_LINE])
+    assert len(groq.calls) == len(services)
+    assert all("preferred language: Cree" in prompt for prompt in groq.calls)
+
+    streamed = list(stream_handout(VISITOR, services, catalogue_version="v1", mode="cards"))
+    assert final_handout_text("".join(streamed)) == text
+    assert len(streamed) == len(services) + 2
+
+
+def test_cards_are_served_from_cache_on_repeat(groq, cache, services):
+    generate_handout(VISITOR, services, catalogue_version="v1", mode="cards")
+    calls = len(groq.calls)
+    key = card_cache_key(services[0]["id"], "Cree", "v1")
+    assert cache.get(key, "v1") == f"Card for {services[0]['name']}"
+
+    # Same services in another visitor's handout: no new calls
+    generate_handout(dict(VISITOR, needs=["health"]), services[::-1], catalogue_version="v1", mode="cards")
+    assert len(groq.calls) == calls
+
+    # Another language or catalogue version needs new cards
+    generate_handout(dict(VISITOR, language="French"), services[:1], catalogue_version="v1", mode="cards")
+    generate_handout(VISITOR, services[:1], catalogue_version="v2", mode="cards")
+    assert len(groq.calls) == calls + 2
+
+
+def test_prewarm_fills_the_card_cache_once(groq, cache, services, monkeypatch):
+    monkeypatch.setattr(handout_generator, "_PREWARMED", set())
+    df = load_services("data/services_sample.csv").head(4)
+    languages = ["Cree", "French"]
+
+    thread = prewarm_service_cards(df, languages, "v1", max_workers=2)
+    thread.join(timeout=10)
+    assert len(groq.calls) == len(df) * len(languages)
+    for service_id in df["id"]:
+        for language in languages:
+            assert cache.get(card_cache_key(service_id, language, "v1"), "v1") is not None
+
+    # Already started for this version: nothing to do
+    assert prewarm_service_cards(df, languages, "v1") is None
+
+    # Visitors of a prewarmed language get their cards without a call
+    calls = len(groq.calls)
+    french = dict(VISITOR, language="French")
+    generate_handout(french, df.to_dict(orient="records"), catalogue_version="v1", mode="cards")
+    assert len(groq.calls) == calls
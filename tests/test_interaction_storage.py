@@ -0,0 +1,144 @@
+# tests/test_interaction_storage.py
+
+import json
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from core.analytics_store import INTERACTION_COLUMNS, AnalyticsStore, read_interactions_csv
+from core.config import local_connection, local_path
+from core.interaction_storage import (
+    InteractionStorage,
+    ParquetInteractionStorage,
+    SqliteInteractionStorage,
+    append_interactions,
+    copy_interactions,
+)
+
+CSV = (
+    "timestamp,interaction_id,site,age_group,language,housing_status,needs,"
+    "service_ids_kept,service_ids_removed,num_services_kept\n"
+    "2026-01-15T10:00:00,a,NFCM,18-29,Cree,Shelter,food;health,1;2,,2\n"
+    ",,,,,,,,,\n"
+    "2026-01-16T11:00:00,b,NFCM,55+,French,Not specified,housing,3,4,n/a\n"
+)
+
+
+def test_csv_import_matches_the_analytics_import(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text(CSV)
+    storage = SqliteInteractionStorage(str(tmp_path / "interactions.sqlite"))
+    assert append_interactions(storage, *read_interactions_csv(str(path))) == 2
+
+    store = AnalyticsStore(db_path=str(tmp_path / "analytics.sqlite"))
+    assert store.import_csv(str(path)) == 2
+
+    stored = storage.read_range()
+    pd.testing.assert_frame_equal(stored, store.load_df(), check_dtype=False)
+    assert list(stored.columns) == INTERACTION_COLUMNS
+    assert stored["interaction_id"].tolist() == ["a", "b"]
+    assert stored["num_services_kept"].isna().tolist() == [False, True]
+
+
+def test_copy_between_backends(tmp_path):
+    source = SqliteInteractionStorage(str(tmp_path / "a.sqlite"))
+    source.append_many([["x", "2026-01-15T10:00:00", "NFCM", "", "", "", "food", "1", "", 1]])
+    target = SqliteInteractionStorage(str(tmp_path / "b.sqlite"))
+    assert copy_interactions(source, target) == 1
+    assert target.load_rows(2) == source.load_rows(2)
+
+
+def test_local_connection_is_per_thread(tmp_path):
+    local = threading.local()
+    path = str(tmp_path / "db.sqlite")
+    conn = local_connection(local, path)
+    assert local_connection(local, path) is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(local_connection(local, path)))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+
+def visit(i: int, timestamp: str, needs: str = "food;health", kept: str = "1;2", language: str = "Cree") -> list:
+    return [f"id{i}", timestamp, "NFCM", "18-29", language, "Shelter", needs, kept, "3", len(kept.split(";"))]
+
+
+VISITS = [
+    visit(1, "2026-01-01T09:00:00"),
+    visit(2, "2026-01-02T10:00:00", needs="housing", kept="4", language="French"),
+    visit(3, "2026-01-03T11:00:00", needs="food", kept="1;5"),
+    visit(4, "", needs="culture", kept="6"),
+]
+
+
+@pytest.fixture
+def parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    storage = ParquetInteractionStorage(str(tmp_path / "parquet"))
+    yield storage
+    storage.close()
+
+
+def test_parquet_round_trip(parquet):
+    parquet.append_many(VISITS[:2])
+    parquet.append_many(VISITS[2:])
+    header, rows = parquet.load_rows(2)
+    assert header == INTERACTION_COLUMNS
+    assert [r[0] for r in rows] == ["id1", "id2", "id3", "id4"]
+    assert [r[0] for r in parquet.load_rows(4)[1]] == ["id3", "id4"]
+    assert parquet.read_range()["interaction_id"].tolist() == ["id1", "id2", "id3", "id4"]
+
+
+def test_ranged_reads_leave_out_undated_rows(parquet, tmp_path):
+    sqlite = SqliteInteractionStorage(str(tmp_path / "interactions.sqlite"))
+    for storage in (sqlite, parquet):
+        storage.append_many(VISITS)
+        assert storage.read_range("2026-01-02")["interaction_id"].tolist() == ["id2", "id3"]
+        assert storage.read_range(until_day="2026-01-02")["interaction_id"].tolist() == ["id1", "id2"]
+        assert storage.aggregate("need", since_day="2026-01-02").to_dict() == {"food": 1, "housing": 1}
+
+
+@pytest.mark.parametrize("dim", ["total", "need", "service_id", "age_group", "housing_status", "language"])
+@pytest.mark.parametrize("since_day, until_day", [(None, None), ("2026-01-02", None), (None, "2026-01-02")])
+def test_sqlite_and_parquet_aggregates_agree(parquet, tmp_path, dim, since_day, until_day):
+    sqlite = SqliteInteractionStorage(str(tmp_path / "interactions.sqlite"))
+    sqlite.append_many(VISITS)
+    parquet.append_many(VISITS)
+    expected = sqlite.aggregate(dim, since_day, until_day)
+    pd.testing.assert_series_equal(parquet.aggregate(dim, since_day, until_day), expected)
+    # Same counts as the generic (read_range based) implementation
+    generic = InteractionStorage.aggregate(sqlite, dim, since_day, until_day)
+    pd.testing.assert_series_equal(generic, expected)
+
+
+def test_copy_sqlite_to_parquet(parquet, tmp_path):
+    sqlite = SqliteInteractionStorage(str(tmp_path / "interactions.sqlite"))
+    sqlite.append_many(VISITS)
+    assert copy_interactions(sqlite, parquet) == 4
+    assert parquet.load_rows(2) == sqlite.load_rows(2)
+
+
+def test_parquet_start_drains_rows_left_queued(tmp_path):
+    pytest.importorskip("pyarrow")
+    base_dir = str(tmp_path / "parquet")
+    ParquetInteractionStorage(base_dir)._log_queue()  # creates the queue file
+    with local_connection(threading.local(), local_path("interaction_parquet_queue.sqlite")) as conn:
+        conn.executemany(
+            "INSERT INTO queue (enqueued_at, row) VALUES (?, ?)",
+            [(time.time(), json.dumps(row)) for row in VISITS[:2]],
+        )
+
+    storage = ParquetInteractionStorage(base_dir)
+    try:
+        storage.start()
+        deadline = time.time() + 5
+        while len(storage.read_range()) < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        assert storage.read_range()["interaction_id"].tolist() == ["id1", "id2"]
+    finally:
+        storage.close()
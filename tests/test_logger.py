@@ -0,0 +1,193 @@
+# tests/test_logger.py
+
+import json
+import threading
+import time
+
+import pytest
+
+from core.logger import InteractionQueue
+
+
+class FlakySink:
+    """Fails the first `failures` calls, then records every batch."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.calls = 0
+        self.batches = []
+        self.done = threading.Event()
+
+    def __call__(self, rows):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("sheets unavailable")
+        self.batches.append(rows)
+        self.done.set()
+
+
+def make_queue(tmp_path, sink, **kwargs) -> InteractionQueue:
+    kwargs.setdefault("batch_size", 10)
+    kwargs.setdefault("flush_interval", 0.05)
+    kwargs.setdefault("max_backoff", 0.05)
+    return InteractionQueue(db_path=str(tmp_path / "queue.sqlite"), sink=sink, **kwargs)
+
+
+def add_rows(queue: InteractionQueue, rows) -> None:
+    """Queue rows without starting the worker thread."""
+    with queue._conn() as conn:
+        conn.executemany(
+            "INSERT INTO queue (enqueued_at, row) VALUES (?, ?)",
+            [(time.time(), json.dumps(row)) for row in rows],
+        )
+
+
+def test_failed_batch_is_kept_and_retried(tmp_path):
+    sink = FlakySink(failures=2)
+    queue = make_queue(tmp_path, sink)
+    add_rows(queue, [["a", 1]])
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            queue.flush_once()
+        assert queue.depth() == 1
+    attempts = queue._conn().execute("SELECT attempts FROM queue").fetchone()[0]
+    assert attempts == 2
+    assert queue.stats["failures"] == 2
+
+    assert queue.flush_once() == 1
+    assert sink.batches == [[["a", 1]]]
+    assert queue.depth() == 0
+
+
+def test_worker_retries_until_rows_are_written(tmp_path):
+    sink = FlakySink(failures=3)
+    queue = make_queue(tmp_path, sink)
+    try:
+        for i in range(5):
+            queue.enqueue([f"row-{i}", i])
+        assert sink.done.wait(5)
+        deadline = time.time() + 5
+        while queue.depth() and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        queue.stop()
+
+    assert queue.depth() == 0
+    assert [row for batch in sink.batches for row in batch] == [[f"row-{i}", i] for i in range(5)]
+    assert queue.stats["failures"] == 3
+
+
+def test_rows_survive_a_restart(tmp_path):
+    first = make_queue(tmp_path, FlakySink(failures=100))
+    add_rows(first, [["left over"]])
+
+    sink = FlakySink()
+    second = make_queue(tmp_path, sink)
+    assert second.flush_once() == 1
+    assert sink.batches == [[["left over"]]]
+
+
+class RejectingSink:
+    """Rejects any batch containing a row marked "bad" with a 400, like Sheets would."""
+
+    def __init__(self):
+        self.written = []
+        self.calls = 0
+
+    def __call__(self, rows):
+        self.calls += 1
+        if any(row[0] == "bad" for row in rows):
+            error = RuntimeError("400 invalid value")
+            error.code = 400
+            raise error
+        self.written.extend(rows)
+
+
+def drain(queue: InteractionQueue, max_calls: int = 100) -> None:
+    for _ in range(max_calls):
+        try:
+            if not queue.flush_once() and not queue.depth():
+                return
+        except Exception:
+            continue
+    raise AssertionError("queue did not drain")
+
+
+def test_bad_row_is_dead_lettered_and_does_not_block_others(tmp_path):
+    sink = RejectingSink()
+    queue = make_queue(tmp_path, sink, batch_size=8)
+    rows = [[f"row-{i}"] for i in range(5)] + [["bad"]] + [[f"row-{i}"] for i in range(5, 12)]
+    add_rows(queue, rows)
+    drain(queue)
+
+    assert queue.depth() == 0
+    assert queue.dead_letter_count() == 1
+    assert sink.written == [r for r in rows if r != ["bad"]]
+    assert queue.snapshot_stats()["dead_letter"] == 1
+
+    assert queue.requeue_dead_letters() == 1
+    assert (queue.depth(), queue.dead_letter_count()) == (1, 0)
+
+
+def test_outage_is_retried_without_dead_lettering(tmp_path):
+    def outage(rows):
+        error = RuntimeError("503 unavailable")
+        error.code = 503
+        raise error
+
+    queue = make_queue(tmp_path, outage, max_attempts=3)
+    add_rows(queue, [[f"row-{i}"] for i in range(4)])
+    for _ in range(10):
+        with pytest.raises(RuntimeError):
+            queue.flush_once()
+    assert (queue.depth(), queue.dead_letter_count()) == (4, 0)
+
+
+def test_repeated_unknown_failure_is_dead_lettered_after_max_attempts(tmp_path):
+    def broken(rows):
+        if any(row[0] == "bad" for row in rows):
+            raise ValueError("cannot serialize")
+
+    queue = make_queue(tmp_path, broken, batch_size=4, max_attempts=3)
+    add_rows(queue, [["a"], ["bad"], ["b"]])
+    drain(queue)
+    assert (queue.depth(), queue.dead_letter_count()) == (0, 1)
+
+
+def test_config_errors_are_not_dead_lettered(tmp_path):
+    def misconfigured(rows):
+        raise KeyError("gcp_service_account")
+
+    queue = make_queue(tmp_path, misconfigured, max_attempts=2)
+    add_rows(queue, [["a"], ["b"]])
+    for _ in range(6):
+        with pytest.raises(KeyError):
+            queue.flush_once()
+    assert (queue.depth(), queue.dead_letter_count()) == (2, 0)
+
+
+def test_stats_count_every_row_with_concurrent_writers(tmp_path):
+    sink = FlakySink()
+    queue = make_queue(tmp_path, sink, batch_size=25)
+
+    def produce(worker: int):
+        for i in range(50):
+            queue.enqueue([f"worker-{worker}", i])
+            queue.snapshot_stats()
+
+    threads = [threading.Thread(target=produce, args=(w,)) for w in range(4)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        deadline = time.time() + 5
+        while queue.depth() and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        queue.stop()
+
+    stats = queue.snapshot_stats()
+    assert stats["enqueued"] == 200
+    assert stats["flushed"] == sum(len(batch) for batch in sink.batches) == 200
@@ -0,0 +1,122 @@
+# tests/test_metrics.py
+
+import socket
+import types
+import urllib.request
+
+import pytest
+
+from core import metrics
+from core.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def metrics_server(monkeypatch):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    monkeypatch.setenv("DISSA_METRICS_PORT", str(port))
+    monkeypatch.setattr(metrics.METRICS, "_enabled", True)
+    monkeypatch.setattr(metrics, "_SERVER", None)
+    yield port
+    if metrics._SERVER is not None:
+        metrics._SERVER.shutdown()
+        metrics._SERVER.server_close()
+
+
+def test_server_listens_on_localhost_by_default(metrics_server):
+    assert metrics.start_metrics_server() == metrics_server
+    assert metrics._SERVER.server_address[0] == "127.0.0.1"
+    with urllib.request.urlopen(f"http://127.0.0.1:{metrics_server}/metrics") as response:
+        assert response.status == 200
+
+
+def test_host_setting(metrics_server, monkeypatch):
+    monkeypatch.setenv("DISSA_METRICS_HOST", "0.0.0.0")
+    metrics.start_metrics_server()
+    assert metrics._SERVER.server_address[0] == "0.0.0.0"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake perf_counter() for the registry; advance with clock.now += seconds."""
+    fake = types.SimpleNamespace(now=50.0)
+    monkeypatch.setattr(metrics, "time", types.SimpleNamespace(perf_counter=lambda: fake.now))
+    return fake
+
+
+def test_histogram_quantiles_are_nearest_rank():
+    registry = MetricsRegistry(enabled=True)
+    for value in range(100, 0, -1):
+        registry.observe("retrieve_seconds", value)
+    (row,) = registry.snapshot()
+    assert row == {"name": "retrieve_seconds", "count": 100, "mean": 50.5, "p50": 50, "p95": 95, "p99": 99}
+
+    registry.observe("single", 7.0)
+    assert registry.snapshot()[1] == {"name": "single", "count": 1, "mean": 7.0, "p50": 7.0, "p95": 7.0, "p99": 7.0}
+
+
+def test_quantiles_use_recent_samples_but_count_everything():
+    registry = MetricsRegistry(enabled=True, reservoir=10)
+    for value in [1000] * 10 + [1] * 10:
+        registry.observe("pdf_seconds", value)
+    (row,) = registry.snapshot()
+    assert (row["count"], row["mean"]) == (20, 500.5)
+    assert (row["p50"], row["p99"]) == (1, 1)
+
+
+def test_timed_records_each_call_even_when_it_raises(clock):
+    registry = MetricsRegistry(enabled=True)
+
+    @registry.timed("handout_seconds")
+    def handout(seconds, fail=False):
+        """Docstring kept."""
+        clock.now += seconds
+        if fail:
+            raise RuntimeError("groq down")
+        return "text"
+
+    assert handout(0.25) == "text"
+    with pytest.raises(RuntimeError):
+        handout(0.75, fail=True)
+    (row,) = registry.snapshot()
+    assert (row["count"], row["mean"]) == (2, 0.5)
+    assert (handout.__name__, handout.__doc__) == ("handout", "Docstring kept.")
+
+    with registry.span("block_seconds"):
+        clock.now += 2
+    assert registry.snapshot()[0]["mean"] == 2
+
+
+def test_disabled_registry_records_nothing(clock):
+    registry = MetricsRegistry(enabled=False)
+    registry.timed("call_seconds")(lambda: None)()
+    registry.observe("x", 1)
+    registry.inc("tokens", 3)
+    assert registry.snapshot() == []
+    assert registry.counters() == {}
+    assert registry.prometheus_text() == "\n"
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry(enabled=True)
+    for value in (0.1, 0.2, 0.3, 0.4):
+        registry.observe("retrieve_services_seconds", value)
+    registry.inc("groq_tokens", 120)
+    registry.inc("groq_tokens", 30)
+
+    assert registry.prometheus_text().splitlines() == [
+        "# HELP dissa_retrieve_services_seconds retrieve_services_seconds, quantiles over the last 2048 samples",
+        "# TYPE dissa_retrieve_services_seconds summary",
+        'dissa_retrieve_services_seconds{quantile="0.5"} 0.2',
+        'dissa_retrieve_services_seconds{quantile="0.95"} 0.4',
+        'dissa_retrieve_services_seconds{quantile="0.99"} 0.4',
+        "dissa_retrieve_services_seconds_sum 1",
+        "dissa_retrieve_services_seconds_count 4",
+        "# HELP dissa_groq_tokens_total groq_tokens since process start",
+        "# TYPE dissa_groq_tokens_total counter",
+        "dissa_groq_tokens_total 150",
+    ]
+
+    registry.reset()
+    assert registry.prometheus_text() == "\n"
@@ -0,0 +1,91 @@
+# tests/test_pdf_cache.py
+
+import datetime
+
+from core import pdf_generator
+from core.pdf_generator import PdfCache
+
+VISITOR = {"age_group": "18-29", "language": "Cree", "housing_status": "Not specified", "needs": ["food"]}
+SERVICES = [{"id": 1, "name": "Community Meal Program", "category": "food"}]
+
+
+def counting_renderer(monkeypatch):
+    calls = []
+
+    def fake_generate_pdf(text, visitor_context, services=None, generated_on=None):
+        calls.append(text)
+        return f"pdf:{text}:{len(calls)}".encode()
+
+    monkeypatch.setattr(pdf_generator, "generate_pdf", fake_generate_pdf)
+    return calls
+
+
+def test_key_depends_on_text_services_catalogue_version_and_day():
+    key = PdfCache.key("Hello", SERVICES, "v1", "2026-01-15")
+    assert PdfCache.key("Hello", [dict(SERVICES[0])], "v1", "2026-01-15") == key
+    assert PdfCache.key("Hello!", SERVICES, "v1", "2026-01-15") != key
+    assert PdfCache.key("Hello", SERVICES + [{"id": 2}], "v1", "2026-01-15") != key
+    assert PdfCache.key("Hello", SERVICES, "v2", "2026-01-15") != key
+    assert PdfCache.key("Hello", SERVICES, "v1", "2026-01-16") != key
+
+
+def test_cached_render_is_reused(monkeypatch):
+    calls = counting_renderer(monkeypatch)
+    cache = PdfCache()
+    first = cache.get_or_render("Hello", VISITOR, SERVICES, "v1")
+    second = cache.get_or_render("Hello", VISITOR, SERVICES, "v1")
+    assert first is second
+    assert calls == ["Hello"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.get_or_render("Hello", VISITOR, SERVICES, "v2")
+    assert len(calls) == 2
+
+
+def test_cache_is_bounded(monkeypatch):
+    calls = counting_renderer(monkeypatch)
+    cache = PdfCache(maxsize=2)
+    for text in ("a", "b", "c", "a"):
+        cache.get_or_render(text, VISITOR, SERVICES)
+    assert calls == ["a", "b", "c", "a"]
+    assert len(cache._entries) == 2
+
+
+def test_cached_handout_is_stamped_with_todays_date(monkeypatch):
+    stamps = []
+
+    def fake_generate_pdf(text, visitor_context, services=None, generated_on=None):
+        stamps.append(generated_on)
+        return generated_on.encode()
+
+    class FakeDate(datetime.date):
+        today_value = datetime.date(2026, 1, 15)
+
+        @classmethod
+        def today(cls):
+            return cls.today_value
+
+    monkeypatch.setattr(pdf_generator, "generate_pdf", fake_generate_pdf)
+    monkeypatch.setattr(pdf_generator, "date", FakeDate)
+    cache = PdfCache()
+
+    assert cache.get_or_render("Hello", VISITOR, SERVICES, "v1")[0] == b"2026-01-15"
+    assert cache.get_or_render("Hello", VISITOR, SERVICES, "v1")[0] == b"2026-01-15"
+    FakeDate.today_value = datetime.date(2026, 1, 16)
+    assert cache.get_or_render("Hello", VISITOR, SERVICES, "v1")[0] == b"2026-01-16"
+    assert stamps == ["2026-01-15", "2026-01-16"]
+
+
+def test_generate_pdf_uses_generated_on(monkeypatch):
+    stamps = []
+    new_document = pdf_generator._new_document
+
+    def spy(generated_on, *args):
+        stamps.append(generated_on)
+        return new_document(generated_on, *args)
+
+    monkeypatch.setattr(pdf_generator, "_new_document", spy)
+    assert pdf_generator.generate_pdf("Hello", VISITOR, SERVICES, generated_on="2026-01-15").startswith(b"%PDF")
+    pdf_generator.generate_pdf("Hello", VISITOR, SERVICES)
+    assert stamps[0] == "2026-01-15"
+    assert len(stamps[1]) == len("2026-01-15 10:30")
@@ -0,0 +1,74 @@
+# tests/test_pdf_generator.py
+
+import os
+import zlib
+
+import pytest
+from fpdf import fpdf as fpdf_module
+from fpdf.ttfonts import TTFontFile
+
+from core import pdf_fonts
+from core.pdf_generator import DEFAULT_FONT_PATH, generate_merged_pdf, generate_pdf, needs_unicode
+
+SERVICES = [{"id": 1, "name": "Community Meal Program", "category": "food", "address": "Rue Émile"}]
+CREE = "ᐊᐧᐊᒋᔨᐦ ᒥᒋᒻ"
+
+needs_font = pytest.mark.skipif(not os.path.exists(DEFAULT_FONT_PATH), reason="DejaVu font not installed")
+
+
+def test_needs_unicode_only_outside_latin1():
+    assert not needs_unicode("Bonjour, voici un repas.", SERVICES)
+    assert needs_unicode(CREE, SERVICES)
+    assert needs_unicode("Hello 🍽", SERVICES)
+    assert needs_unicode("Hello", [dict(SERVICES[0], name=CREE)])
+
+
+def test_fpdf_module_is_not_patched():
+    assert fpdf_module.TTFontFile is TTFontFile
+
+
+def test_latin1_text_embeds_no_font():
+    pdf = generate_pdf("Bonjour, voici un repas.", {}, SERVICES)
+    assert b"FontFile2" not in pdf
+
+
+@needs_font
+def test_unicode_text_embeds_the_glyphs_used():
+    pdf = generate_pdf(CREE, {}, SERVICES)
+    assert b"FontFile2" in pdf
+    # A per-glyph subset of DejaVu Sans (~750 KB) stays small
+    assert len(pdf) < 60_000
+    assert b"FontFile2" in generate_merged_pdf([("Hello", {}, SERVICES), (CREE, {}, SERVICES)])
+
+
+@needs_font
+def test_font_file_is_parsed_once(monkeypatch):
+    parsed = []
+
+    class CountingFont(pdf_fonts.TrueTypeFont):
+        def __init__(self, path, *args, **kwargs):
+            parsed.append(path)
+            super().__init__(path, *args, **kwargs)
+
+    monkeypatch.setattr(pdf_fonts, "TrueTypeFont", CountingFont)
+    monkeypatch.setattr(pdf_fonts, "_FONTS", {})
+    generate_pdf(CREE, {}, SERVICES)
+    generate_pdf("ᐃᓄᒃᑎᑐᑦ, different text", {}, SERVICES)
+    assert sorted(parsed) == sorted(set(parsed))
+    assert DEFAULT_FONT_PATH in parsed
+
+
+@needs_font
+def test_subset_keeps_glyphs_and_widths(tmp_path):
+    font = pdf_fonts.get_font(DEFAULT_FONT_PATH)
+    codes = {ord(c) for c in CREE + "Aé☕"}
+    subset = font.subset(codes)
+    assert font.subset(set(codes)) is subset
+
+    path = tmp_path / "subset.ttf"
+    path.write_bytes(zlib.decompress(subset.compressed))
+    parsed = pdf_fonts.TrueTypeFont(str(path))
+    assert parsed.num_glyphs < 40
+    for code in codes:
+        assert parsed.char_to_glyph[code] == subset.code_to_glyph[code]
+        assert parsed.metrics["cw"][code] == font.metrics["cw"][code]
@@ -0,0 +1,119 @@
+# tests/test_profiling.py
+
+import threading
+import types
+
+import pytest
+
+from core import profiling
+from core.profiling import RerunProfiler
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake perf_counter() for the profiler; advance with clock.now += seconds."""
+    fake = types.SimpleNamespace(now=100.0)
+    monkeypatch.setattr(
+        profiling,
+        "time",
+        types.SimpleNamespace(perf_counter=lambda: fake.now, time=lambda: 1_000_000.0),
+    )
+    return fake
+
+
+def test_laps_charge_time_to_sections_in_order(clock):
+    profiler = RerunProfiler(enabled=True)
+    profiler.start_run()
+    clock.now += 0.25
+    profiler.lap("form")
+    clock.now += 0.5
+    profiler.lap("dashboard")
+    clock.now += 0.1
+    profiler.lap("form")
+    profiler.end_run()
+
+    (record,) = profiler.recent()
+    assert record["kind"] == "app"
+    assert list(record["sections"]) == ["form", "dashboard"]
+    assert record["sections"] == pytest.approx({"form": 0.35, "dashboard": 0.5})
+    assert record["total"] == pytest.approx(0.85)
+
+
+def test_fragment_is_a_section_inside_a_run_and_a_run_on_its_own(clock):
+    profiler = RerunProfiler(enabled=True)
+    profiler.start_run()
+    clock.now += 0.2
+    with profiler.fragment("acceptance"):
+        clock.now += 0.3
+    profiler.end_run()
+
+    with profiler.fragment("acceptance"):
+        clock.now += 0.05
+
+    full, fragment_only = profiler.recent()
+    assert list(full["sections"]) == ["(before acceptance)", "acceptance"]
+    assert full["sections"] == pytest.approx({"(before acceptance)": 0.2, "acceptance": 0.3})
+    assert fragment_only["kind"] == "acceptance"
+    assert fragment_only["total"] == pytest.approx(0.05)
+
+
+def test_new_run_resets_an_unfinished_one(clock):
+    profiler = RerunProfiler(enabled=True)
+    profiler.start_run()
+    clock.now += 0.4
+    profiler.lap("form")
+    # st.rerun() / st.stop(): end_run never ran
+    profiler.start_run()
+    clock.now += 0.1
+    profiler.lap("dashboard")
+    profiler.end_run()
+
+    interrupted, finished = profiler.recent()
+    assert interrupted["kind"] == "app (interrupted)"
+    assert interrupted["sections"] == pytest.approx({"form": 0.4})
+    assert finished["sections"] == pytest.approx({"dashboard": 0.1})
+    assert finished["total"] == pytest.approx(0.1)
+
+    # Calls outside a run are ignored
+    profiler.lap("stray")
+    profiler.end_run()
+    assert len(profiler.recent()) == 2
+
+
+def test_history_is_bounded_and_averaged_per_kind(clock):
+    profiler = RerunProfiler(enabled=True, history=3)
+    for seconds in (1.0, 0.2, 0.4, 0.6):
+        profiler.start_run()
+        clock.now += seconds
+        profiler.lap("form")
+        profiler.end_run()
+
+    assert [r["total"] for r in profiler.recent()] == pytest.approx([0.2, 0.4, 0.6])
+    assert profiler.averages() == {"app": pytest.approx({"(total)": 0.4, "form": 0.4})}
+
+
+def test_runs_are_tracked_per_thread(clock):
+    profiler = RerunProfiler(enabled=True)
+    profiler.start_run("main")
+
+    def other_session():
+        profiler.start_run("other")
+        profiler.lap("form")
+        profiler.end_run()
+
+    thread = threading.Thread(target=other_session)
+    thread.start()
+    thread.join()
+    profiler.end_run()
+    assert [r["kind"] for r in profiler.recent()] == ["other", "main"]
+
+
+def test_disabled_profiler_records_nothing(clock):
+    profiler = RerunProfiler(enabled=False)
+    profiler.start_run()
+    profiler.lap("form")
+    with profiler.fragment("acceptance"):
+        pass
+    profiler.end_run()
+    assert profiler.recent() == []
+    assert profiler.averages() == {}
@@ -0,0 +1,267 @@
+# tests/test_retrieval.py
+
+import itertools
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.retrieval import (
+    ADULT_AGE_GROUPS,
+    AGE_GROUPS,
+    DEFAULT_WEIGHTS,
+    _snapshot_is_fresh,
+    build_snapshot,
+    get_service_index,
+    load_services,
+    retrieval_settings,
+    retrieve_services,
+    set_acceptance_scores,
+    snapshot_path,
+)
+
+SERVICES_CSV = "data/services_sample.csv"
+NEEDS = ["food", "health", "mental_health", "housing", "clothing", "employment", "family_support", "culture"]
+LANGUAGES = ["Cree", "Inuktitut", "English", "French", "Other"]
+NO_RANKING = {"need": 0, "language_exact": 0, "age_specific": 0, "housing": 0, "acceptance": 0}
+
+QUERIES = [
+    (list(needs), language, age_group)
+    for needs in [[n] for n in NEEDS] + [["food", "health"], ["housing", "employment", "culture"]]
+    for language, age_group in itertools.product(LANGUAGES, AGE_GROUPS)
+]
+
+
+def baseline_ids(df: pd.DataFrame, needs, language, age_group):
+    """The original apply-based filter, with "All" matched case-insensitively."""
+    ids = []
+    for _, row in df.iterrows():
+        langs = [l.strip() for l in str(row["languages"]).split(";")]
+        target = str(row["target_age"]).strip().lower()
+        age_ok = (
+            target == "all"
+            or (target == "18+" and age_group in ADULT_AGE_GROUPS)
+            or target == age_group.lower()
+        )
+        if row["category"] in needs and (language in langs or "English" in langs) and age_ok:
+            ids.append(row["id"])
+    return ids
+
+
+@pytest.fixture
+def services_csv(tmp_path):
+    path = tmp_path / "services.csv"
+    shutil.copy(SERVICES_CSV, path)
+    return str(path)
+
+
+@pytest.mark.parametrize("needs, language, age_group", QUERIES)
+def test_eligible_services_match_baseline(needs, language, age_group):
+    df = load_services(SERVICES_CSV)
+    positions = get_service_index(df).match(needs, language, age_group)
+    assert df["id"].iloc[positions].tolist() == baseline_ids(df, needs, language, age_group)
+
+
+@pytest.mark.parametrize("needs, language, age_group", QUERIES)
+def test_unranked_top_k_is_baseline_head(needs, language, age_group):
+    df = load_services(SERVICES_CSV)
+    services = retrieve_services(df, needs, language, age_group, weights=NO_RANKING)
+    assert [s["id"] for s in services] == baseline_ids(df, needs, language, age_group)[:5]
+
+
+def test_ranking_returns_best_eligible_first():
+    df = load_services(SERVICES_CSV)
+    needs, language, age_group = ["food", "health"], "Cree", "18-29"
+    eligible = set(baseline_ids(df, needs, language, age_group))
+    services = retrieve_services(df, needs, language, age_group, top_k=len(eligible))
+    assert {s["id"] for s in services} == eligible
+
+    index = get_service_index(df)
+    positions = df.index[df["id"].isin([s["id"] for s in services])]
+    by_id = dict(zip(df["id"].iloc[positions], index.score(positions.to_numpy(), needs, language)))
+    scores = [by_id[s["id"]] for s in services]
+    assert scores == sorted(scores, reverse=True)
+
+
+def scan_top_k(index, needs, language, age_group, housing_status, k, weights):
+    """Score every eligible row and sort: the reference top_k must match."""
+    positions = index.match(needs, language, age_group)
+    scores = index.score(positions, needs, language, housing_status, weights)
+    order = sorted(range(len(positions)), key=lambda i: (-scores[i], positions[i]))
+    return [int(positions[i]) for i in order[:k]]
+
+
+@pytest.mark.parametrize("weights", [
+    None,
+    NO_RANKING,
+    {"acceptance": 3.0},
+    {"acceptance": -1.0},
+    {"need": 0, "housing": 0.25, "acceptance": 0.5},
+])
+def test_top_k_matches_full_scan(tmp_path, weights):
+    df = pd.read_csv(SERVICES_CSV)
+    df = pd.concat([df] * 20, ignore_index=True)
+    df["id"] = range(1, len(df) + 1)
+    path = str(tmp_path / "big.csv")
+    df.to_csv(path, index=False)
+    loaded = load_services(path)
+    index = get_service_index(loaded)
+    rng = np.random.default_rng(0)
+    # Coarse scores so that ties inside a group happen too
+    index.set_acceptance({int(i): float(rng.integers(0, 5)) / 4 for i in index.service_ids})
+
+    for needs, language, age_group in QUERIES[::3]:
+        for housing_status, k in (("Shelter", 5), (None, 1), ("Stably housed", 40)):
+            expected = scan_top_k(index, needs, language, age_group, housing_status, k, weights)
+            assert index.top_k(needs, language, age_group, housing_status, k=k, weights=weights) == expected
+
+
+def test_records_match_to_dict(services_csv):
+    build_snapshot(services_csv)
+    for df in (load_services(SERVICES_CSV), load_services(services_csv)):
+        positions = [7, 0, 3, 21]
+        expected = df.iloc[positions].to_dict(orient="records")
+        actual = get_service_index(df).records(df, positions)
+        assert [list(r) for r in actual] == [list(r) for r in expected]
+        assert all(
+            a == e or (pd.isna(a) and pd.isna(e))
+            for ra, re in zip(actual, expected) for a, e in zip(ra.values(), re.values())
+        )
+        assert get_service_index(df).records(df, []) == []
+
+        # Served from the row cache, as copies
+        again = get_service_index(df).records(df, positions)
+        assert again == actual and again[0] is not actual[0]
+        actual[0]["name"] = "changed"
+        assert get_service_index(df).records(df, positions[:1])[0]["name"] != "changed"
+
+
+def test_snapshot_columns_are_not_copied(services_csv):
+    pa = pytest.importorskip("pyarrow")
+    build_snapshot(services_csv)
+    allocated = pa.total_allocated_bytes()
+    df = load_services(services_csv)
+    # Text columns wrap the mapped blob; only small validity bitmaps are new
+    assert pa.total_allocated_bytes() - allocated < 4096
+    assert df["name"].array._pa_array.type == pa.large_string()
+
+    values = df["id"].to_numpy()
+    while values is not None and not isinstance(values, np.memmap):
+        values = values.base
+    assert isinstance(values, np.memmap)
+
+
+def test_retrieval_settings_read_top_k_and_weights(monkeypatch):
+    assert retrieval_settings() == (5, DEFAULT_WEIGHTS)
+    monkeypatch.setenv("DISSA_RETRIEVAL_TOP_K", "3")
+    monkeypatch.setenv("DISSA_RETRIEVAL_WEIGHT_HOUSING", "0")
+    top_k, weights = retrieval_settings()
+    assert top_k == 3
+    assert weights == dict(DEFAULT_WEIGHTS, housing=0.0)
+
+
+def test_acceptance_scores_change_ranking():
+    df = load_services(SERVICES_CSV)
+    needs, language, age_group = ["food", "health"], "Cree", "18-29"
+    eligible = baseline_ids(df, needs, language, age_group)
+    only_acceptance = dict(NO_RANKING, acceptance=1.0)
+
+    def ranked(**kwargs):
+        return [s["id"] for s in retrieve_services(df, needs, language, age_group, top_k=len(eligible), **kwargs)]
+
+    # Without scores every service gets the same default: catalogue order
+    assert ranked(weights=only_acceptance) == eligible
+
+    # Staff keep the last services most often: they move to the top
+    set_acceptance_scores(df, {service_id: rank / len(eligible) for rank, service_id in enumerate(eligible)})
+    assert ranked(weights=only_acceptance) == eligible[::-1]
+
+    # With the other signals on, the same scores still reorder the result
+    with_acceptance = ranked()
+    assert with_acceptance != ranked(weights={"acceptance": 0})
+    assert set(with_acceptance) == set(eligible)
+
+    # Services missing from the scores fall back to DEFAULT_ACCEPTANCE
+    first = eligible[0]
+    set_acceptance_scores(df, {first: 0.0})
+    assert ranked(weights=only_acceptance) == eligible[1:] + [first]
+
+
+def test_snapshot_round_trip(services_csv):
+    from_csv = load_services(services_csv)
+    build_snapshot(services_csv)
+    assert _snapshot_is_fresh(services_csv, snapshot_path(services_csv))
+
+    from_snapshot = load_services(services_csv)
+    pd.testing.assert_frame_equal(
+        from_snapshot[list(pd.read_csv(services_csv).columns)],
+        from_csv[list(pd.read_csv(services_csv).columns)],
+        check_dtype=False,
+    )
+    for needs, language, age_group in QUERIES:
+        expected = retrieve_services(from_csv, needs, language, age_group, "Shelter")
+        actual = retrieve_services(from_snapshot, needs, language, age_group, "Shelter")
+        assert [s["id"] for s in actual] == [s["id"] for s in expected]
+
+
+def test_snapshot_text_without_pyarrow(services_csv, monkeypatch):
+    build_snapshot(services_csv)
+    with_arrow = load_services(services_csv)
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    without = load_services(services_csv)
+    assert without["name"].dtype == object
+    pd.testing.assert_frame_equal(without, with_arrow, check_dtype=False)
+
+
+def test_stale_snapshot_is_ignored(services_csv):
+    build_snapshot(services_csv)
+    df = pd.read_csv(services_csv)
+    df.loc[0, "name"] = "Renamed service"
+    df.to_csv(services_csv, index=False)
+    later = time.time() + 10
+    os.utime(services_csv, (later, later))
+    assert load_services(services_csv).loc[0, "name"] == "Renamed service"
+
+
+def test_wide_catalogue_does_not_overflow_bitmasks(tmp_path):
+    """More than 64 distinct categories, languages and target_age strings."""
+    df = pd.read_csv(SERVICES_CSV)
+    df = pd.concat([df] * 4, ignore_index=True)
+    df["id"] = range(1, len(df) + 1)
+    df["category"] = [c if i % 2 else f"category {i}" for i, c in enumerate(df["category"])]
+    df["languages"] = [f"{l};Language {i}" for i, l in enumerate(df["languages"])]
+    df["target_age"] = [a if i % 3 else f"ages {i} and up" for i, a in enumerate(df["target_age"])]
+    path = str(tmp_path / "wide.csv")
+    df.to_csv(path, index=False)
+
+    from_csv = load_services(path)
+    build_snapshot(path)
+    for loaded in (from_csv, load_services(path)):
+        assert get_service_index(loaded).category_mask.shape[1] > 1
+        for needs, language, age_group in QUERIES[::7] + [(["category 198"], "Language 198", "55+")]:
+            positions = get_service_index(loaded).match(needs, language, age_group)
+            assert loaded["id"].iloc[positions].tolist() == baseline_ids(df, needs, language, age_group)
+
+    # Free-text age ranges are not age groups: never matched
+    assert baseline_ids(df, ["category 0"], "Language 0", "18-29") == []
+
+
+def test_target_age_maps_onto_age_groups(tmp_path):
+    df = pd.read_csv(SERVICES_CSV).head(4)
+    df["category"] = "food"
+    df["target_age"] = ["ALL", "18+", "under 18", "18-29;30-54"]
+    path = str(tmp_path / "ages.csv")
+    df.to_csv(path, index=False)
+    loaded = load_services(path)
+
+    def ids(age_group):
+        return [s["id"] for s in retrieve_services(loaded, ["food"], "English", age_group, weights=NO_RANKING)]
+
+    first, adult, minor, young = df["id"].tolist()
+    assert ids("Under 18") == [first, minor]
+    assert ids("18-29") == [first, adult, young]
+    assert ids("55+") == [first, adult]